@@ -0,0 +1,82 @@
+"""
+管理员相关的API路由
+"""
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from ..core.dependencies import get_current_superuser
+from ..core.metrics import register_metrics
+from ..database import get_db, SessionLocal, User
+from ..models import KeywordDictionary, KeywordDictionaryUpdate, RetagRequest
+from ..services.keyword_store import publish_dictionary
+from ..services.retag import RetagRunner
+from .events import keyword_reloader, tag_extractor
+
+router = APIRouter(prefix="/api/admin", tags=["管理"])
+
+# 重新打标签任务在后台线程中运行，进度保存在检查点表中
+retag_runner = RetagRunner(SessionLocal)
+register_metrics("retag_job", retag_runner.stats)
+
+
+def _current_dictionary() -> KeywordDictionary:
+    """当前进程生效的关键词词典"""
+    return KeywordDictionary(
+        version=tag_extractor.dictionary_version,
+        category_keywords=tag_extractor.category_keywords,
+        importance_keywords=tag_extractor.importance_keywords,
+    )
+
+
+@router.get("/keywords", response_model=KeywordDictionary, summary="获取关键词词典")
+def get_keywords(current_user: User = Depends(get_current_superuser)):
+    """
+    获取当前生效的分类关键词和重要性关键词
+    """
+    return _current_dictionary()
+
+
+@router.put("/keywords", response_model=KeywordDictionary, summary="发布关键词词典")
+def update_keywords(
+    dictionary: KeywordDictionaryUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_superuser),
+):
+    """
+    发布新版本的关键词词典
+
+    当前进程立即生效，其他工作进程在下一个检查周期内（KEYWORD_RELOAD_INTERVAL）自动加载
+    """
+    publish_dictionary(
+        db,
+        dictionary.category_keywords,
+        dictionary.importance_keywords,
+        note=dictionary.note,
+    )
+    db.commit()
+    keyword_reloader.reload()
+    return _current_dictionary()
+
+
+@router.post("/retag", status_code=202, summary="重新打标签")
+def start_retag(
+    request: RetagRequest,
+    current_user: User = Depends(get_current_superuser),
+):
+    """
+    启动后台任务，用当前词典重新分析全部事件的标签、分类和重要性评分
+
+    任务中断后再次调用会从上次的检查点继续
+    """
+    if not retag_runner.start(**request.dict()):
+        raise HTTPException(status_code=409, detail="重新打标签任务正在运行")
+    return retag_runner.status()
+
+
+@router.get("/retag", summary="重新打标签进度")
+def get_retag_status(current_user: User = Depends(get_current_superuser)):
+    """
+    获取重新打标签任务的状态、累计进度和处理速度
+    """
+    return retag_runner.status()
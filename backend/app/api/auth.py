@@ -172,7 +172,7 @@ async def get_user_statistics(
     包括事件总数、分类统计、加入时间等
     """
     try:
-        stats = user_service.get_user_statistics(current_user.id)
+        stats = user_service.get_user_statistics(current_user)
         return stats
     except Exception as e:
         raise HTTPException(
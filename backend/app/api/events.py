@@ -1,4 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
@@ -8,36 +11,135 @@ import re
 from bs4 import BeautifulSoup
 import os
 import hashlib
+import uuid
 from urllib.parse import urljoin, urlparse
 
-from ..database import get_db, Event as DBEvent, Tag as DBTag, User
-from ..core.dependencies import get_current_active_user
+import anyio
+
+from ..database import (
+    get_db,
+    engine,
+    SessionLocal,
+    Event as DBEvent,
+    User,
+)
+from ..core.dependencies import check_data_etag, get_current_active_user
+from ..core.metrics import register_metrics
+from ..core.pagination import decode_cursor, encode_cursor
 from ..models import (
+    BulkEventCreate,
+    BulkEventResponse,
     Event,
     EventCreate,
     EventUpdate,
+    ImportResponse,
     TimelineResponse,
     SearchRequest,
     Tag,
 )
+from ..services.analysis_cache import AnalysisCache
+from ..services.bulk_events import STATUS_CREATED, create_events
+from ..services.data_version import bump_data_version
+from ..services.enrichment import (
+    STATUS_PENDING,
+    EnrichmentQueue,
+    analysis_hash,
+    analysis_values,
+    enrich_event,
+    event_text,
+)
+from ..services.event_counters import (
+    count_event,
+    get_category_counts,
+    get_event_total,
+    get_month_counts,
+    move_event,
+    move_event_month,
+)
+from ..services.event_fragments import (
+    Fields,
+    event_columns,
+    event_fragments,
+    parse_fields,
+)
+from ..services.event_import import (
+    IMPORT_ID_PATTERN,
+    ChunkStream,
+    ImportBusyError,
+    ImportFormatError,
+    run_import,
+)
+from ..services.event_owner import owned_by
+from ..services.event_tags import (
+    events_with_all_tags,
+    link_event_tags,
+    set_event_tags,
+    unlink_event,
+)
+from ..services.export import (
+    EXPORT_COLUMNS,
+    EXPORT_FORMATS,
+    export_filename,
+    stream_export,
+)
+from ..services.keyword_store import KeywordReloader
+from ..services.response_cache import ResponseCacheEntry, create_response_cache
+from ..services.response_formats import (
+    MEDIA_JSON,
+    ResponseFormat,
+    negotiate,
+    render_records,
+)
+from ..services.search import get_search_backend, search_page, search_tokens
 from ..services.tag_extractor import TagExtractor
+from ..services.tag_registry import tag_registry
+from ..services.tags import split_tags
 
 router = APIRouter(prefix="/api/events", tags=["events"])
-tag_extractor = TagExtractor()
 
+# 标签分析结果缓存，相同文本重复保存时直接复用分析结果
+tag_extractor = TagExtractor(
+    cache=AnalysisCache(max_entries=int(os.getenv("TAG_ANALYSIS_CACHE_SIZE", "10000")))
+)
+register_metrics("tag_analysis_cache", tag_extractor.cache.stats)
+
+# 关键词词典热更新：定期从数据库加载新版本并原子替换匹配器
+keyword_reloader = KeywordReloader(tag_extractor, SessionLocal)
+register_metrics("keyword_dictionary", keyword_reloader.stats)
+
+# 搜索后端：PostgreSQL 使用全文检索和 trigram 索引，其他数据库使用 LIKE 匹配
+search_backend = get_search_backend(engine)
+
+# 后台标签富化队列（TAG_ENRICHMENT_MODE=background 时启用）
+enrichment_queue = EnrichmentQueue(tag_extractor, SessionLocal)
+register_metrics("enrichment_queue", enrichment_queue.stats)
+
+# 标签名到标签ID的进程内缓存
+register_metrics("tag_registry", tag_registry.stats)
+
+# 单个事件序列化后的 JSON 片段，按行版本复用
+register_metrics("event_fragments", event_fragments.stats)
+
+# 读取接口的响应缓存，按用户数据版本区分，事件变化后旧条目不再命中
+response_cache = create_response_cache()
+register_metrics("response_cache", response_cache.stats)
 
-def split_tags(tags_string: str) -> List[str]:
-    """分割标签字符串，支持中英文逗号和分号"""
-    if not tags_string:
-        return []
 
-    # 使用正则表达式分割，支持中英文逗号和分号
-    import re
+def response_format(request: Request) -> ResponseFormat:
+    """按 Accept 请求头协商事件读取接口的响应格式，默认 JSON"""
+    return negotiate(request.headers.get("accept"))
 
-    tags = re.split(r"[,，;；]", tags_string)
 
-    # 清理空白字符并过滤空字符串
-    return [tag.strip() for tag in tags if tag.strip()]
+def cached_response(
+    request: Request,
+    response: Response,
+    fmt: ResponseFormat = Depends(response_format),
+    current_user: User = Depends(get_current_active_user),
+) -> ResponseCacheEntry:
+    """本次请求的响应缓存条目"""
+    return response_cache.entry(
+        current_user.id, current_user.data_version, request, response, fmt.media_type
+    )
 
 
 @router.post("/", response_model=Event)
@@ -47,101 +149,273 @@ def create_event(
     current_user: User = Depends(get_current_active_user),
 ):
     """创建新事件"""
-
-    # 自动提取标签
-    full_text = f"{event.title} {event.description or ''}"
-    extracted_tags = tag_extractor.extract_tags(full_text)
-
-    # 自动推断分类
-    auto_category = tag_extractor.get_category(extracted_tags)
-
-    # 自动评估重要性
-    impact_score = tag_extractor.get_importance_score(full_text)
-
-    # 合并用户提供的标签和自动提取的标签
     user_tags = split_tags(event.tags or "")
-    all_tags = list(set(user_tags + extracted_tags))
 
     db_event = DBEvent(
         title=event.title,
         description=event.description,
         event_date=event.event_date or datetime.utcnow(),
-        tags=",".join(all_tags),
-        category=event.category or auto_category,
-        impact_score=impact_score,
         user_id=current_user.id,
+        search_tokens=search_tokens(event.title, event.description),
     )
 
-    db.add(db_event)
-    db.commit()
-    db.refresh(db_event)
+    if enrichment_queue.enabled:
+        # 后台模式：先保存用户提供的标签并立即返回，自动标签由富化队列补全
+        db_event.tags = ",".join(user_tags)
+        db_event.category = event.category
+        db_event.enrichment_status = STATUS_PENDING
+        count_event(db, current_user.id, event.category, db_event.event_date, 1)
+        bump_data_version(db, [current_user.id])
+        db.add(db_event)
+        db.flush()
+        link_event_tags(
+            db,
+            {db_event.id: user_tags},
+            {name: event.category for name in user_tags},
+            replace=False,
+        )
+        # 响应由提交前内存中的值构造，提交后不再读取事件
+        created = Event.model_validate(db_event)
+        db.commit()
+        if enrichment_queue.submit(created.id):
+            return created
+
+        # 队列已满时在请求内同步富化，对批量导入形成反压
+        enrich_event(db, db_event, tag_extractor)
+        db.commit()
+        db.refresh(db_event)
+        return db_event
+
+    # 先分析文本（自动标签、分类、重要性），事件以最终结果一次写入
+    text = event_text(event.title, event.description)
+    text_hash = analysis_hash(text, tag_extractor.dictionary_fingerprint)
+    analysis = tag_extractor.analyze(text)
+    values = analysis_values(analysis, user_tags, event.category, text_hash)
+    for key, value in values.items():
+        setattr(db_event, key, value)
 
-    # 保存新标签到标签表
-    for tag_name in all_tags:
-        existing_tag = db.query(DBTag).filter(DBTag.name == tag_name).first()
-        if not existing_tag:
-            db_tag = DBTag(name=tag_name, category=auto_category)
-            db.add(db_tag)
+    count_event(db, current_user.id, db_event.category, db_event.event_date, 1)
+    bump_data_version(db, [current_user.id])
+    db.add(db_event)
+    db.flush()
+    # 标签名到ID由 tag_registry 缓存，已知标签不再查询，新标签登记在自动分析的分类下
+    all_tags = split_tags(db_event.tags)
+    link_event_tags(
+        db,
+        {db_event.id: all_tags},
+        {name: analysis.category for name in all_tags},
+        replace=False,
+    )
 
+    # 只提交一次；响应由提交前内存中的值构造，省去 refresh 查询
+    created = Event.model_validate(db_event)
     db.commit()
-    return db_event
+    return created
 
 
-@router.get("/timeline", response_model=TimelineResponse)
-def get_timeline(
-    page: int = Query(1, ge=1),
-    size: int = Query(20, ge=1, le=100),
-    category: Optional[str] = None,
+@router.post("/bulk", response_model=BulkEventResponse)
+def create_events_bulk(
+    request: BulkEventCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
-    """获取时间线事件"""
-    # 临时包含没有user_id的历史数据
-    query = db.query(DBEvent).filter(
-        (DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None))
+    """批量创建事件，返回每个条目的结果，校验失败的条目不影响其他条目"""
+    results = create_events(db, current_user.id, request.events, tag_extractor)
+    created = sum(1 for result in results if result["status"] == STATUS_CREATED)
+    return BulkEventResponse(
+        created=created, failed=len(results) - created, results=results
     )
 
-    if category:
-        query = query.filter(DBEvent.category == category)
 
-    # 按事件日期降序排列
-    query = query.order_by(DBEvent.event_date.desc())
+@router.post("/import", response_model=ImportResponse)
+async def import_events(
+    request: Request,
+    import_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson 或 csv"
+    ),
+    compress: bool = Query(False, alias="gzip", description="请求体是否 gzip 压缩"),
+    import_id: Optional[str] = Query(
+        None,
+        pattern=IMPORT_ID_PATTERN,
+        description="导入ID，中断后用同一个ID重新提交同一份文件可继续；不传时自动生成",
+    ),
+    restart: bool = Query(False, description="忽略检查点，从头导入"),
+    current_user: User = Depends(get_current_active_user),
+):
+    """流式导入事件，请求体为 NDJSON 或 CSV（与导出格式相同），边接收边写入
+
+    导入在线程池中运行，请求体按块从事件循环读取，不会整体读入内存
+    """
+    import_id = import_id or uuid.uuid4().hex
+    chunks = request.stream()
 
-    # 分页
-    total = query.count()
-    events = query.offset((page - 1) * size).limit(size).all()
+    async def next_chunk():
+        return await anext(chunks, None)
 
-    return TimelineResponse(events=events, total=total, page=page, size=size)
+    def body():
+        while (chunk := anyio.from_thread.run(next_chunk)) is not None:
+            yield chunk
 
+    try:
+        progress = await run_in_threadpool(
+            run_import,
+            SessionLocal,
+            current_user.id,
+            ChunkStream(body()),
+            import_format,
+            tag_extractor,
+            import_id,
+            compress=compress,
+            restart=restart,
+        )
+    except ImportBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ImportFormatError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{e}；已提交的行已保存，修正后用导入ID {import_id} 重新提交可继续",
+        )
+    return ImportResponse(**progress.to_dict())
 
-@router.get("/search", response_model=List[Event])
-def search_events(
-    query: Optional[str] = None,
-    tags: Optional[str] = Query(None, description="逗号分隔的标签"),
+
+def event_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="逗号分隔的返回字段，默认全部；列表视图可省略 description、feedback",
+    ),
+) -> Fields:
+    """事件读取接口的字段投影"""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _timeline_cursor(event: DBEvent, direction: str) -> str:
+    """生成指向某个事件之前（prev）或之后（next）的时间线游标"""
+    return encode_cursor(
+        {"d": event.event_date.isoformat(), "i": event.id, "dir": direction}
+    )
+
+
+@router.get(
+    "/timeline",
+    response_model=TimelineResponse,
+    dependencies=[Depends(check_data_etag)],
+)
+def get_timeline(
+    page: int = Query(1, ge=1),
+    size: int = Query(20, ge=1, le=100),
     category: Optional[str] = None,
-    start_date: Optional[datetime] = None,
-    end_date: Optional[datetime] = None,
-    impact_level: Optional[str] = Query(
-        None, description="影响力级别: high, medium, low"
+    total: str = Query(
+        "estimate",
+        pattern="^(estimate|exact|none)$",
+        description="总数计算方式：estimate（读取计数器）、exact（COUNT查询）、none（不返回）",
+    ),
+    cursor: Optional[str] = Query(
+        None, description="上一次返回的 next_cursor 或 prev_cursor，传入时忽略 page"
     ),
+    fields: Fields = Depends(event_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    fmt: ResponseFormat = Depends(response_format),
+    cache: ResponseCacheEntry = Depends(cached_response),
 ):
-    """搜索事件"""
-    # 临时包含没有user_id的历史数据
-    db_query = db.query(DBEvent).filter(
-        (DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None))
-    )
+    """获取时间线事件"""
+    if cache.hit:
+        return cache.cached_response()
 
-    if query:
-        db_query = db_query.filter(
-            (DBEvent.title.contains(query)) | (DBEvent.description.contains(query))
-        )
+    query = db.query(DBEvent).filter(owned_by(current_user.id))
+
+    if category:
+        query = query.filter(DBEvent.category == category)
 
+    if total == "exact":
+        event_total = query.count()
+    elif total == "estimate":
+        event_total = get_event_total(db, [current_user.id], category)
+    else:
+        event_total = None
+
+    # 只查询响应需要的列，结果是普通的行而不是 ORM 实体
+    query = query.with_entities(*event_columns(fields))
+    # 按事件日期降序排列，日期相同时按ID降序，保证顺序稳定
+    sort_key = tuple_(DBEvent.event_date, DBEvent.id)
+    newest_first = (DBEvent.event_date.desc(), DBEvent.id.desc())
+
+    if cursor is None:
+        # 兼容模式：页码分页，同时返回游标以便客户端切换到游标分页
+        events = (
+            query.order_by(*newest_first)
+            .offset((page - 1) * size)
+            .limit(size + 1)
+            .all()
+        )
+        has_older = len(events) > size
+        has_newer = page > 1
+    else:
+        try:
+            position = decode_cursor(cursor)
+            anchor = tuple_(datetime.fromisoformat(position["d"]), int(position["i"]))
+            direction = position["dir"]
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="无效的分页游标")
+
+        if direction == "prev":
+            # 向前翻页：取比游标更新的事件，升序取出后再反转
+            events = (
+                query.filter(sort_key > anchor)
+                .order_by(DBEvent.event_date.asc(), DBEvent.id.asc())
+                .limit(size + 1)
+                .all()
+            )
+            has_newer = len(events) > size
+            events = events[:size][::-1]
+            has_older = True
+        else:
+            events = (
+                query.filter(sort_key < anchor)
+                .order_by(*newest_first)
+                .limit(size + 1)
+                .all()
+            )
+            has_older = len(events) > size
+            has_newer = True
+
+    events = events[:size]
+    # 与 TimelineResponse 的字段顺序一致
+    page_fields = {
+        "total": event_total,
+        "page": page if cursor is None else None,
+        "size": size,
+        "next_cursor": (
+            _timeline_cursor(events[-1], "next") if events and has_older else None
+        ),
+        "prev_cursor": (
+            _timeline_cursor(events[0], "prev") if events and has_newer else None
+        ),
+    }
+    if fmt.media_type == MEDIA_JSON:
+        content = event_fragments.render_timeline(events, fields, **page_fields)
+    else:
+        content = fmt.encode({"events": fmt.events(events, fields), **page_fields})
+    return cache.store(content)
+
+
+def filter_events(
+    db_query,
+    tags: Optional[str],
+    category: Optional[str],
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+    impact_level: Optional[str],
+):
+    """搜索和导出共用的筛选条件"""
     if tags:
+        # 按关联表取同时带有全部标签的事件，走 (tag_id, event_id) 索引
         tag_list = split_tags(tags)
-        for tag in tag_list:
-            db_query = db_query.filter(DBEvent.tags.contains(tag))
+        if tag_list:
+            db_query = db_query.filter(DBEvent.id.in_(events_with_all_tags(tag_list)))
 
     if category:
         db_query = db_query.filter(DBEvent.category == category)
@@ -162,28 +436,139 @@ def search_events(
         elif impact_level == "low":
             db_query = db_query.filter(DBEvent.impact_score < 4)
 
-    return db_query.order_by(DBEvent.event_date.desc()).limit(50).all()
+    return db_query
+
+
+@router.get(
+    "/search", response_model=List[Event], dependencies=[Depends(check_data_etag)]
+)
+def search_events(
+    response: Response,
+    query: Optional[str] = None,
+    tags: Optional[str] = Query(None, description="逗号分隔的标签"),
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    impact_level: Optional[str] = Query(
+        None, description="影响力级别: high, medium, low"
+    ),
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        None, description="上一页响应头 X-Next-Cursor 中的游标"
+    ),
+    fields: Fields = Depends(event_fields),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    fmt: ResponseFormat = Depends(response_format),
+    cache: ResponseCacheEntry = Depends(cached_response),
+):
+    """搜索事件
+
+    有关键词时按相关度、影响评分和新近程度排序，否则按事件日期排序；
+    还有更多结果时，下一页的游标通过响应头 X-Next-Cursor 返回
+    """
+    if cache.hit:
+        return cache.cached_response()
+
+    db_query = filter_events(
+        db.query(*event_columns(fields)).filter(owned_by(current_user.id)),
+        tags,
+        category,
+        start_date,
+        end_date,
+        impact_level,
+    )
+
+    try:
+        events, next_cursor = search_page(
+            db_query, search_backend, query, cursor, limit
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="无效的分页游标")
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if fmt.media_type == MEDIA_JSON:
+        return cache.store(event_fragments.render_events(events, fields))
+    return cache.store(fmt.encode(fmt.events(events, fields)))
 
 
-@router.get("/{event_id}", response_model=Event)
+@router.get("/export")
+def export_events(
+    export_format: str = Query(
+        "ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson 或 csv"
+    ),
+    compress: bool = Query(False, alias="gzip", description="是否 gzip 压缩"),
+    query: Optional[str] = None,
+    tags: Optional[str] = Query(None, description="逗号分隔的标签"),
+    category: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    impact_level: Optional[str] = Query(
+        None, description="影响力级别: high, medium, low"
+    ),
+    current_user: User = Depends(get_current_active_user),
+):
+    """流式导出事件，筛选条件与搜索相同，按事件日期降序
+
+    响应在请求结束后继续生成，导出使用自己的数据库会话
+    """
+    user_id = current_user.id
+    now = datetime.utcnow()
+
+    def build_query(db: Session):
+        db_query = filter_events(
+            db.query(*EXPORT_COLUMNS).filter(owned_by(user_id)),
+            tags,
+            category,
+            start_date,
+            end_date,
+            impact_level,
+        )
+        if query:
+            # 只用搜索后端筛选匹配的事件，不按相关度排序
+            db_query, _ = search_backend.search(db_query, query, now)
+        return db_query.order_by(DBEvent.event_date.desc(), DBEvent.id.desc())
+
+    filename = export_filename(export_format, compress)
+    return StreamingResponse(
+        stream_export(SessionLocal, build_query, export_format, compress),
+        media_type=(
+            "application/gzip" if compress else EXPORT_FORMATS[export_format][0]
+        ),
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get(
+    "/{event_id}", response_model=Event, dependencies=[Depends(check_data_etag)]
+)
 def get_event(
     event_id: int,
+    fields: Fields = Depends(event_fields),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
+    fmt: ResponseFormat = Depends(response_format),
+    cache: ResponseCacheEntry = Depends(cached_response),
 ):
     """获取单个事件"""
-    # 临时包含没有user_id的历史数据
+    if cache.hit:
+        return cache.cached_response()
+
     event = (
-        db.query(DBEvent)
+        db.query(*event_columns(fields))
         .filter(
             DBEvent.id == event_id,
-            (DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None)),
+            owned_by(current_user.id),
         )
         .first()
     )
     if not event:
         raise HTTPException(status_code=404, detail="事件未找到")
-    return event
+    if fmt.media_type == MEDIA_JSON:
+        return cache.store(event_fragments.fragment(event, fields))
+    # 列式格式下单个事件是长度为1的列
+    return cache.store(fmt.encode(fmt.event(event, fields)))
 
 
 @router.put("/{event_id}", response_model=Event)
@@ -194,12 +579,11 @@ def update_event(
     current_user: User = Depends(get_current_active_user),
 ):
     """更新事件"""
-    # 临时包含没有user_id的历史数据
     db_event = (
         db.query(DBEvent)
         .filter(
             DBEvent.id == event_id,
-            (DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None)),
+            owned_by(current_user.id),
         )
         .first()
     )
@@ -207,8 +591,22 @@ def update_event(
         raise HTTPException(status_code=404, detail="事件未找到")
 
     update_data = event.dict(exclude_unset=True)
+    # 事件日期是时间线的排序键，不允许清空
+    if "event_date" in update_data and update_data["event_date"] is None:
+        del update_data["event_date"]
+    if "category" in update_data:
+        move_event(db, db_event.user_id, db_event.category, update_data["category"])
+    if "event_date" in update_data:
+        move_event_month(
+            db, db_event.user_id, db_event.event_date, update_data["event_date"]
+        )
     for key, value in update_data.items():
         setattr(db_event, key, value)
+    if "tags" in update_data:
+        set_event_tags(db, db_event.id, split_tags(db_event.tags), db_event.category)
+    if "title" in update_data or "description" in update_data:
+        db_event.search_tokens = search_tokens(db_event.title, db_event.description)
+    bump_data_version(db, [db_event.user_id])
 
     db.commit()
     db.refresh(db_event)
@@ -222,69 +620,59 @@ def delete_event(
     current_user: User = Depends(get_current_active_user),
 ):
     """删除事件"""
-    # 临时包含没有user_id的历史数据
     db_event = (
         db.query(DBEvent)
         .filter(
             DBEvent.id == event_id,
-            (DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None)),
+            owned_by(current_user.id),
         )
         .first()
     )
     if not db_event:
         raise HTTPException(status_code=404, detail="事件未找到")
 
+    count_event(db, db_event.user_id, db_event.category, db_event.event_date, -1)
+    bump_data_version(db, [db_event.user_id])
+    unlink_event(db, db_event.id)
     db.delete(db_event)
     db.commit()
     return {"message": "事件已删除"}
 
 
-@router.get("/stats/categories")
+@router.get("/stats/categories", dependencies=[Depends(check_data_etag)])
 def get_categories_stats(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    fmt: ResponseFormat = Depends(response_format),
+    cache: ResponseCacheEntry = Depends(cached_response),
 ):
-    """获取分类统计"""
-    from sqlalchemy import func
-
-    # 临时包含没有user_id的历史数据
-    stats = (
-        db.query(DBEvent.category, func.count(DBEvent.id))
-        .filter((DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None)))
-        .group_by(DBEvent.category)
-        .all()
-    )
-    return [{"category": category, "count": count} for category, count in stats]
+    """获取分类统计（读取分类计数器）"""
+    if cache.hit:
+        return cache.cached_response()
+
+    stats = [
+        {"category": category, "count": count}
+        for category, count in get_category_counts(db, current_user.id)
+    ]
+    return cache.store(render_records(fmt, stats, ["category", "count"]))
 
 
-@router.get("/stats/timeline")
+@router.get("/stats/timeline", dependencies=[Depends(check_data_etag)])
 def get_timeline_stats(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_active_user)
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    fmt: ResponseFormat = Depends(response_format),
+    cache: ResponseCacheEntry = Depends(cached_response),
 ):
-    """获取时间线统计"""
-    from sqlalchemy import func, extract
-
-    # 按月统计
-    monthly_stats = (
-        db.query(
-            extract("year", DBEvent.event_date).label("year"),
-            extract("month", DBEvent.event_date).label("month"),
-            func.count(DBEvent.id).label("count"),
-        )
-        .filter((DBEvent.user_id == current_user.id) | (DBEvent.user_id.is_(None)))
-        .group_by("year", "month")
-        .order_by("year", "month")
-        .all()
-    )
+    """获取时间线统计（读取月度计数器）"""
+    if cache.hit:
+        return cache.cached_response()
 
-    return [
-        {
-            "year": int(year),
-            "month": int(month),
-            "count": count,
-            "date": f"{int(year)}-{int(month):02d}",
-        }
-        for year, month, count in monthly_stats
+    stats = [
+        {"year": year, "month": month, "count": count, "date": f"{year}-{month:02d}"}
+        for year, month, count in get_month_counts(db, current_user.id)
     ]
+    return cache.store(render_records(fmt, stats, ["year", "month", "count", "date"]))
 
 
 # 微信公众号提取请求模型
@@ -3,11 +3,12 @@ FastAPI依赖项
 """
 
 from typing import Optional
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from app.core.auth import verify_token
 from app.database import User
+from app.services.data_version import data_etag, etag_matches
 from app.services.user_service import UserService
 
 # HTTP Bearer 认证方案
@@ -77,6 +78,21 @@ def get_current_superuser(
     return current_user
 
 
+def check_data_etag(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+) -> str:
+    """事件读取接口的条件请求：数据版本未变时返回 304，不再执行接口中的查询"""
+    etag = data_etag(current_user, request)
+    # 按用户返回的数据，只允许浏览器缓存，每次使用前重新验证
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return etag
+
+
 def get_user_service(db: Session = Depends(get_db)) -> UserService:
     """获取用户服务实例"""
     return UserService(db)
@@ -0,0 +1,19 @@
+"""
+运行时指标注册表
+
+各模块注册返回字典的指标函数，由 /metrics 接口统一输出
+"""
+
+from typing import Callable, Dict
+
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    """注册一组指标"""
+    _providers[name] = provider
+
+
+def collect_metrics() -> Dict[str, dict]:
+    """收集所有已注册的指标"""
+    return {name: provider() for name, provider in _providers.items()}
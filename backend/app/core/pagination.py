@@ -0,0 +1,29 @@
+"""
+游标分页工具
+
+游标是排序键的 JSON 经 base64url 编码后的字符串，对客户端不透明。
+按排序键定位下一页（keyset 分页），深翻页的开销与页码无关，
+翻页期间插入新事件也不会导致重复或遗漏。
+"""
+
+import base64
+import json
+from typing import Any, Dict
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """把排序键编码为游标"""
+    raw = json.dumps(position, separators=(",", ":"), ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """解码游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (UnicodeError, ValueError) as e:
+        raise ValueError("无效的分页游标") from e
+    if not isinstance(position, dict):
+        raise ValueError("无效的分页游标")
+    return position
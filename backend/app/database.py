@@ -1,5 +1,6 @@
 from sqlalchemy import (
     create_engine,
+    event,
     Column,
     Integer,
     String,
@@ -7,9 +8,13 @@ from sqlalchemy import (
     Text,
     Boolean,
     ForeignKey,
+    Index,
+    UniqueConstraint,
+    text,
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy.pool import StaticPool
 from datetime import datetime
 import os
 
@@ -40,6 +45,39 @@ def get_database_url():
 # 获取数据库连接URL
 DATABASE_URL = get_database_url()
 
+# SQLite 连接参数：WAL 模式下读写互不阻塞，其余为单机部署的常用调优
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",  # WAL 模式下只在检查点时同步磁盘
+    "foreign_keys": "ON",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),  # 毫秒
+    "cache_size": -64000,  # 负数单位为KB，即64MB页缓存
+    "temp_store": "MEMORY",
+    "mmap_size": 268435456,  # 256MB
+}
+
+
+def is_sqlite_url(url: str) -> bool:
+    """是否为 SQLite 数据库URL"""
+    return url.startswith("sqlite")
+
+
+def configure_sqlite_engine(engine):
+    """为 SQLite 引擎的每个新连接设置 PRAGMA，并由 SQLAlchemy 控制事务"""
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        # 关闭 pysqlite 自带的隐式事务，否则 SAVEPOINT（begin_nested）无法正常回滚
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _on_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
 
 def create_engine_with_config():
     """创建数据库引擎，适配不同环境"""
@@ -51,8 +89,14 @@ def create_engine_with_config():
         "pool_recycle": 3600,  # 1小时后回收连接
     }
 
-    # 开发环境配置
-    if os.getenv("RAILWAY_ENVIRONMENT") != "production":
+    if is_sqlite_url(DATABASE_URL):
+        # SQLite：连接在线程池的线程间共享，内存数据库只能使用同一个连接
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        if DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+            engine_kwargs["poolclass"] = StaticPool
+        print("🪶 配置 SQLite 数据库引擎（WAL 模式）")
+    elif os.getenv("RAILWAY_ENVIRONMENT") != "production":
+        # 开发环境配置
         engine_kwargs.update(
             {
                 "echo": False,  # 可以设为True查看SQL调试
@@ -74,6 +118,8 @@ def create_engine_with_config():
 
     try:
         engine = create_engine(DATABASE_URL, **engine_kwargs)
+        if is_sqlite_url(DATABASE_URL):
+            configure_sqlite_engine(engine)
 
         # 测试连接
         with engine.connect() as conn:
@@ -116,6 +162,8 @@ class User(Base):
     is_superuser = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # 事件数据版本，用户的事件每次变化加一，用于生成 ETag
+    data_version = Column(Integer, default=0, server_default="0", nullable=False)
 
     # 关系：用户拥有的事件
     events = relationship("Event", back_populates="user")
@@ -135,6 +183,22 @@ class Event(Base):
     impact_score = Column(Integer, default=0)  # 影响评分 0-10
     feedback = Column(Text)  # 后续反馈
     is_reviewed = Column(Boolean, default=False)
+    # 标签富化状态：pending（等待后台分析）、done、failed
+    enrichment_status = Column(String(20), default="done", server_default="done")
+    # 最近一次自动分析的结果，用于重新打标签时区分用户标签和自动标签
+    auto_tags = Column(String(500))
+    auto_category = Column(String(50))  # 分类由自动分析得出时记录，用户指定时为空
+    analysis_hash = Column(String(32))  # 分析文本与词典指纹的哈希
+    # jieba 分词后以空格分隔的搜索词；PostgreSQL 上由生成列 search_vector 建全文索引
+    search_tokens = Column(Text)
+    # 行版本：每次 UPDATE 加一（包括 Core 批量更新），用作事件 JSON 片段缓存的键
+    row_version = Column(
+        Integer,
+        default=1,
+        server_default="1",
+        nullable=False,
+        onupdate=text("row_version + 1"),
+    )
 
     # 用户关联（外键）
     user_id = Column(
@@ -144,6 +208,20 @@ class Event(Base):
     # 关系：事件属于的用户
     user = relationship("User", back_populates="events")
 
+    __table_args__ = (
+        # 时间线按 (event_date, id) 游标分页
+        Index("ix_events_event_date_id", "event_date", "id"),
+        # 按用户查询时间线、搜索和统计；降序与 ORDER BY 一致，游标条件是索引范围
+        Index("ix_events_user_date_id", user_id, event_date.desc(), id.desc()),
+        Index(
+            "ix_events_user_category_date",
+            user_id,
+            category,
+            event_date.desc(),
+            id.desc(),
+        ),
+    )
+
 
 # 标签模型
 class Tag(Base):
@@ -156,6 +234,90 @@ class Tag(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
 
+# 事件与标签的关联
+class EventTag(Base):
+    __tablename__ = "event_tags"
+
+    event_id = Column(Integer, ForeignKey("events.id"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("tags.id"), primary_key=True)
+
+    # 按标签查找事件
+    __table_args__ = (Index("ix_event_tags_tag_id_event_id", "tag_id", "event_id"),)
+
+
+# 事件计数器：按 (用户, 分类) 维护的事件数量
+class EventCounter(Base):
+    __tablename__ = "event_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)  # 0 表示没有用户的早期事件
+    category = Column(String(50), nullable=False)  # 空字符串表示没有分类
+    count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "category", name="uq_event_counters_user_category"),
+    )
+
+
+# 事件月度计数器：按 (用户, 事件日期的年月) 统计事件数量，与事件修改在同一事务中更新
+class EventMonthCounter(Base):
+    __tablename__ = "event_month_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)  # 0 表示没有用户的早期事件
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    count = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "year", "month", name="uq_event_month_counters_user_month"
+        ),
+    )
+
+
+# 关键词词典版本模型：每个版本是一份完整的词典快照
+class KeywordDictionaryVersion(Base):
+    __tablename__ = "keyword_dictionary_versions"
+
+    id = Column(Integer, primary_key=True, index=True)  # 版本号，单调递增
+    note = Column(String(200))
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+# 关键词词条模型
+class KeywordEntry(Base):
+    __tablename__ = "keyword_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(
+        Integer,
+        ForeignKey("keyword_dictionary_versions.id"),
+        index=True,
+        nullable=False,
+    )
+    kind = Column(String(20), nullable=False)  # category（分类）或 importance（重要性）
+    group_name = Column(String(50), nullable=False)  # 分类名或重要性级别
+    keyword = Column(String(100), nullable=False)
+    position = Column(Integer, nullable=False)  # 词条在词典中的顺序
+
+
+# 后台任务进度检查点，任务中断后从这里继续
+class JobCheckpoint(Base):
+    __tablename__ = "job_checkpoints"
+
+    job_name = Column(String(100), primary_key=True)
+    status = Column(String(20), nullable=False)  # running、done、stopped、failed
+    last_id = Column(Integer, default=0, nullable=False)  # 已处理的最大事件ID
+    processed = Column(Integer, default=0, nullable=False)
+    updated = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    error = Column(Text)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime)
+
+
 # 创建所有表
 def create_tables():
     """创建数据库表结构"""
@@ -165,6 +327,11 @@ def create_tables():
         Base.metadata.create_all(bind=engine)
         print("✅ 数据库表创建成功")
 
+        # 对已有的表执行增量结构迁移
+        from .migrations import run_migrations
+
+        run_migrations(engine)
+
         # 验证表是否正确创建
         from sqlalchemy import inspect
 
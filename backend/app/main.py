@@ -2,7 +2,9 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from .database import create_tables
-from .api import events, auth
+from .api import events, auth, admin
+from .core.metrics import collect_metrics
+from .services.segment_dict import get_tokenizer
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -42,17 +44,34 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # 搜索结果的下一页游标
 )
 
 # 注册路由
 app.include_router(auth.router)  # 认证路由
 app.include_router(events.router)  # 事件路由
+app.include_router(admin.router)  # 管理路由
 
 
 # 启动时创建数据库表
 @app.on_event("startup")
 async def startup_event():
     create_tables()
+    # 预加载分词词典，避免首个创建事件的请求承担加载开销
+    get_tokenizer()
+    # 加载数据库中的关键词词典，并定期检查新版本
+    events.keyword_reloader.start()
+    # 启动后台标签富化队列（仅在后台模式下生效）
+    events.enrichment_queue.start()
+
+
+# 关闭时排空标签富化队列，并释放批量标签提取的进程池
+@app.on_event("shutdown")
+async def shutdown_event():
+    events.enrichment_queue.shutdown()
+    admin.retag_runner.stop()
+    events.keyword_reloader.stop()
+    events.tag_extractor.shutdown_pool()
 
 
 # 根路径
@@ -67,6 +86,12 @@ async def health():
     return {"status": "healthy", "message": "大事记应用运行正常"}
 
 
+# 运行时指标
+@app.get("/metrics")
+async def metrics():
+    return collect_metrics()
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -0,0 +1,307 @@
+"""
+数据库结构迁移
+
+create_all 只会创建缺失的表，不会修改已有的表结构。这里按顺序登记增量迁移，
+每个迁移只执行一次，执行记录保存在 schema_migrations 表中。
+新建的数据库由 create_all 直接建出最新结构，迁移需要能在这种情况下安全跳过。
+"""
+
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    """判断表中是否已有某个字段"""
+    return column in {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _add_column(conn: Connection, table: str, column: str, ddl: str) -> None:
+    """为已有表添加字段（字段已存在时跳过）"""
+    if not _has_column(conn, table, column):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _event_enrichment_status(conn: Connection) -> None:
+    """事件增加标签富化状态，已有事件视为已完成"""
+    _add_column(conn, "events", "enrichment_status", "VARCHAR(20) DEFAULT 'done'")
+
+
+def _seed_keyword_dictionary(conn: Connection) -> None:
+    """把内置的关键词词典发布为数据库中的第一个版本"""
+    from .services.keyword_store import get_latest_version, publish_dictionary
+    from .services.tag_extractor import (
+        DEFAULT_CATEGORY_KEYWORDS,
+        DEFAULT_IMPORTANCE_KEYWORDS,
+    )
+
+    db = Session(bind=conn)
+    try:
+        if get_latest_version(db) is None:
+            publish_dictionary(
+                db,
+                DEFAULT_CATEGORY_KEYWORDS,
+                DEFAULT_IMPORTANCE_KEYWORDS,
+                note="内置默认词典",
+            )
+    finally:
+        db.close()
+
+
+def _event_analysis_columns(conn: Connection) -> None:
+    """事件增加自动分析结果字段，已有事件为空，重新打标签时补齐"""
+    _add_column(conn, "events", "auto_tags", "VARCHAR(500)")
+    _add_column(conn, "events", "auto_category", "VARCHAR(50)")
+    _add_column(conn, "events", "analysis_hash", "VARCHAR(32)")
+
+
+def _event_timeline_index(conn: Connection) -> None:
+    """补齐缺失的事件日期，并为时间线游标分页建立 (event_date, id) 索引"""
+    conn.execute(
+        text(
+            "UPDATE events SET event_date = COALESCE(created_at, CURRENT_TIMESTAMP) "
+            "WHERE event_date IS NULL"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_events_event_date_id "
+            "ON events (event_date, id)"
+        )
+    )
+
+
+def _event_counters(conn: Connection) -> None:
+    """根据已有事件初始化事件计数器"""
+    from .services.event_counters import rebuild_counters
+
+    rebuild_counters(conn)
+
+
+def _event_tags(conn: Connection) -> None:
+    """根据事件的标签字符串回填事件与标签的关联表"""
+    from .services.event_tags import link_event_tags
+    from .services.tags import split_tags
+
+    db = Session(bind=conn)
+    try:
+        last_id = 0
+        while True:
+            rows = db.execute(
+                text(
+                    "SELECT id, tags, category FROM events WHERE id > :last_id "
+                    "ORDER BY id LIMIT 1000"
+                ),
+                {"last_id": last_id},
+            ).all()
+            if not rows:
+                break
+            event_tags = {row.id: split_tags(row.tags) for row in rows}
+            tag_categories = {}
+            for row in rows:
+                for tag in event_tags[row.id]:
+                    tag_categories.setdefault(tag, row.category or "其他")
+            link_event_tags(db, event_tags, tag_categories)
+            last_id = rows[-1].id
+    finally:
+        db.close()
+
+
+def _event_search(conn: Connection) -> None:
+    """事件增加搜索词字段；PostgreSQL 上建立全文检索和 trigram 索引
+
+    已有事件的搜索词由 retag_events.py 补齐，补齐前仍可通过 trigram 索引匹配
+    """
+    _add_column(conn, "events", "search_tokens", "TEXT")
+    if conn.dialect.name != "postgresql":
+        return
+
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    if not _has_column(conn, "events", "search_vector"):
+        conn.execute(
+            text(
+                "ALTER TABLE events ADD COLUMN search_vector tsvector "
+                "GENERATED ALWAYS AS "
+                "(to_tsvector('simple', coalesce(search_tokens, ''))) STORED"
+            )
+        )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_events_search_vector "
+            "ON events USING gin (search_vector)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_events_title_trgm "
+            "ON events USING gin (title gin_trgm_ops)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_events_description_trgm "
+            "ON events USING gin (description gin_trgm_ops)"
+        )
+    )
+
+
+def _event_fts(conn: Connection) -> None:
+    """SQLite 上建立 FTS5 全文索引表，由触发器随 events 同步，并导入已有事件
+
+    SQLite 没有 trigram 索引兜底，这里直接补齐早期事件的搜索词
+    """
+    from .services.search import FTS_TABLE, search_tokens, sqlite_has_fts5
+
+    if conn.dialect.name != "sqlite" or not sqlite_has_fts5(conn):
+        return
+
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            text(
+                "SELECT id, title, description FROM events "
+                "WHERE id > :last_id AND search_tokens IS NULL ORDER BY id LIMIT 1000"
+            ),
+            {"last_id": last_id},
+        ).all()
+        if not rows:
+            break
+        conn.execute(
+            text("UPDATE events SET search_tokens = :tokens WHERE id = :id"),
+            [
+                {"id": row.id, "tokens": search_tokens(row.title, row.description)}
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    # 外部内容表：只保存索引，字段内容从 events 的同名字段读取
+    conn.execute(
+        text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "search_tokens, tags, content='events', content_rowid='id')"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON events "
+            f"BEGIN INSERT INTO {FTS_TABLE} (rowid, search_tokens, tags) "
+            "VALUES (new.id, new.search_tokens, new.tags); END"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON events "
+            f"BEGIN INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, search_tokens, tags) "
+            "VALUES ('delete', old.id, old.search_tokens, old.tags); END"
+        )
+    )
+    conn.execute(
+        text(
+            f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update "
+            "AFTER UPDATE OF search_tokens, tags ON events "
+            f"BEGIN INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, search_tokens, tags) "
+            "VALUES ('delete', old.id, old.search_tokens, old.tags); "
+            f"INSERT INTO {FTS_TABLE} (rowid, search_tokens, tags) "
+            "VALUES (new.id, new.search_tokens, new.tags); END"
+        )
+    )
+    conn.execute(text(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def _event_owner(conn: Connection) -> None:
+    """早期没有 user_id 的事件归属到用户名下，建立按用户查询的复合索引"""
+    from .services.event_owner import assign_legacy_events, count_legacy_events
+
+    db = Session(bind=conn)
+    try:
+        assign_legacy_events(db)
+        db.flush()
+        remaining = count_legacy_events(db)
+        if remaining:
+            print(
+                f"⚠️  还没有用户，{remaining} 条早期事件暂未归属，"
+                "注册用户后运行 assign_legacy_events.py"
+            )
+    finally:
+        db.close()
+
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_events_user_date_id "
+            "ON events (user_id, event_date DESC, id DESC)"
+        )
+    )
+    conn.execute(
+        text(
+            "CREATE INDEX IF NOT EXISTS ix_events_user_category_date "
+            "ON events (user_id, category, event_date DESC, id DESC)"
+        )
+    )
+
+
+def _event_month_counters(conn: Connection) -> None:
+    """根据已有事件初始化月度计数器"""
+    from .services.event_counters import rebuild_month_counters
+
+    rebuild_month_counters(conn)
+
+
+def _user_data_version(conn: Connection) -> None:
+    """用户增加事件数据版本"""
+    _add_column(conn, "users", "data_version", "INTEGER NOT NULL DEFAULT 0")
+
+
+def _event_row_version(conn: Connection) -> None:
+    """事件增加行版本"""
+    _add_column(conn, "events", "row_version", "INTEGER NOT NULL DEFAULT 1")
+
+
+# 按执行顺序登记的迁移：(迁移ID, 迁移函数)
+# 只增加字段的迁移排在用到该字段的迁移之前：ORM 的 UPDATE 会带上
+# events.row_version 的 onupdate，0009 归属早期事件时该字段必须已经存在
+MIGRATIONS: List[Tuple[str, Callable[[Connection], None]]] = [
+    ("0001_event_enrichment_status", _event_enrichment_status),
+    ("0002_seed_keyword_dictionary", _seed_keyword_dictionary),
+    ("0003_event_analysis_columns", _event_analysis_columns),
+    ("0004_event_timeline_index", _event_timeline_index),
+    ("0005_event_counters", _event_counters),
+    ("0006_event_tags", _event_tags),
+    ("0007_event_search", _event_search),
+    ("0008_event_fts", _event_fts),
+    ("0012_event_row_version", _event_row_version),
+    ("0009_event_owner", _event_owner),
+    ("0010_event_month_counters", _event_month_counters),
+    ("0011_user_data_version", _user_data_version),
+]
+
+
+def run_migrations(engine: Engine) -> None:
+    """执行所有尚未执行的迁移"""
+    with engine.begin() as conn:
+        # 多个工作进程同时启动时，只允许一个进程执行迁移
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(20240601)"))
+
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "id VARCHAR(100) PRIMARY KEY, "
+                "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+            )
+        )
+        applied = {
+            row[0] for row in conn.execute(text("SELECT id FROM schema_migrations"))
+        }
+
+        for migration_id, migrate in MIGRATIONS:
+            if migration_id in applied:
+                continue
+            print(f"🔧 执行数据库迁移: {migration_id}")
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (id) VALUES (:id)"),
+                {"id": migration_id},
+            )
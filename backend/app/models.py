@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, validator
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 
 # 事件基础模型
@@ -17,6 +17,12 @@ class EventCreate(EventBase):
     pass
 
 
+# 导入事件的单行，导出文件中的反馈和复盘状态也一并导入
+class EventImport(EventCreate):
+    feedback: Optional[str] = None
+    is_reviewed: bool = False
+
+
 # 更新事件模型
 class EventUpdate(BaseModel):
     title: Optional[str] = None
@@ -36,11 +42,57 @@ class Event(EventBase):
     impact_score: int
     feedback: Optional[str] = None
     is_reviewed: bool
+    enrichment_status: Optional[str] = None
 
     class Config:
         from_attributes = True
 
 
+# 批量创建事件请求模型：条目逐个校验，单个条目无效不影响其他条目
+class BulkEventCreate(BaseModel):
+    events: List[Any]
+
+    @validator("events")
+    def validate_events(cls, v):
+        if not 1 <= len(v) <= 5000:
+            raise ValueError("每次需提交1-5000个事件")
+        return v
+
+
+# 批量创建事件的单个条目结果
+class BulkEventResult(BaseModel):
+    index: int  # 条目在请求中的位置
+    status: str  # created 或 failed
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+# 批量创建事件响应模型
+class BulkEventResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkEventResult]
+
+
+# 流式导入事件响应模型
+class ImportRejectedRow(BaseModel):
+    line: int  # 源文件中的行号
+    error: str
+
+
+class ImportResponse(BaseModel):
+    import_id: str  # 中断后用同一个导入ID重新提交同一份文件可继续
+    status: str  # done、failed
+    last_line: int  # 已提交的最后一行
+    processed: int  # 累计处理的行数（含被拒绝的行）
+    imported: int
+    rejected: int
+    resumed_from: int  # 本次从该行之后开始导入
+    elapsed: float
+    rows_per_sec: float
+    errors: List[ImportRejectedRow]  # 本次被拒绝的行（最多列出100行）
+
+
 # 标签基础模型
 class TagBase(BaseModel):
     name: str
@@ -65,9 +117,11 @@ class Tag(TagBase):
 # 时间线响应模型
 class TimelineResponse(BaseModel):
     events: List[Event]
-    total: int
-    page: int
+    total: Optional[int] = None  # total=none 时为空
+    page: Optional[int] = None  # 游标分页时为空
     size: int
+    next_cursor: Optional[str] = None  # 更早的一页，没有更多时为空
+    prev_cursor: Optional[str] = None  # 更新的一页，已在最前时为空
 
 
 # 搜索请求模型
@@ -79,6 +133,43 @@ class SearchRequest(BaseModel):
     end_date: Optional[datetime] = None
 
 
+# 关键词词典模型
+class KeywordDictionary(BaseModel):
+    version: Optional[int] = None
+    category_keywords: Dict[str, List[str]]
+    importance_keywords: Dict[str, List[str]]
+
+
+# 发布关键词词典模型
+class KeywordDictionaryUpdate(BaseModel):
+    category_keywords: Dict[str, List[str]]
+    importance_keywords: Dict[str, List[str]]
+    note: Optional[str] = None
+
+    @validator("category_keywords", "importance_keywords")
+    def validate_keywords(cls, v):
+        for group_name, keywords in v.items():
+            if not group_name or len(group_name) > 50:
+                raise ValueError("分组名称长度需在1-50之间")
+            if any(not keyword or len(keyword) > 100 for keyword in keywords):
+                raise ValueError("关键词长度需在1-100之间")
+        return v
+
+
+# 重新打标签任务请求模型
+class RetagRequest(BaseModel):
+    restart: bool = False  # 忽略检查点，从头开始
+    force: bool = False  # 文本和词典都未变化的事件也重新分析
+    reset_legacy: bool = False  # 没有自动分析记录的早期事件，丢弃原有标签和分类
+    chunk_size: int = 1000
+
+    @validator("chunk_size")
+    def validate_chunk_size(cls, v):
+        if not 1 <= v <= 10000:
+            raise ValueError("分块大小需在1-10000之间")
+        return v
+
+
 # 用户相关的Pydantic模型
 class UserBase(BaseModel):
     """用户基础模型"""
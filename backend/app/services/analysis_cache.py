@@ -0,0 +1,78 @@
+"""
+标签分析结果缓存
+
+以规范化文本和关键词词典版本的哈希作为键，缓存 TagExtractor 的分析结果。
+重复保存的事件或大量相同模板的导入文章可直接命中缓存，跳过分词和正则提取。
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+
+
+def normalize_text(text: str) -> str:
+    """规范化待分析文本（首尾空白不影响分析结果）"""
+    return (text or "").strip()
+
+
+def make_cache_key(text: str, dictionary_version: str) -> str:
+    """根据规范化文本和词典版本生成缓存键"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(dictionary_version.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class AnalysisCache:
+    """线程安全的有界 LRU 缓存，带命中/未命中/淘汰计数"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, object]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        """读取缓存，命中时返回结果副本"""
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # 返回副本，避免调用方修改缓存中的标签列表
+        return replace(analysis, tags=list(analysis.tags))
+
+    def put(self, key: str, analysis) -> None:
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = replace(analysis, tags=list(analysis.tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """清空缓存（计数保留）"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """缓存指标"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
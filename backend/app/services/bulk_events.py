@@ -0,0 +1,190 @@
+"""
+批量创建事件
+
+一次请求创建数千个事件：先逐条校验，再批量分析文本，用多行
+INSERT ... RETURNING 写入事件，一条 INSERT ... ON CONFLICT DO NOTHING
+登记新标签，计数器和标签关联也批量写入，全部在同一个事务中提交。
+校验失败的条目单独报告，不影响其他条目；写入数据库失败时整批回滚。
+批量创建总是在请求内完成标签分析，不经过后台富化队列。
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..database import Event as DBEvent
+from ..models import EventCreate
+from .data_version import bump_data_version
+from .enrichment import analysis_hash, analysis_values, event_text
+from .event_counters import (
+    CounterKey,
+    MonthKey,
+    adjust_counters,
+    counter_key,
+    month_key,
+)
+from .event_tags import link_event_tags
+from .search import search_tokens
+from .tag_extractor import TagExtractor
+from .tags import split_tags
+
+_events = DBEvent.__table__
+
+# 条目结果状态
+STATUS_CREATED = "created"
+STATUS_FAILED = "failed"
+
+# 与 events 表字段的长度一致，超长的条目在写入前拒绝，避免整批写入失败
+MAX_TITLE_LENGTH = 200
+MAX_TAGS_LENGTH = 500
+MAX_CATEGORY_LENGTH = 50
+
+
+def validate_event(
+    item: Any, model: Type[EventCreate] = EventCreate
+) -> Tuple[Optional[EventCreate], Optional[str]]:
+    """校验单个条目，返回 (事件, 错误信息)"""
+    try:
+        event = model(**item)
+    except ValidationError as e:
+        return None, "; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+            for error in e.errors()
+        )
+    except TypeError:
+        return None, "条目必须是对象"
+
+    if not event.title.strip():
+        return None, "标题不能为空"
+    if len(event.title) > MAX_TITLE_LENGTH:
+        return None, f"标题长度不能超过{MAX_TITLE_LENGTH}"
+    if event.category and len(event.category) > MAX_CATEGORY_LENGTH:
+        return None, f"分类长度不能超过{MAX_CATEGORY_LENGTH}"
+    if len(",".join(split_tags(event.tags))) > MAX_TAGS_LENGTH:
+        return None, f"标签总长度不能超过{MAX_TAGS_LENGTH}"
+    return event, None
+
+
+def fit_tags(values: Dict[str, Any], user_tags: List[str]) -> Dict[str, Any]:
+    """合并自动标签后超出 MAX_TAGS_LENGTH 时，按分析结果的顺序只保留放得下的
+    自动标签（用户标签的长度已在校验时检查），避免单个条目导致整批写入失败"""
+    if len(values["tags"] or "") <= MAX_TAGS_LENGTH:
+        return values
+    tags = list(dict.fromkeys(user_tags))
+    length = len(",".join(tags))
+    auto_tags = []
+    for tag in split_tags(values["auto_tags"]):
+        if tag not in tags:
+            added = len(tag) + (1 if tags else 0)
+            if length + added > MAX_TAGS_LENGTH:
+                continue
+            tags.append(tag)
+            length += added
+        auto_tags.append(tag)
+    return {**values, "tags": ",".join(tags), "auto_tags": ",".join(auto_tags)}
+
+
+def _insert_events(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """多行 INSERT ... RETURNING 写入事件，返回与 rows 顺序一致的ID"""
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLAlchemy 无法保证 SQLite 的 RETURNING 顺序，要求按参数排序时会逐行插入；
+        # SQLite 只有一个写事务，新行的ID按 VALUES 顺序递增，排序后即与 rows 对应
+        return sorted(
+            db.execute(insert(_events).returning(_events.c.id), rows).scalars().all()
+        )
+    return (
+        db.execute(
+            insert(_events).returning(_events.c.id, sort_by_parameter_order=True),
+            rows,
+        )
+        .scalars()
+        .all()
+    )
+
+
+def create_events(
+    db: Session,
+    user_id: int,
+    items: List[Any],
+    tag_extractor: TagExtractor,
+) -> List[Dict[str, Any]]:
+    """批量创建事件并提交，返回与 items 一一对应的条目结果"""
+    results: List[Dict[str, Any]] = [
+        {"index": index, "status": STATUS_FAILED, "id": None, "error": None}
+        for index in range(len(items))
+    ]
+
+    valid: List[Tuple[int, EventCreate]] = []
+    for index, item in enumerate(items):
+        event, error = validate_event(item)
+        if error:
+            results[index]["error"] = error
+        else:
+            valid.append((index, event))
+    if not valid:
+        return results
+
+    # 一次批量分析全部文本，结果顺序与输入一致
+    texts = [event_text(event.title, event.description) for _, event in valid]
+    fingerprint = tag_extractor.dictionary_fingerprint
+    analyses = tag_extractor.analyze_many(texts)
+
+    now = datetime.utcnow()
+    rows: List[Dict[str, Any]] = []
+    event_tags: List[List[str]] = []
+    tag_categories: Dict[str, Optional[str]] = {}
+    deltas: Dict[CounterKey, int] = {}
+    month_deltas: Dict[MonthKey, int] = {}
+    for (_, event), text, analysis in zip(valid, texts, analyses):
+        user_tags = split_tags(event.tags)
+        values = analysis_values(
+            analysis,
+            user_tags,
+            event.category,
+            analysis_hash(text, fingerprint),
+        )
+        values = fit_tags(values, user_tags)
+        rows.append(
+            {
+                "title": event.title,
+                "description": event.description,
+                "event_date": event.event_date or now,
+                "created_at": now,
+                "user_id": user_id,
+                "search_tokens": search_tokens(event.title, event.description),
+                **values,
+            }
+        )
+        names = split_tags(values["tags"])
+        event_tags.append(names)
+        for name in names:
+            # 与单条创建一致，新标签登记在自动分析的分类下
+            tag_categories.setdefault(name, analysis.category)
+        key = counter_key(user_id, values["category"])
+        deltas[key] = deltas.get(key, 0) + 1
+        month = month_key(user_id, rows[-1]["event_date"])
+        month_deltas[month] = month_deltas.get(month, 0) + 1
+
+    try:
+        event_ids = _insert_events(db, rows)
+        adjust_counters(db, deltas, month_deltas)
+        bump_data_version(db, [user_id])
+        link_event_tags(
+            db, dict(zip(event_ids, event_tags)), tag_categories, replace=False
+        )
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        print(f"❌ 批量创建事件失败，已回滚 {len(rows)} 条: {e}")
+        for index, _ in valid:
+            results[index]["error"] = "写入数据库失败，本批事件均未创建"
+        return results
+
+    for (index, _), event_id in zip(valid, event_ids):
+        results[index].update(status=STATUS_CREATED, id=event_id)
+    print(f"📦 批量创建事件 {len(event_ids)} 条，{len(items) - len(valid)} 条校验失败")
+    return results
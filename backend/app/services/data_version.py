@@ -0,0 +1,54 @@
+"""
+用户数据版本
+
+users.data_version 在用户的事件发生任何变化时加一，与事件的修改在同一事务中提交。
+事件读取接口的 ETag 由数据版本和请求地址计算，认证时已经读出用户，
+If-None-Match 与当前 ETag 一致时直接返回 304，不执行任何事件查询。
+"""
+
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from ..database import User
+
+_users = User.__table__
+
+# 响应格式变化时修改，使客户端缓存的旧 ETag 全部失效
+ETAG_FORMAT = "1"
+
+
+def bump_data_version(db: Session, user_ids: Iterable[Optional[int]]) -> None:
+    """若干用户的数据版本加一（不提交）"""
+    ids = sorted({user_id for user_id in user_ids if user_id})
+    if not ids:
+        return
+    # 数据版本不是用户资料，保持 updated_at 不变
+    values = {
+        "data_version": _users.c.data_version + 1,
+        "updated_at": _users.c.updated_at,
+    }
+    db.execute(update(_users).where(_users.c.id.in_(ids)).values(**values))
+
+
+def data_etag(user: User, request: Request) -> str:
+    """强 ETag：同一用户、同一地址和查询参数、同一 Accept、同一数据版本时相同"""
+    params = sorted(request.query_params.multi_items())
+    # 不同 Accept 可能协商出不同的响应格式，ETag 也要不同
+    accept = request.headers.get("accept", "")
+    key = f"{ETAG_FORMAT}:{user.id}:{request.url.path}:{params}:{accept}"
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return f'"{user.data_version or 0}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 是否命中（按 RFC 9110 用弱比较，忽略 W/ 前缀）"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
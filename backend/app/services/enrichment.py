@@ -0,0 +1,234 @@
+"""
+事件标签富化
+
+把标签分析结果（自动标签、分类、重要性评分）写回事件。
+后台模式下，创建事件时只写入用户提供的标签并立即返回，
+由进程内的有界队列和工作线程异步完成自动标签、分类、评分和标签表登记。
+"""
+
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..database import Event as DBEvent
+from .analysis_cache import make_cache_key, normalize_text
+from .data_version import bump_data_version
+from .event_counters import move_event
+from .event_tags import set_event_tags
+from .tag_extractor import TagExtractor, TextAnalysis
+from .tags import split_tags
+
+# 富化模式：inline（请求内同步完成）或 background（后台队列异步完成）
+ENRICHMENT_MODE = os.getenv("TAG_ENRICHMENT_MODE", "inline")
+# 队列容量、工作线程数，以及队列已满时提交任务的最长等待时间（秒）
+QUEUE_SIZE = int(os.getenv("TAG_ENRICHMENT_QUEUE_SIZE", "1000"))
+WORKER_COUNT = int(os.getenv("TAG_ENRICHMENT_WORKERS", "2"))
+SUBMIT_TIMEOUT = float(os.getenv("TAG_ENRICHMENT_SUBMIT_TIMEOUT", "0.5"))
+# 关闭服务时等待队列排空的最长时间（秒）
+DRAIN_TIMEOUT = float(os.getenv("TAG_ENRICHMENT_DRAIN_TIMEOUT", "30"))
+
+# 富化状态
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def event_text(title: str, description: Optional[str]) -> str:
+    """拼接用于标签分析的事件文本"""
+    return f"{title} {description or ''}"
+
+
+def analysis_hash(text: str, dictionary_fingerprint: str) -> str:
+    """分析文本与词典指纹的哈希，两者都未变化时无需重新分析"""
+    return make_cache_key(normalize_text(text), dictionary_fingerprint)
+
+
+def analysis_values(
+    analysis: TextAnalysis,
+    user_tags: List[str],
+    user_category: Optional[str],
+    text_hash: Optional[str] = None,
+) -> Dict[str, Any]:
+    """合并用户标签与自动标签，返回分析后要写入事件的字段"""
+    return {
+        "tags": ",".join(set(user_tags + analysis.tags)),
+        "category": user_category or analysis.category,
+        "impact_score": analysis.impact_score,
+        "enrichment_status": STATUS_DONE,
+        "auto_tags": ",".join(analysis.tags),
+        "auto_category": None if user_category else analysis.category,
+        "analysis_hash": text_hash,
+    }
+
+
+def apply_analysis(
+    db: Session,
+    db_event: DBEvent,
+    analysis: TextAnalysis,
+    user_tags: List[str],
+    user_category: Optional[str],
+    text_hash: Optional[str] = None,
+) -> None:
+    """合并用户标签与自动标签，写入分类、评分，并更新标签关联（不提交）
+
+    事件需要已经加入会话并 flush，以便关联表引用事件ID
+    """
+    values = analysis_values(analysis, user_tags, user_category, text_hash)
+    move_event(db, db_event.user_id, db_event.category, values["category"])
+    bump_data_version(db, [db_event.user_id])
+    for key, value in values.items():
+        setattr(db_event, key, value)
+
+    set_event_tags(db, db_event.id, split_tags(values["tags"]), analysis.category)
+
+
+def enrich_event(db: Session, db_event: DBEvent, tag_extractor: TagExtractor) -> None:
+    """根据事件当前内容完成富化（事件当前的标签和分类视为用户提供的值）"""
+    text = event_text(db_event.title, db_event.description)
+    text_hash = analysis_hash(text, tag_extractor.dictionary_fingerprint)
+    analysis = tag_extractor.analyze(text)
+    apply_analysis(
+        db,
+        db_event,
+        analysis,
+        split_tags(db_event.tags),
+        db_event.category,
+        text_hash,
+    )
+
+
+class EnrichmentQueue:
+    """进程内的有界富化队列，由若干工作线程消费"""
+
+    def __init__(
+        self,
+        tag_extractor: TagExtractor,
+        session_factory: Callable[[], Session],
+        maxsize: int = QUEUE_SIZE,
+        workers: int = WORKER_COUNT,
+        enabled: bool = ENRICHMENT_MODE == "background",
+    ):
+        self.tag_extractor = tag_extractor
+        self.session_factory = session_factory
+        self.enabled = enabled
+        self.worker_count = workers
+        self._queue: "queue.Queue[Optional[int]]" = queue.Queue(maxsize=maxsize)
+        self._threads: List[threading.Thread] = []
+        self._accepting = False
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def start(self) -> None:
+        """启动工作线程，并重新排队上次关闭前未完成的事件"""
+        if not self.enabled or self._threads:
+            return
+        self._accepting = True
+        for index in range(self.worker_count):
+            thread = threading.Thread(
+                target=self._run, name=f"enrichment-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        self._requeue_pending()
+
+    def submit(self, event_id: int) -> bool:
+        """提交富化任务；队列已满且等待超时后返回 False，由调用方同步处理"""
+        if not self._accepting:
+            return False
+        try:
+            self._queue.put(event_id, timeout=SUBMIT_TIMEOUT)
+            return True
+        except queue.Full:
+            self.rejected += 1
+            return False
+
+    def shutdown(self, timeout: float = DRAIN_TIMEOUT) -> None:
+        """停止接收新任务，等待队列排空后结束工作线程"""
+        if not self._threads:
+            return
+        self._accepting = False
+
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if self._queue.unfinished_tasks:
+            # 未处理的事件保持 pending 状态，下次启动时重新排队
+            print(f"⚠️  富化队列未排空，剩余 {self._queue.unfinished_tasks} 个任务")
+
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+
+    def stats(self) -> dict:
+        """队列指标"""
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    def _requeue_pending(self) -> None:
+        """把状态仍为 pending 的事件重新放入队列"""
+        db = self.session_factory()
+        try:
+            pending_ids = [
+                event_id
+                for (event_id,) in db.query(DBEvent.id)
+                .filter(DBEvent.enrichment_status == STATUS_PENDING)
+                .order_by(DBEvent.id)
+                .limit(self._queue.maxsize)
+            ]
+        finally:
+            db.close()
+
+        for event_id in pending_ids:
+            try:
+                self._queue.put_nowait(event_id)
+            except queue.Full:
+                break
+
+    def _run(self) -> None:
+        """工作线程主循环"""
+        while True:
+            event_id = self._queue.get()
+            try:
+                if event_id is None:
+                    return
+                self._process(event_id)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, event_id: int) -> None:
+        """富化单个事件并提交"""
+        db = self.session_factory()
+        try:
+            db_event = db.get(DBEvent, event_id)
+            if db_event is None or db_event.enrichment_status != STATUS_PENDING:
+                return
+            enrich_event(db, db_event, self.tag_extractor)
+            db.commit()
+            self.processed += 1
+        except Exception as e:
+            db.rollback()
+            self.failed += 1
+            print(f"❌ 事件 {event_id} 标签富化失败: {e}")
+            db_event = db.get(DBEvent, event_id)
+            if db_event is not None:
+                db_event.enrichment_status = STATUS_FAILED
+                bump_data_version(db, [db_event.user_id])
+                db.commit()
+        finally:
+            db.close()
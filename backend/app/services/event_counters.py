@@ -0,0 +1,245 @@
+"""
+事件计数器
+
+按 (用户, 分类) 和 (用户, 年, 月) 维护事件数量，在创建、修改、删除事件的
+同一事务中增减。时间线的总数和统计接口直接读取计数器，
+开销只与分类数和月份数有关，不再对用户的全部事件执行 COUNT(*) 或 GROUP BY。
+没有用户的早期事件（归属到用户之前）记在 user_id = 0 下，
+没有分类的事件记在空字符串分类下。计数出现偏差时用 rebuild_counters.py 重建。
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import Table, delete, extract, func, insert, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+from ..database import Event as DBEvent, EventCounter, EventMonthCounter
+
+_counters = EventCounter.__table__
+_month_counters = EventMonthCounter.__table__
+_events = DBEvent.__table__
+
+CounterKey = Tuple[int, str]
+MonthKey = Tuple[int, int, int]
+
+
+def counter_key(user_id: Optional[int], category: Optional[str]) -> CounterKey:
+    """计数器的键：(用户ID, 分类)"""
+    return (user_id or 0, category or "")
+
+
+def month_key(
+    user_id: Optional[int], event_date: Optional[datetime]
+) -> Optional[MonthKey]:
+    """月度计数器的键：(用户ID, 年, 月)；没有事件日期时不计数"""
+    if event_date is None:
+        return None
+    return (user_id or 0, event_date.year, event_date.month)
+
+
+def _upsert_counts(
+    db: Session, table: Table, key_columns: List[str], deltas: Dict[tuple, int]
+) -> None:
+    """按键批量增减计数，没有对应行时插入"""
+    rows = [
+        {**dict(zip(key_columns, key)), "count": delta}
+        for key, delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # 一条多行 INSERT ... ON CONFLICT DO UPDATE，deltas 的键不会重复；
+        # 按键排序，并发事务以相同顺序锁定计数器行，避免死锁
+        insert_func = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert_func(table).values(rows)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=key_columns,
+                set_={"count": table.c.count + stmt.excluded.count},
+            )
+        )
+        return
+
+    # 其他数据库：先更新，没有对应计数器时再插入
+    for row in rows:
+        result = db.execute(
+            update(table)
+            .where(*(table.c[column] == row[column] for column in key_columns))
+            .values(count=table.c.count + row["count"])
+        )
+        if not result.rowcount:
+            db.execute(insert(table).values(**row))
+
+
+def adjust_counters(
+    db: Session,
+    deltas: Dict[CounterKey, int],
+    month_deltas: Optional[Dict[MonthKey, int]] = None,
+) -> None:
+    """批量增减分类计数和月度计数（不提交），与事件的修改在同一事务中生效"""
+    _upsert_counts(db, _counters, ["user_id", "category"], deltas)
+    if month_deltas:
+        _upsert_counts(db, _month_counters, ["user_id", "year", "month"], month_deltas)
+
+
+def count_event(
+    db: Session,
+    user_id: Optional[int],
+    category: Optional[str],
+    event_date: Optional[datetime],
+    delta: int,
+) -> None:
+    """新增（delta=1）或删除（delta=-1）一个事件时更新计数"""
+    key = month_key(user_id, event_date)
+    adjust_counters(
+        db, {counter_key(user_id, category): delta}, {key: delta} if key else None
+    )
+
+
+def move_event(
+    db: Session,
+    user_id: Optional[int],
+    old_category: Optional[str],
+    new_category: Optional[str],
+) -> None:
+    """事件分类变化时，把计数从旧分类移到新分类"""
+    old_key = counter_key(user_id, old_category)
+    new_key = counter_key(user_id, new_category)
+    if old_key != new_key:
+        adjust_counters(db, {old_key: -1, new_key: 1})
+
+
+def move_event_month(
+    db: Session,
+    user_id: Optional[int],
+    old_date: Optional[datetime],
+    new_date: Optional[datetime],
+) -> None:
+    """事件日期跨月变化时，把计数从旧月份移到新月份"""
+    deltas: Dict[MonthKey, int] = {}
+    old_key = month_key(user_id, old_date)
+    new_key = month_key(user_id, new_date)
+    if old_key == new_key:
+        return
+    if old_key:
+        deltas[old_key] = -1
+    if new_key:
+        deltas[new_key] = 1
+    adjust_counters(db, {}, deltas)
+
+
+def get_event_total(
+    db: Session, user_ids: Iterable[Optional[int]], category: Optional[str] = None
+) -> int:
+    """从计数器读取若干用户（可限定分类）的事件总数"""
+    query = select(func.coalesce(func.sum(_counters.c.count), 0)).where(
+        _counters.c.user_id.in_([user_id or 0 for user_id in user_ids])
+    )
+    if category:
+        query = query.where(_counters.c.category == category)
+    return db.execute(query).scalar()
+
+
+def get_category_counts(db: Session, user_id: int) -> List[Tuple[Optional[str], int]]:
+    """用户各分类的事件数 [(分类, 数量)]，没有分类时为 None"""
+    rows = db.execute(
+        select(_counters.c.category, _counters.c.count)
+        .where(_counters.c.user_id == user_id, _counters.c.count > 0)
+        .order_by(_counters.c.count.desc(), _counters.c.category)
+    ).all()
+    return [(category or None, count) for category, count in rows]
+
+
+def get_month_counts(db: Session, user_id: int) -> List[Tuple[int, int, int]]:
+    """用户每月的事件数 [(年, 月, 数量)]，按年月升序"""
+    return db.execute(
+        select(_month_counters.c.year, _month_counters.c.month, _month_counters.c.count)
+        .where(_month_counters.c.user_id == user_id, _month_counters.c.count > 0)
+        .order_by(_month_counters.c.year, _month_counters.c.month)
+    ).all()
+
+
+def _drift(
+    name: str, stored: Dict[tuple, int], actual: Dict[tuple, int]
+) -> List[Tuple[str, tuple, int, int]]:
+    return [
+        (name, key, stored.get(key, 0), actual.get(key, 0))
+        for key in sorted(stored.keys() | actual.keys())
+        if stored.get(key, 0) != actual.get(key, 0)
+    ]
+
+
+def counter_drift(db: Session) -> List[Tuple[str, tuple, int, int]]:
+    """对比计数器与事件表，返回有偏差的 [(计数器表, 键, 计数器中的数量, 实际数量)]"""
+    user_id = func.coalesce(_events.c.user_id, 0)
+    category = func.coalesce(_events.c.category, "")
+    year = extract("year", _events.c.event_date)
+    month = extract("month", _events.c.event_date)
+
+    stored = {
+        (row.user_id, row.category): row.count for row in db.execute(select(_counters))
+    }
+    actual = {
+        (row[0], row[1]): row[2]
+        for row in db.execute(
+            select(user_id, category, func.count()).group_by(user_id, category)
+        )
+    }
+    stored_months = {
+        (row.user_id, row.year, row.month): row.count
+        for row in db.execute(select(_month_counters))
+    }
+    actual_months = {
+        (row[0], int(row[1]), int(row[2])): row[3]
+        for row in db.execute(
+            select(user_id, year, month, func.count())
+            .where(_events.c.event_date.is_not(None))
+            .group_by(user_id, year, month)
+        )
+    }
+    return _drift(_counters.name, stored, actual) + _drift(
+        _month_counters.name, stored_months, actual_months
+    )
+
+
+def rebuild_month_counters(conn: Union[Session, Connection]) -> None:
+    """根据事件表重新计算全部月度计数器"""
+    year = extract("year", _events.c.event_date)
+    month = extract("month", _events.c.event_date)
+    user_id = func.coalesce(_events.c.user_id, 0)
+    conn.execute(delete(_month_counters))
+    conn.execute(
+        insert(_month_counters).from_select(
+            ["user_id", "year", "month", "count"],
+            select(user_id, year, month, func.count())
+            .where(_events.c.event_date.is_not(None))
+            .group_by(user_id, year, month),
+        )
+    )
+
+
+def rebuild_counters(conn: Union[Session, Connection]) -> None:
+    """根据事件表重新计算全部计数器"""
+    dialect = conn.get_bind().dialect if isinstance(conn, Session) else conn.dialect
+    if dialect.name == "postgresql":
+        # 重建期间阻塞计数器的并发更新：已提交的事件计入重建结果，
+        # 等待锁的事务在重建提交后再增减计数，不会重复或遗漏
+        conn.execute(
+            text("LOCK TABLE event_counters, event_month_counters IN EXCLUSIVE MODE")
+        )
+    conn.execute(text("DELETE FROM event_counters"))
+    conn.execute(
+        text(
+            "INSERT INTO event_counters (user_id, category, count) "
+            "SELECT COALESCE(user_id, 0), COALESCE(category, ''), COUNT(*) "
+            "FROM events GROUP BY COALESCE(user_id, 0), COALESCE(category, '')"
+        )
+    )
+    rebuild_month_counters(conn)
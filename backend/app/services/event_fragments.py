@@ -0,0 +1,150 @@
+"""
+事件 JSON 片段缓存
+
+时间线、搜索和单个事件接口只查询响应需要的列（不经过 ORM 实体和 identity map），
+每行直接用 orjson 编码为字节（未安装时回退到 pydantic-core 的编码器），
+输出与 Event 响应模型序列化的结果一致。
+
+编码后的片段按 (事件ID, 返回字段) 缓存，并记录生成片段时的 row_version。
+事件每次更新时 row_version 加一，版本一致时片段直接复用，
+响应由片段拼接而成，只有变化过的事件需要重新编码。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+from pydantic_core import to_json
+
+from ..database import Event as DBEvent
+from ..models import Event
+
+try:
+    import orjson
+except ImportError:  # 依赖未同步的环境回退到 pydantic-core
+    orjson = None
+
+FRAGMENT_CACHE_SIZE = int(os.getenv("EVENT_FRAGMENT_CACHE_SIZE", "50000"))
+
+# Event 响应模型的字段，按序列化顺序
+EVENT_FIELDS: Tuple[str, ...] = tuple(Event.model_fields)
+# 查询时总是需要的列：片段缓存的键和时间线游标
+_KEY_FIELDS = ("id", "row_version", "event_date")
+
+Fields = Tuple[str, ...]
+
+
+def encode_json(value: Any) -> bytes:
+    """编码为 JSON 字节（紧凑格式，非 ASCII 字符不转义）"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return to_json(value)
+
+
+def parse_fields(fields: Optional[str]) -> Fields:
+    """解析逗号分隔的返回字段，按 Event 的字段顺序返回，总是包含 id；
+    未指定时返回全部字段，有未知字段时抛出 ValueError"""
+    if not fields:
+        return EVENT_FIELDS
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(EVENT_FIELDS)
+    if unknown:
+        raise ValueError(f"未知的字段: {', '.join(sorted(unknown))}")
+    requested.add("id")
+    return tuple(name for name in EVENT_FIELDS if name in requested)
+
+
+def event_columns(fields: Fields) -> List[Any]:
+    """查询指定字段所需的列"""
+    names = dict.fromkeys(_KEY_FIELDS + fields)
+    return [getattr(DBEvent, name) for name in names]
+
+
+class EventFragmentCache:
+    """线程安全的有界 LRU 缓存：(事件ID, 返回字段) -> (row_version, JSON 片段)"""
+
+    def __init__(self, max_entries: int = FRAGMENT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, Fields], Tuple[int, bytes]]" = (
+            OrderedDict()
+        )
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[int, Fields], row_version: int) -> Optional[bytes]:
+        """读取片段，版本不一致时视为未命中"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != row_version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple[int, Fields], row_version: int, fragment: bytes) -> None:
+        """写入片段，替换同一事件的旧版本，超出容量时淘汰最久未使用的条目"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[1])
+            self._entries[key] = (row_version, fragment)
+            self._bytes += len(fragment)
+            while len(self._entries) > self.max_entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def fragment(self, row: Any, fields: Fields = EVENT_FIELDS) -> bytes:
+        """按 event_columns(fields) 查询出的一行的 JSON 片段，
+        缓存中没有当前版本时编码并写入缓存"""
+        key = (row.id, fields)
+        fragment = self.get(key, row.row_version)
+        if fragment is None:
+            values = row._mapping
+            fragment = encode_json({name: values[name] for name in fields})
+            self.put(key, row.row_version, fragment)
+        return fragment
+
+    def render_events(
+        self, rows: Iterable[Any], fields: Fields = EVENT_FIELDS
+    ) -> bytes:
+        """拼接事件列表的 JSON 数组"""
+        return b"[" + b",".join(self.fragment(row, fields) for row in rows) + b"]"
+
+    def render_timeline(
+        self, rows: Iterable[Any], fields: Fields = EVENT_FIELDS, **page: Any
+    ) -> bytes:
+        """拼接 TimelineResponse：events 由片段拼接，page 为其余字段"""
+        rest = encode_json(page)
+        return b'{"events":' + self.render_events(rows, fields) + b"," + rest[1:]
+
+    def clear(self) -> None:
+        """清空缓存（计数保留）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """缓存指标"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "encoder": "orjson" if orjson is not None else "pydantic-core",
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+event_fragments = EventFragmentCache()
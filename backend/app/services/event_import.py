@@ -0,0 +1,486 @@
+"""
+流式导入事件
+
+从 NDJSON 或 CSV 字节流（与导出的格式相同，可 gzip 压缩）中逐行解析事件，
+每 IMPORT_BATCH_SIZE 行为一批：批量分析标签后写入临时暂存表
+（PostgreSQL 用 COPY FROM STDIN，SQLite 用 executemany INSERT），
+再用一条 INSERT ... SELECT 合并到 events，标签、标签关联和事件计数器随后批量写入。
+每批与导入检查点在同一事务中提交；中断后用同一个导入ID重新提交同一份文件，
+已提交的行直接跳过。内存占用只与批大小有关，与文件大小无关。
+"""
+
+import csv
+import gzip
+import io
+import json
+import os
+import time
+import zlib
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+
+from sqlalchemy import Column, Integer, MetaData, Table, delete, insert, select, text
+from sqlalchemy.orm import Session
+
+from ..database import Event as DBEvent, JobCheckpoint
+from ..models import EventImport
+from .bulk_events import fit_tags, validate_event
+from .data_version import bump_data_version
+from .enrichment import analysis_hash, analysis_values, event_text
+from .event_counters import (
+    CounterKey,
+    MonthKey,
+    adjust_counters,
+    counter_key,
+    month_key,
+)
+from .event_tags import link_event_tags
+from .search import search_tokens
+from .tag_extractor import TagExtractor
+from .tags import split_tags
+
+# 每批解析、分析并提交的行数
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "2000"))
+IMPORT_FORMATS = ("ndjson", "csv")
+# 导入ID只能包含字母、数字和 _.-，与用户ID一起作为检查点名称
+IMPORT_ID_PATTERN = r"^[A-Za-z0-9_.-]{1,64}$"
+# 结果中最多列出的被拒绝行
+MAX_REPORTED_ERRORS = 100
+# 检查点超过该时间（秒）未更新时，认为持有它的导入已中断
+STALE_AFTER = 300
+
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+_events = DBEvent.__table__
+
+# 从暂存表合并到 events 的字段
+STAGED_COLUMNS = [
+    "title",
+    "description",
+    "event_date",
+    "created_at",
+    "user_id",
+    "search_tokens",
+    "tags",
+    "category",
+    "impact_score",
+    "feedback",
+    "is_reviewed",
+    "enrichment_status",
+    "auto_tags",
+    "auto_category",
+    "analysis_hash",
+]
+
+# 每个连接一张临时表；PostgreSQL 上提交时自动清空
+_staging = Table(
+    "event_import_staging",
+    MetaData(),
+    Column("line", Integer, primary_key=True),
+    Column("id", Integer),
+    *(Column(name, _events.c[name].type) for name in STAGED_COLUMNS),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DELETE ROWS",
+)
+
+
+class ImportFormatError(ValueError):
+    """文件无法继续解析（缺少表头、编码错误等），已提交的批次保留"""
+
+
+class ImportBusyError(RuntimeError):
+    """同一个导入正在其他请求或进程中运行"""
+
+
+@dataclass
+class ImportProgress:
+    """导入进度；累计值来自检查点，errors 只包含本次运行被拒绝的行"""
+
+    import_id: str
+    status: str = STATUS_RUNNING
+    last_line: int = 0
+    processed: int = 0
+    imported: int = 0
+    rejected: int = 0
+    resumed_from: int = 0
+    elapsed: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    run_processed: int = 0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.run_processed / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("run_processed")
+        data["rows_per_sec"] = round(self.rows_per_sec, 1)
+        return data
+
+
+class ChunkStream(io.RawIOBase):
+    """把字节块迭代器（如请求体）包装成可读的二进制流"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = memoryview(chunk)
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def open_text(stream: BinaryIO, compress: bool = False) -> io.TextIOWrapper:
+    """按 UTF-8 逐块解码，忽略导出 CSV 开头的 BOM"""
+    if isinstance(stream, io.RawIOBase):
+        stream = io.BufferedReader(stream)
+    if compress:
+        stream = gzip.GzipFile(fileobj=stream, mode="rb")
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def iter_records(
+    source: io.TextIOWrapper, import_format: str, after_line: int = 0
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """逐行解析，返回 (行号, 字段, 错误信息)；跳过空行和 after_line 之前的行"""
+    if import_format == "csv":
+        yield from _iter_csv(source, after_line)
+        return
+
+    for line_number, line in enumerate(source, start=1):
+        if line_number <= after_line or not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield line_number, None, f"JSON 格式错误: {e}"
+            continue
+        if isinstance(data, dict):
+            yield line_number, data, None
+        else:
+            yield line_number, None, "每行必须是 JSON 对象"
+
+
+def _iter_csv(
+    source: io.TextIOWrapper, after_line: int
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    reader = csv.DictReader(source)
+    try:
+        if reader.fieldnames is None:
+            return
+        if "title" not in reader.fieldnames:
+            raise ImportFormatError("CSV 表头缺少 title 列")
+        for row in reader:
+            # 引号内的换行使一条记录跨多行，以记录的最后一行作为行号
+            line_number = reader.line_num
+            if line_number <= after_line:
+                continue
+            if None in row:
+                yield line_number, None, "字段数多于表头"
+                continue
+            # 空单元格视为未提供，使用默认值
+            data = {key: value for key, value in row.items() if value != ""}
+            yield line_number, data, None
+    except csv.Error as e:
+        raise ImportFormatError(f"第{reader.line_num}行 CSV 格式错误: {e}") from e
+
+
+def _copy_value(value: Any) -> str:
+    """COPY 文本格式的字段值"""
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return (
+            value.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+    return str(value)
+
+
+def _stage_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """写入暂存表"""
+    _staging.create(db.connection(), checkfirst=True)
+    if db.get_bind().dialect.name != "postgresql":
+        db.execute(insert(_staging), rows)
+        return
+
+    columns = [column.name for column in _staging.columns]
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(row.get(name)) for name in columns))
+        buffer.write("\n")
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {_staging.name} ({', '.join(columns)}) FROM STDIN", buffer
+        )
+    finally:
+        cursor.close()
+
+
+def _merge_staged(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """暂存表合并到 events，返回与 rows 顺序一致的事件ID"""
+    staged = [_staging.c[name] for name in STAGED_COLUMNS]
+    if db.get_bind().dialect.name == "postgresql":
+        # 先从序列取出整批ID写入暂存表，合并后即知道每一行对应的事件ID
+        db.execute(
+            insert(_events).from_select(
+                ["id", *STAGED_COLUMNS],
+                select(_staging.c.id, *staged).order_by(_staging.c.line),
+            )
+        )
+        return [row["id"] for row in rows]
+
+    # SQLite 只有一个写事务，新行的ID按 SELECT 的顺序递增，排序后即与 rows 对应
+    event_ids = sorted(
+        db.execute(
+            insert(_events)
+            .from_select(STAGED_COLUMNS, select(*staged).order_by(_staging.c.line))
+            .returning(_events.c.id)
+        )
+        .scalars()
+        .all()
+    )
+    db.execute(delete(_staging))
+    return event_ids
+
+
+def _allocate_ids(db: Session, count: int) -> List[Optional[int]]:
+    if db.get_bind().dialect.name != "postgresql":
+        return [None] * count
+    return (
+        db.execute(
+            text(
+                "SELECT nextval(pg_get_serial_sequence('events', 'id')) "
+                "FROM generate_series(1, :count)"
+            ),
+            {"count": count},
+        )
+        .scalars()
+        .all()
+    )
+
+
+def load_batch(
+    db: Session,
+    user_id: int,
+    batch: List[Tuple[int, EventImport]],
+    tag_extractor: TagExtractor,
+) -> List[int]:
+    """分析并写入一批已校验的事件（不提交），返回事件ID"""
+    texts = [event_text(event.title, event.description) for _, event in batch]
+    fingerprint = tag_extractor.dictionary_fingerprint
+    analyses = tag_extractor.analyze_many(texts)
+
+    now = datetime.utcnow()
+    ids = _allocate_ids(db, len(batch))
+    rows: List[Dict[str, Any]] = []
+    event_tags: List[List[str]] = []
+    tag_categories: Dict[str, Optional[str]] = {}
+    deltas: Dict[CounterKey, int] = {}
+    month_deltas: Dict[MonthKey, int] = {}
+    for (line, event), event_id, content, analysis in zip(batch, ids, texts, analyses):
+        user_tags = split_tags(event.tags)
+        values = analysis_values(
+            analysis,
+            user_tags,
+            event.category,
+            analysis_hash(content, fingerprint),
+        )
+        values = fit_tags(values, user_tags)
+        rows.append(
+            {
+                "line": line,
+                "id": event_id,
+                "title": event.title,
+                "description": event.description,
+                "event_date": event.event_date or now,
+                "created_at": now,
+                "user_id": user_id,
+                "search_tokens": search_tokens(event.title, event.description),
+                "feedback": event.feedback,
+                "is_reviewed": event.is_reviewed,
+                **values,
+            }
+        )
+        names = split_tags(values["tags"])
+        event_tags.append(names)
+        for name in names:
+            tag_categories.setdefault(name, analysis.category)
+        key = counter_key(user_id, values["category"])
+        deltas[key] = deltas.get(key, 0) + 1
+        month = month_key(user_id, rows[-1]["event_date"])
+        month_deltas[month] = month_deltas.get(month, 0) + 1
+
+    _stage_rows(db, rows)
+    event_ids = _merge_staged(db, rows)
+    adjust_counters(db, deltas, month_deltas)
+    bump_data_version(db, [user_id])
+    link_event_tags(db, dict(zip(event_ids, event_tags)), tag_categories, replace=False)
+    return event_ids
+
+
+def job_name(user_id: int, import_id: str) -> str:
+    return f"import:{user_id}:{import_id}"
+
+
+def _load_checkpoint(db: Session, name: str, restart: bool) -> JobCheckpoint:
+    """读取检查点（累计值：last_id 为已提交的最后一行，updated 为导入行数，
+    skipped 为被拒绝行数）；上次已完成时原样返回，由调用方跳过导入"""
+    checkpoint = db.get(JobCheckpoint, name)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(job_name=name)
+        db.add(checkpoint)
+        restart = True
+    elif checkpoint.status == STATUS_RUNNING:
+        # 每批提交都会刷新 updated_at，长时间未更新说明上次导入已中断
+        idle = (datetime.utcnow() - checkpoint.updated_at).total_seconds()
+        if idle < STALE_AFTER:
+            raise ImportBusyError("该导入正在进行中")
+    elif checkpoint.status == STATUS_DONE and not restart:
+        return checkpoint
+
+    if restart:
+        checkpoint.last_id = 0
+        checkpoint.processed = 0
+        checkpoint.updated = 0
+        checkpoint.skipped = 0
+        checkpoint.started_at = datetime.utcnow()
+    checkpoint.status = STATUS_RUNNING
+    checkpoint.error = None
+    checkpoint.finished_at = None
+    db.commit()
+    return checkpoint
+
+
+def run_import(
+    session_factory: Callable[[], Session],
+    user_id: int,
+    stream: BinaryIO,
+    import_format: str,
+    tag_extractor: TagExtractor,
+    import_id: str,
+    compress: bool = False,
+    restart: bool = False,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    on_progress: Optional[Callable[[ImportProgress], None]] = None,
+) -> ImportProgress:
+    """从字节流导入事件，返回导入进度；失败时检查点记录错误并重新抛出异常"""
+    name = job_name(user_id, import_id)
+    progress = ImportProgress(import_id=import_id)
+    db = session_factory()
+    started = time.monotonic()
+    checkpoint = None
+    try:
+        checkpoint = _load_checkpoint(db, name, restart)
+        progress.resumed_from = checkpoint.last_id
+
+        def _sync_progress() -> None:
+            progress.status = checkpoint.status
+            progress.last_line = checkpoint.last_id
+            progress.processed = checkpoint.processed
+            progress.imported = checkpoint.updated
+            progress.rejected = checkpoint.skipped
+            progress.elapsed = time.monotonic() - started
+
+        if checkpoint.status == STATUS_DONE:
+            print(f"📥 导入 {import_id} 已完成，跳过")
+            _sync_progress()
+            return progress
+        if checkpoint.last_id:
+            print(f"📥 导入 {import_id} 从第 {checkpoint.last_id} 行之后继续")
+
+        source = open_text(stream, compress)
+        batch: List[Tuple[int, EventImport]] = []
+        rejected = 0
+        last_line = checkpoint.last_id
+
+        def _commit_batch() -> None:
+            nonlocal batch, rejected
+            event_ids = load_batch(db, user_id, batch, tag_extractor) if batch else []
+            # 检查点与本批事件在同一事务中提交
+            checkpoint.last_id = last_line
+            checkpoint.processed += len(batch) + rejected
+            checkpoint.updated += len(event_ids)
+            checkpoint.skipped += rejected
+            db.commit()
+            progress.run_processed += len(batch) + rejected
+            batch, rejected = [], 0
+            _sync_progress()
+            print(
+                f"📥 已导入 {progress.imported} 条（拒绝 {progress.rejected}），"
+                f"{progress.rows_per_sec:.0f} 条/秒"
+            )
+            if on_progress:
+                on_progress(progress)
+
+        try:
+            for line, data, error in iter_records(
+                source, import_format, checkpoint.last_id
+            ):
+                last_line = line
+                event = None
+                if error is None:
+                    event, error = validate_event(data, EventImport)
+                if error:
+                    rejected += 1
+                    if len(progress.errors) < MAX_REPORTED_ERRORS:
+                        progress.errors.append({"line": line, "error": error})
+                else:
+                    batch.append((line, event))
+                if len(batch) + rejected >= batch_size:
+                    _commit_batch()
+        except UnicodeDecodeError as e:
+            raise ImportFormatError(f"文件不是有效的 UTF-8 编码: {e.reason}") from e
+        except (gzip.BadGzipFile, EOFError, zlib.error) as e:
+            # gzip 数据损坏或被截断
+            raise ImportFormatError(f"无法解压: {e}") from e
+
+        checkpoint.status = STATUS_DONE
+        checkpoint.finished_at = datetime.utcnow()
+        _commit_batch()
+        print(
+            f"✅ 导入 {import_id} 完成：导入 {progress.imported} 条，"
+            f"拒绝 {progress.rejected} 条"
+        )
+        return progress
+
+    except ImportBusyError:
+        raise
+    except Exception as e:
+        db.rollback()
+        if checkpoint is not None:
+            checkpoint = db.get(JobCheckpoint, name)
+            checkpoint.status = STATUS_FAILED
+            checkpoint.error = str(e)[:1000]
+            db.commit()
+        print(f"❌ 导入 {import_id} 失败: {e}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+"""
+事件归属
+
+加入用户系统之前创建的事件没有 user_id，查询曾用
+user_id = 当前用户 OR user_id IS NULL 把它们一并返回，这个 OR 让按用户的
+复合索引无法做范围扫描。现在这些事件归到第一个超级管理员（没有时为最早
+注册的用户）名下，所有查询只按 user_id 等值过滤。
+
+归属由迁移 0009_event_owner 完成。迁移时还没有任何用户的话，这些事件暂时
+不属于任何用户，注册用户后运行 assign_legacy_events.py 归属。
+"""
+
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..database import Event as DBEvent, EventCounter, EventMonthCounter, User
+from .event_counters import adjust_counters
+
+_counters = EventCounter.__table__
+_month_counters = EventMonthCounter.__table__
+
+
+def owned_by(user_id: int) -> ColumnElement:
+    """事件归属条件，由 (user_id, ...) 复合索引做范围扫描"""
+    return DBEvent.user_id == user_id
+
+
+def legacy_owner_id(db: Session) -> Optional[int]:
+    """早期事件的归属用户：第一个超级管理员，没有时为最早注册的用户"""
+    superuser_id = db.execute(
+        select(User.id).where(User.is_superuser.is_(True)).order_by(User.id).limit(1)
+    ).scalar()
+    if superuser_id is not None:
+        return superuser_id
+    return db.execute(select(User.id).order_by(User.id).limit(1)).scalar()
+
+
+def count_legacy_events(db: Session) -> int:
+    """没有 user_id 的事件数"""
+    return db.execute(
+        select(func.count()).select_from(DBEvent).where(DBEvent.user_id.is_(None))
+    ).scalar()
+
+
+def assign_legacy_events(db: Session, owner_id: Optional[int] = None) -> int:
+    """把没有 user_id 的事件归到 owner_id（默认为 legacy_owner_id）名下，
+    返回归属的事件数（不提交）；还没有任何用户时不做处理
+
+    不修改归属用户的数据版本（迁移时 users.data_version 可能还不存在），
+    迁移之外调用时由调用方更新
+    """
+    if owner_id is None:
+        owner_id = legacy_owner_id(db)
+    if owner_id is None:
+        return 0
+
+    moved = db.execute(
+        update(DBEvent.__table__)
+        .where(DBEvent.user_id.is_(None))
+        .values(user_id=owner_id)
+    ).rowcount
+    if moved:
+        # 计数器中 user_id = 0 的早期事件计数一并转到归属用户
+        legacy_counts = db.execute(
+            select(_counters.c.category, _counters.c.count).where(
+                _counters.c.user_id == 0
+            )
+        ).all()
+        deltas = {}
+        for category, count in legacy_counts:
+            deltas[(0, category)] = -count
+            deltas[(owner_id, category)] = count
+        legacy_months = db.execute(
+            select(
+                _month_counters.c.year, _month_counters.c.month, _month_counters.c.count
+            ).where(_month_counters.c.user_id == 0)
+        ).all()
+        month_deltas = {}
+        for year, month, count in legacy_months:
+            month_deltas[(0, year, month)] = -count
+            month_deltas[(owner_id, year, month)] = count
+        adjust_counters(db, deltas, month_deltas)
+        print(f"👤 {moved} 条早期事件已归属到用户 {owner_id}")
+    return moved
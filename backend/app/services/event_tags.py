@@ -0,0 +1,77 @@
+"""
+事件与标签的关联
+
+events.tags 仍保存逗号分隔的标签字符串，用于接口返回；
+event_tags 关联表记录同样的标签，按 (tag_id, event_id) 建索引，
+按标签筛选事件时走索引，而不是对标签字符串做 LIKE '%tag%' 全表扫描。
+"""
+
+from typing import Dict, List, Mapping, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from ..database import EventTag, Tag as DBTag
+from .tag_registry import tag_registry, valid_tag_names
+
+_tags = DBTag.__table__
+_event_tags = EventTag.__table__
+
+
+def ensure_tags(
+    db: Session, tag_categories: Mapping[str, Optional[str]]
+) -> Dict[str, int]:
+    """登记标签表中缺少的标签，返回 {标签名: 标签ID}（不提交）"""
+    return tag_registry.ensure(db, tag_categories)
+
+
+def link_event_tags(
+    db: Session,
+    event_tags: Mapping[int, List[str]],
+    tag_categories: Mapping[str, Optional[str]],
+    replace: bool = True,
+) -> None:
+    """用给定的标签替换若干事件的标签关联（不提交）
+
+    新创建的事件没有旧关联，可以传 replace=False 跳过删除
+    """
+    if not event_tags:
+        return
+    tag_ids = ensure_tags(db, tag_categories)
+
+    if replace:
+        db.execute(
+            delete(_event_tags).where(_event_tags.c.event_id.in_(list(event_tags)))
+        )
+    links = [
+        {"event_id": event_id, "tag_id": tag_ids[name]}
+        for event_id, names in event_tags.items()
+        for name in valid_tag_names(names)
+        if name in tag_ids
+    ]
+    if links:
+        db.execute(insert(_event_tags), links)
+
+
+def set_event_tags(
+    db: Session, event_id: int, tag_names: List[str], category: Optional[str]
+) -> None:
+    """替换单个事件的标签关联，新标签登记在指定分类下（不提交）"""
+    link_event_tags(db, {event_id: tag_names}, {name: category for name in tag_names})
+
+
+def unlink_event(db: Session, event_id: int) -> None:
+    """删除事件前移除它的标签关联（不提交）"""
+    db.execute(delete(_event_tags).where(_event_tags.c.event_id == event_id))
+
+
+def events_with_all_tags(tag_names: List[str]):
+    """同时带有全部指定标签的事件ID子查询，由 (tag_id, event_id) 索引驱动"""
+    names = list(dict.fromkeys(tag_names))
+    return (
+        select(_event_tags.c.event_id)
+        .join(_tags, _tags.c.id == _event_tags.c.tag_id)
+        .where(_tags.c.name.in_(names))
+        .group_by(_event_tags.c.event_id)
+        .having(func.count(_event_tags.c.tag_id) == len(names))
+    )
@@ -0,0 +1,131 @@
+"""
+事件导出
+
+用服务端游标（yield_per）分批读取事件，逐批序列化为 NDJSON 或 CSV，
+可选即时 gzip 压缩。导出使用独立的数据库会话，响应流结束（或客户端断开）
+时关闭；内存占用只与批大小有关，与导出的事件总数无关。
+"""
+
+import csv
+import io
+import json
+import os
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Iterator, Sequence
+
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session
+
+from ..database import Event as DBEvent
+
+# 每批从数据库读取并序列化的事件数
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+# 导出的字段，与事件接口返回的字段一致
+EXPORT_COLUMNS = [
+    DBEvent.id,
+    DBEvent.title,
+    DBEvent.description,
+    DBEvent.event_date,
+    DBEvent.created_at,
+    DBEvent.tags,
+    DBEvent.category,
+    DBEvent.impact_score,
+    DBEvent.feedback,
+    DBEvent.is_reviewed,
+    DBEvent.enrichment_status,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def iter_batches(
+    session_factory: Callable[[], Session],
+    build_query: Callable[[Session], Query],
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> Iterator[Sequence[Row]]:
+    """在独立会话中执行查询，按批返回结果行"""
+    db = session_factory()
+    try:
+        statement = build_query(db).statement
+        result = db.execute(statement, execution_options={"yield_per": batch_size})
+        for rows in result.partitions():
+            yield rows
+    finally:
+        db.close()
+
+
+def ndjson_chunks(batches: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    """每个事件一行 JSON"""
+    for rows in batches:
+        yield "".join(
+            json.dumps(
+                dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False, default=_json_default
+            )
+            + "\n"
+            for row in rows
+        ).encode("utf-8")
+
+
+def csv_chunks(batches: Iterator[Sequence[Row]]) -> Iterator[bytes]:
+    """带表头的 CSV，开头写入 BOM 以便 Excel 正确识别 UTF-8"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_FIELDS)
+    for rows in batches:
+        writer.writerows([_csv_value(value) for value in row] for row in rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # 没有任何事件时只输出表头
+        yield buffer.getvalue().encode("utf-8")
+
+
+def gzip_chunks(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """即时 gzip 压缩"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(
+    session_factory: Callable[[], Session],
+    build_query: Callable[[Session], Query],
+    export_format: str,
+    compress: bool = False,
+) -> Iterator[bytes]:
+    """导出查询结果；build_query 在导出会话中构造只选择 EXPORT_COLUMNS 的查询"""
+    batches = iter_batches(session_factory, build_query)
+    chunks = csv_chunks(batches) if export_format == "csv" else ndjson_chunks(batches)
+    return gzip_chunks(chunks) if compress else chunks
+
+
+def export_filename(export_format: str, compress: bool) -> str:
+    """下载文件名，如 events-20240601.ndjson.gz"""
+    extension = EXPORT_FORMATS[export_format][1]
+    suffix = ".gz" if compress else ""
+    return f"events-{datetime.utcnow():%Y%m%d}.{extension}{suffix}"
@@ -0,0 +1,79 @@
+"""
+多模式关键词匹配器（Aho-Corasick 自动机）
+
+一次扫描文本即可找出所有命中的关键词，耗时只与文本长度和命中数量相关，
+不再随关键词词典的规模线性增长。
+"""
+
+from collections import deque
+from typing import Dict, Generic, Hashable, Iterable, List, Set, Tuple, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+class KeywordMatcher(Generic[T]):
+    """编译后的关键词自动机，每个模式可以挂载多个负载（payload）"""
+
+    def __init__(self, patterns: Iterable[Tuple[str, T]]):
+        # goto 表：每个状态一个 {字符: 下一状态} 字典，状态 0 为根
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 每个状态命中的负载（已合并失败链上的输出）
+        self._output: List[List[T]] = [[]]
+
+        for pattern, payload in patterns:
+            if not pattern:
+                continue
+            self._add(pattern, payload)
+
+        self._build()
+
+    def _add(self, pattern: str, payload: T) -> None:
+        """向字典树中加入一个模式"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append(payload)
+
+    def _build(self) -> None:
+        """广度优先计算失败指针，并把失败链上的输出合并到当前状态"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+
+                if self._output[self._fail[next_state]]:
+                    self._output[next_state] = (
+                        self._output[next_state] + self._output[self._fail[next_state]]
+                    )
+
+    def iter_matches(self, text: str) -> Iterable[T]:
+        """按出现顺序产出命中的负载（同一模式多次出现会多次产出）"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield from output[state]
+
+    def find(self, text: str) -> Set[T]:
+        """返回文本中命中的全部负载（去重）"""
+        return set(self.iter_matches(text))
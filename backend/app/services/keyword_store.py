@@ -0,0 +1,162 @@
+"""
+关键词词典的存储与热更新
+
+分类关键词和重要性关键词保存在数据库中，每次修改都发布为一个新版本。
+各工作进程在后台线程中定期检查最新版本号，发现新版本时加载并编译匹配器，
+再整体替换 TagExtractor 中的词典快照。请求路径只读取当前快照，
+既不加锁，也不会触发编译。
+"""
+
+import os
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..database import KeywordDictionaryVersion, KeywordEntry
+from .tag_extractor import TagExtractor
+
+# 检查词典新版本的间隔（秒）
+RELOAD_INTERVAL = float(os.getenv("KEYWORD_RELOAD_INTERVAL", "30"))
+
+KeywordTable = Dict[str, List[str]]
+
+
+def get_latest_version(db: Session) -> Optional[int]:
+    """获取最新的词典版本号，尚未发布任何版本时返回 None"""
+    return db.query(func.max(KeywordDictionaryVersion.id)).scalar()
+
+
+def load_dictionary(db: Session, version: int) -> Tuple[KeywordTable, KeywordTable]:
+    """加载指定版本的 (分类关键词, 重要性关键词)"""
+    category_keywords: KeywordTable = {}
+    importance_keywords: KeywordTable = {}
+
+    entries = (
+        db.query(KeywordEntry.kind, KeywordEntry.group_name, KeywordEntry.keyword)
+        .filter(KeywordEntry.version == version)
+        .order_by(KeywordEntry.position)
+    )
+    for kind, group_name, keyword in entries:
+        table = category_keywords if kind == "category" else importance_keywords
+        table.setdefault(group_name, []).append(keyword)
+
+    return category_keywords, importance_keywords
+
+
+def publish_dictionary(
+    db: Session,
+    category_keywords: KeywordTable,
+    importance_keywords: KeywordTable,
+    note: Optional[str] = None,
+) -> int:
+    """把一份完整词典发布为新版本（不提交），返回新版本号"""
+    version = KeywordDictionaryVersion(note=note)
+    db.add(version)
+    db.flush()
+
+    entries = []
+    for kind, table in (
+        ("category", category_keywords),
+        ("importance", importance_keywords),
+    ):
+        for group_name, keywords in table.items():
+            for keyword in keywords:
+                entries.append(
+                    KeywordEntry(
+                        version=version.id,
+                        kind=kind,
+                        group_name=group_name,
+                        keyword=keyword,
+                        position=len(entries),
+                    )
+                )
+    db.add_all(entries)
+    db.flush()
+    return version.id
+
+
+class KeywordReloader:
+    """定期检查数据库中的词典版本，并热更新 TagExtractor"""
+
+    def __init__(
+        self,
+        tag_extractor: TagExtractor,
+        session_factory: Callable[[], Session],
+        interval: float = RELOAD_INTERVAL,
+    ):
+        self.tag_extractor = tag_extractor
+        self.session_factory = session_factory
+        self.interval = interval
+        self.reloads = 0
+        self.loaded_at: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def reload(self) -> bool:
+        """加载最新版本的词典，有更新时返回 True"""
+        # 同一进程内只允许一个线程编译，请求线程不受影响
+        with self._lock:
+            db = self.session_factory()
+            try:
+                version = get_latest_version(db)
+                if version is None or version == self.tag_extractor.dictionary_version:
+                    return False
+                category_keywords, importance_keywords = load_dictionary(db, version)
+            finally:
+                db.close()
+
+            self.tag_extractor.load_keywords(
+                category_keywords, importance_keywords, version
+            )
+            self.reloads += 1
+            self.loaded_at = datetime.utcnow()
+            print(f"📚 关键词词典已更新到版本 {version}")
+            return True
+
+    def start(self) -> None:
+        """立即加载一次，然后在后台线程中定期检查新版本"""
+        if self._thread is not None:
+            return
+        self._safe_reload()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="keyword-reloader", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台检查"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def stats(self) -> dict:
+        """词典指标"""
+        return {
+            "version": self.tag_extractor.dictionary_version,
+            "fingerprint": self.tag_extractor.dictionary_fingerprint,
+            "reloads": self.reloads,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "last_error": self.last_error,
+        }
+
+    def _safe_reload(self) -> None:
+        """加载新版本，出错时保留当前词典"""
+        try:
+            self.reload()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"⚠️  关键词词典加载失败，继续使用当前词典: {e}")
+
+    def _run(self) -> None:
+        """后台检查循环"""
+        while not self._stop.wait(self.interval):
+            self._safe_reload()
@@ -0,0 +1,341 @@
+"""
+接口响应缓存
+
+按 (用户, 数据版本, 接口路径, 排序后的查询参数, 响应格式) 缓存序列化后的响应字节
+和需要保留的响应头。
+用户的事件每次变化时数据版本加一（见 data_version.py），与修改在同一事务中提交，
+之后的请求使用新的键，旧版本的条目不会再被命中；进程内后端写入新版本时同时清除
+该用户旧版本的条目，共享存储中的旧条目按 TTL 过期。
+
+后端可替换：默认进程内 LRU（按条目数和字节数淘汰，带 TTL）；
+RESPONSE_CACHE_BACKEND=redis 时使用共享存储，多个工作进程共用缓存。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+
+# memory（默认）、redis、off
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "300"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+# 随响应一起缓存的响应头（ETag 等由每次请求重新计算）
+CACHED_HEADERS = ("x-next-cursor",)
+
+
+class CacheKey(NamedTuple):
+    user_id: int
+    data_version: int
+    resource: str  # 接口路径、排序后的查询参数和响应格式
+
+    def digest(self) -> str:
+        """共享存储中使用的键"""
+        resource = hashlib.blake2b(self.resource.encode("utf-8"), digest_size=16)
+        return f"resp:{self.user_id}:{self.data_version}:{resource.hexdigest()}"
+
+
+def make_cache_key(
+    user_id: int, data_version: int, request: Request, media_type: str
+) -> CacheKey:
+    params = sorted(request.query_params.multi_items())
+    resource = request.url.path + "?" + "&".join(f"{k}={v}" for k, v in params)
+    return CacheKey(user_id, data_version or 0, f"{resource}|{media_type}")
+
+
+class CacheBackend:
+    """缓存后端接口：按键读写字节"""
+
+    name = "base"
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: CacheKey, value: bytes, ttl: float) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {}
+
+
+class MemoryCacheBackend(CacheBackend):
+    """线程安全的进程内 LRU 缓存，按条目数和总字节数淘汰，过期条目读取时删除"""
+
+    name = "memory"
+
+    def __init__(
+        self,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[CacheKey, Tuple[float, bytes]]" = OrderedDict()
+        # 每个用户最新的数据版本及其条目，写入新版本时清除旧版本
+        self._user_keys: Dict[int, Tuple[int, set]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expired = 0
+        self.invalidated = 0
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.expired += 1
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: CacheKey, value: bytes, ttl: float) -> None:
+        if self.max_entries <= 0 or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            version, keys = self._user_keys.get(key.user_id, (key.data_version, set()))
+            if key.data_version < version:
+                # 请求期间数据已经变化，较旧的结果不再写入
+                return
+            if key.data_version > version:
+                for old_key in list(keys):
+                    self._remove(old_key)
+                    self.invalidated += 1
+                keys = set()
+            self._user_keys[key.user_id] = (key.data_version, keys)
+
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._bytes += len(value)
+            keys.add(key)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: CacheKey) -> None:
+        _, value = self._entries.pop(key)
+        self._bytes -= len(value)
+        version_keys = self._user_keys.get(key.user_id)
+        if version_keys is not None:
+            version_keys[1].discard(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._user_keys.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "invalidated": self.invalidated,
+            }
+
+
+class SharedStoreBackend(CacheBackend):
+    """共享存储后端
+
+    store 只需提供 get(key) 和 set(key, value, ex=秒)，与 redis-py 客户端兼容。
+    存储不可用时视为未命中，不影响接口本身。
+    """
+
+    name = "shared"
+
+    def __init__(self, store: Any):
+        self.store = store
+        self.errors = 0
+        self.bytes_written = 0
+
+    def get(self, key: CacheKey) -> Optional[bytes]:
+        try:
+            return self.store.get(key.digest())
+        except Exception as e:
+            self._on_error("读取", e)
+            return None
+
+    def set(self, key: CacheKey, value: bytes, ttl: float) -> None:
+        try:
+            self.store.set(key.digest(), value, ex=max(1, int(ttl)))
+            self.bytes_written += len(value)
+        except Exception as e:
+            self._on_error("写入", e)
+
+    def clear(self) -> None:
+        # 共享存储中的条目按 TTL 过期，不主动清空其他进程的缓存
+        pass
+
+    def _on_error(self, action: str, error: Exception) -> None:
+        self.errors += 1
+        if self.errors == 1 or self.errors % 1000 == 0:
+            print(f"⚠️  响应缓存{action}失败（累计 {self.errors} 次）: {error}")
+
+    def stats(self) -> dict:
+        return {"errors": self.errors, "bytes_written": self.bytes_written}
+
+
+class LocalStore:
+    """共享存储的本地替身：进程内字典，接口与 redis-py 的 get/set 相同"""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                self._values.pop(key, None)
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ex: int) -> None:
+        with self._lock:
+            self._values[key] = (time.monotonic() + ex, value)
+
+
+def _pack(content: bytes, headers: Dict[str, str]) -> bytes:
+    return json.dumps(headers).encode("utf-8") + b"\n" + content
+
+
+def _unpack(value: bytes) -> Tuple[bytes, Dict[str, str]]:
+    header_line, _, content = value.partition(b"\n")
+    return content, json.loads(header_line)
+
+
+class ResponseCache:
+    """接口响应缓存，统计命中率"""
+
+    def __init__(
+        self, backend: Optional[CacheBackend], ttl: float = RESPONSE_CACHE_TTL
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def entry(
+        self,
+        user_id: int,
+        data_version: int,
+        request: Request,
+        response: Response,
+        media_type: str = "application/json",
+    ) -> "ResponseCacheEntry":
+        """读取本次请求的缓存条目；response 为接口的响应对象，用于带上已设置的响应头"""
+        key = make_cache_key(user_id, data_version, request, media_type)
+        cached = None
+        if self.backend is not None:
+            value = self.backend.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                cached = _unpack(value)
+        return ResponseCacheEntry(self, key, response, media_type, cached)
+
+    def store(self, key: CacheKey, content: bytes, headers: Dict[str, str]) -> None:
+        if self.backend is not None:
+            self.backend.set(key, _pack(content, headers), self.ttl)
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        """缓存指标"""
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name if self.backend else "off",
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl": self.ttl,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+
+class ResponseCacheEntry:
+    """单个请求的缓存条目：命中时返回缓存的响应，未命中时序列化结果并写入缓存"""
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        key: CacheKey,
+        response: Response,
+        media_type: str,
+        cached: Optional[Tuple[bytes, Dict[str, str]]],
+    ):
+        self.cache = cache
+        self.key = key
+        self.response = response
+        self.media_type = media_type
+        self.cached = cached
+
+    @property
+    def hit(self) -> bool:
+        return self.cached is not None
+
+    def cached_response(self) -> Response:
+        content, headers = self.cached
+        return self._build(content, headers)
+
+    def store(self, content: bytes) -> Response:
+        """写入已经按本次请求的格式编码的响应体，并返回响应"""
+        headers = {
+            name: self.response.headers[name]
+            for name in CACHED_HEADERS
+            if name in self.response.headers
+        }
+        self.cache.store(self.key, content, headers)
+        return self._build(content, headers)
+
+    def _build(self, content: bytes, headers: Dict[str, str]) -> Response:
+        # 接口返回 Response 时，依赖项设置在 response 上的响应头（如 ETag）需要手动带上
+        merged = {
+            name: value
+            for name, value in self.response.headers.items()
+            if name != "content-length"
+        }
+        merged.update(headers)
+        return Response(content, media_type=self.media_type, headers=merged)
+
+
+def create_response_cache() -> ResponseCache:
+    """按 RESPONSE_CACHE_BACKEND 创建响应缓存"""
+    if RESPONSE_CACHE_BACKEND == "off":
+        return ResponseCache(None)
+    if RESPONSE_CACHE_BACKEND == "redis":
+        try:
+            import redis
+
+            store = redis.Redis.from_url(REDIS_URL)
+            print(f"🗄️  响应缓存使用共享存储: {REDIS_URL}")
+            return ResponseCache(SharedStoreBackend(store))
+        except ImportError:
+            print("⚠️  未安装 redis，响应缓存改用进程内缓存")
+    return ResponseCache(MemoryCacheBackend())
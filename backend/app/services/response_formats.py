@@ -0,0 +1,161 @@
+"""
+响应格式协商
+
+事件读取接口按 Accept 请求头选择响应格式，默认 JSON：
+
+- application/json：按行的 JSON（默认）
+- application/msgpack：与 JSON 结构相同的 MessagePack，时间为 MessagePack 时间戳
+- application/vnd.grandthings.columnar+msgpack：列式 MessagePack
+- application/vnd.grandthings.columnar+json：列式 JSON
+
+列式格式把事件列表（以及统计结果）转成 {字段: [值, ...]} 的并列数组，
+时间为 Unix 时间戳（秒，带小数）。
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from .event_fragments import Fields, encode_json
+
+try:
+    import msgpack
+except ImportError:  # 依赖未同步的环境不提供 MessagePack 格式
+    msgpack = None
+
+MEDIA_JSON = "application/json"
+MEDIA_MSGPACK = "application/msgpack"
+MEDIA_COLUMNAR_MSGPACK = "application/vnd.grandthings.columnar+msgpack"
+MEDIA_COLUMNAR_JSON = "application/vnd.grandthings.columnar+json"
+
+
+def epoch_seconds(value: datetime) -> float:
+    """Unix 时间戳（秒）；数据库中不带时区的时间按 UTC 处理"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return msgpack.Timestamp.from_datetime(value)
+    raise TypeError(f"无法编码为 MessagePack: {type(value).__name__}")
+
+
+class ResponseFormat(NamedTuple):
+    media_type: str
+    columnar: bool
+    binary: bool
+    aliases: Tuple[str, ...] = ()
+
+    @property
+    def available(self) -> bool:
+        return not self.binary or msgpack is not None
+
+    def encode(self, value: Any) -> bytes:
+        if self.binary:
+            return msgpack.packb(value, default=_msgpack_default)
+        return encode_json(value)
+
+    def table(self, records: List[Mapping[str, Any]], fields: Iterable[str]) -> Any:
+        """一组记录：按行格式原样返回，列式格式转成 {字段: [值, ...]}"""
+        if not self.columnar:
+            return records
+        columns = {}
+        for name in fields:
+            values = [record[name] for record in records]
+            if any(isinstance(value, datetime) for value in values):
+                values = [
+                    epoch_seconds(value) if isinstance(value, datetime) else value
+                    for value in values
+                ]
+            columns[name] = values
+        return columns
+
+    def events(self, rows: Iterable[Any], fields: Fields) -> Any:
+        """按 event_columns(fields) 查询出的事件行"""
+        records = [
+            {name: values[name] for name in fields}
+            for values in (row._mapping for row in rows)
+        ]
+        return self.table(records, fields)
+
+    def event(self, row: Any, fields: Fields) -> Any:
+        """单个事件行：按行格式为一条记录，列式格式为长度为1的列"""
+        if self.columnar:
+            return self.events([row], fields)
+        values = row._mapping
+        return {name: values[name] for name in fields}
+
+
+# 按服务端偏好排序，Accept 中质量值相同时靠前的优先
+FORMATS = (
+    ResponseFormat(MEDIA_JSON, columnar=False, binary=False),
+    ResponseFormat(
+        MEDIA_MSGPACK, columnar=False, binary=True, aliases=("application/x-msgpack",)
+    ),
+    ResponseFormat(MEDIA_COLUMNAR_MSGPACK, columnar=True, binary=True),
+    ResponseFormat(MEDIA_COLUMNAR_JSON, columnar=True, binary=False),
+)
+JSON_FORMAT = FORMATS[0]
+
+
+def _parse_accept(accept: str) -> List[Tuple[str, float]]:
+    """解析 Accept 请求头为 [(媒体类型范围, 质量值)]"""
+    ranges = []
+    for part in accept.split(","):
+        media_range, *params = part.split(";")
+        media_range = media_range.strip().lower()
+        if not media_range:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        ranges.append((media_range, quality))
+    return ranges
+
+
+def _quality(fmt: ResponseFormat, ranges: List[Tuple[str, float]]) -> Tuple:
+    """格式在 Accept 中的 (质量值, 匹配的精确程度)，取最精确的匹配"""
+    best: Optional[Tuple[int, float]] = None
+    for media_range, quality in ranges:
+        if media_range in (fmt.media_type,) + fmt.aliases:
+            specificity = 2
+        elif media_range == fmt.media_type.split("/")[0] + "/*":
+            specificity = 1
+        elif media_range == "*/*":
+            specificity = 0
+        else:
+            continue
+        if best is None or specificity > best[0]:
+            best = (specificity, quality)
+    if best is None:
+        return (0.0, -1)
+    return (best[1], best[0])
+
+
+def negotiate(accept: Optional[str]) -> ResponseFormat:
+    """按 Accept 请求头选择响应格式；没有匹配的格式时返回 JSON，与协商前的行为一致"""
+    if not accept or not accept.strip():
+        return JSON_FORMAT
+    ranges = _parse_accept(accept)
+    candidates = [
+        (_quality(fmt, ranges), -index, fmt)
+        for index, fmt in enumerate(FORMATS)
+        if fmt.available
+    ]
+    (quality, _), _, fmt = max(candidates, key=lambda c: (c[0], c[1]))
+    return fmt if quality > 0 else JSON_FORMAT
+
+
+def render_records(
+    fmt: ResponseFormat, records: List[Dict[str, Any]], fields: Iterable[str]
+) -> bytes:
+    """编码一组记录（统计接口）"""
+    return fmt.encode(fmt.table(records, fields))
@@ -0,0 +1,362 @@
+"""
+批量重新打标签
+
+关键词词典或提取规则变化后，已有事件的标签、分类和重要性评分不会自动更新。
+这里按事件ID分块（keyset 分页）扫描全部事件，每块批量分析后用一条
+executemany UPDATE 写回，并在同一事务中保存检查点，中断后从上次提交的位置继续。
+分析文本和词典指纹都未变化的事件直接跳过。内存占用只与分块大小有关。
+同时补齐早期事件缺少的搜索词（events.search_tokens）。
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from ..database import Event as DBEvent, JobCheckpoint
+from .bulk_events import fit_tags
+from .data_version import bump_data_version
+from .enrichment import STATUS_DONE, analysis_hash, event_text
+from .event_counters import CounterKey, adjust_counters, counter_key
+from .event_tags import link_event_tags
+from .keyword_store import KeywordReloader
+from .search import search_tokens
+from .tag_extractor import TagExtractor
+from .tags import split_tags
+
+JOB_NAME = "retag_events"
+# 每块处理的事件数
+CHUNK_SIZE = int(os.getenv("RETAG_CHUNK_SIZE", "1000"))
+# 检查点超过该时间（秒）未更新时，认为持有它的进程已退出
+STALE_AFTER = 300
+
+STATUS_RUNNING = "running"
+STATUS_STOPPED = "stopped"
+STATUS_FAILED = "failed"
+
+_events = DBEvent.__table__
+
+
+@dataclass
+class RetagProgress:
+    """重新打标签的进度"""
+
+    last_id: int = 0
+    processed: int = 0
+    updated: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.processed / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["rows_per_sec"] = round(self.rows_per_sec, 1)
+        return data
+
+
+def build_extractor(session_factory: Callable[[], Session]) -> TagExtractor:
+    """创建使用数据库最新词典、不带缓存的标签提取器"""
+    tag_extractor = TagExtractor()
+    KeywordReloader(tag_extractor, session_factory).reload()
+    return tag_extractor
+
+
+def _load_checkpoint(db: Session, restart: bool) -> JobCheckpoint:
+    """读取检查点；上次已完成或要求从头开始时重置进度"""
+    checkpoint = db.get(JobCheckpoint, JOB_NAME)
+    if checkpoint is None:
+        checkpoint = JobCheckpoint(job_name=JOB_NAME)
+        db.add(checkpoint)
+        restart = True
+    elif checkpoint.status == STATUS_DONE:
+        restart = True
+
+    if restart:
+        checkpoint.last_id = 0
+        checkpoint.processed = 0
+        checkpoint.updated = 0
+        checkpoint.skipped = 0
+        checkpoint.started_at = datetime.utcnow()
+    checkpoint.status = STATUS_RUNNING
+    checkpoint.error = None
+    checkpoint.finished_at = None
+    db.commit()
+    return checkpoint
+
+
+def _retag_row(row, analysis, text_hash: str, reset_legacy: bool) -> Dict:
+    """计算单个事件的新标签、分类和评分"""
+    current_tags = split_tags(row.tags)
+    if row.analysis_hash is None and reset_legacy:
+        # 早期数据没有记录自动分析结果，按要求整体替换为新的分析结果
+        user_tags: List[str] = []
+        user_category = None
+    else:
+        auto_tags = set(split_tags(row.auto_tags))
+        user_tags = [tag for tag in current_tags if tag not in auto_tags]
+        if row.auto_category is not None and row.category == row.auto_category:
+            user_category = None
+        else:
+            user_category = row.category
+
+    # 与批量创建、导入一致，超出 events.tags 长度的自动标签不写入，避免整块更新失败
+    tags = fit_tags(
+        {
+            "tags": ",".join(dict.fromkeys(user_tags + analysis.tags)),
+            "auto_tags": ",".join(analysis.tags),
+        },
+        user_tags,
+    )
+    return {
+        "b_id": row.id,
+        "b_tags": tags["tags"],
+        "b_category": user_category or analysis.category,
+        "b_impact_score": analysis.impact_score,
+        "b_auto_tags": tags["auto_tags"],
+        "b_auto_category": None if user_category else analysis.category,
+        "b_analysis_hash": text_hash,
+    }
+
+
+def run_retag(
+    session_factory: Callable[[], Session],
+    tag_extractor: TagExtractor,
+    chunk_size: int = CHUNK_SIZE,
+    restart: bool = False,
+    force: bool = False,
+    reset_legacy: bool = False,
+    stop_event: Optional[threading.Event] = None,
+    on_progress: Optional[Callable[[RetagProgress], None]] = None,
+    workers: Optional[int] = None,
+) -> RetagProgress:
+    """重新分析全部事件，返回本次运行的进度；workers 为分析使用的进程数，
+    默认为 TAG_EXTRACTOR_WORKERS"""
+    update_stmt = (
+        update(_events)
+        .where(_events.c.id == bindparam("b_id"))
+        .values(
+            tags=bindparam("b_tags"),
+            category=bindparam("b_category"),
+            impact_score=bindparam("b_impact_score"),
+            auto_tags=bindparam("b_auto_tags"),
+            auto_category=bindparam("b_auto_category"),
+            analysis_hash=bindparam("b_analysis_hash"),
+            search_tokens=bindparam("b_search_tokens"),
+            enrichment_status=STATUS_DONE,
+        )
+    )
+    columns = [
+        _events.c.id,
+        _events.c.user_id,
+        _events.c.title,
+        _events.c.description,
+        _events.c.tags,
+        _events.c.category,
+        _events.c.auto_tags,
+        _events.c.auto_category,
+        _events.c.analysis_hash,
+        _events.c.search_tokens,
+    ]
+
+    db = session_factory()
+    progress = RetagProgress()
+    started = time.monotonic()
+    try:
+        checkpoint = _load_checkpoint(db, restart)
+        progress.last_id = checkpoint.last_id
+        print(f"🔁 开始重新打标签，从事件ID {checkpoint.last_id} 之后继续")
+
+        while not (stop_event and stop_event.is_set()):
+            rows = db.execute(
+                select(*columns)
+                .where(_events.c.id > progress.last_id)
+                .order_by(_events.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                checkpoint.status = STATUS_DONE
+                checkpoint.finished_at = datetime.utcnow()
+                db.commit()
+                break
+
+            # 词典指纹在分析前取一次，分析期间词典被替换时下次运行会重新处理
+            fingerprint = tag_extractor.dictionary_fingerprint
+            texts = [event_text(row.title, row.description) for row in rows]
+            hashes = [analysis_hash(text, fingerprint) for text in texts]
+            pending = [
+                index
+                for index, (row, text_hash) in enumerate(zip(rows, hashes))
+                if force or row.analysis_hash != text_hash or row.search_tokens is None
+            ]
+
+            params = []
+            event_tags: Dict[int, List[str]] = {}
+            tag_categories: Dict[str, str] = {}
+            counter_deltas: Dict[CounterKey, int] = defaultdict(int)
+            if pending:
+                analyses = tag_extractor.analyze_many(
+                    [texts[i] for i in pending], workers=workers
+                )
+                for index, analysis in zip(pending, analyses):
+                    row = rows[index]
+                    values = _retag_row(row, analysis, hashes[index], reset_legacy)
+                    values["b_search_tokens"] = search_tokens(
+                        row.title, row.description
+                    )
+                    params.append(values)
+                    # 分类变化时同步调整事件计数器
+                    old_key = counter_key(row.user_id, row.category)
+                    new_key = counter_key(row.user_id, values["b_category"])
+                    if old_key != new_key:
+                        counter_deltas[old_key] -= 1
+                        counter_deltas[new_key] += 1
+                    event_tags[row.id] = split_tags(values["b_tags"])
+                    for tag in event_tags[row.id]:
+                        tag_categories.setdefault(tag, analysis.category)
+
+                db.execute(update_stmt, params)
+                adjust_counters(db, counter_deltas)
+                bump_data_version(db, (rows[index].user_id for index in pending))
+                link_event_tags(db, event_tags, tag_categories)
+
+            progress.last_id = rows[-1].id
+            progress.processed += len(rows)
+            progress.updated += len(params)
+            progress.skipped += len(rows) - len(params)
+            progress.elapsed = time.monotonic() - started
+
+            # 检查点与本块的更新在同一事务中提交
+            checkpoint.last_id = progress.last_id
+            checkpoint.processed += len(rows)
+            checkpoint.updated += len(params)
+            checkpoint.skipped += len(rows) - len(params)
+            db.commit()
+
+            print(
+                f"🔁 已处理 {progress.processed} 条（更新 {progress.updated}，"
+                f"跳过 {progress.skipped}），{progress.rows_per_sec:.0f} 条/秒"
+            )
+            if on_progress:
+                on_progress(progress)
+        else:
+            checkpoint.status = STATUS_STOPPED
+            db.commit()
+            print(f"⏸️  重新打标签已暂停，下次从事件ID {progress.last_id} 之后继续")
+
+        progress.elapsed = time.monotonic() - started
+        return progress
+
+    except Exception as e:
+        db.rollback()
+        checkpoint = db.get(JobCheckpoint, JOB_NAME)
+        if checkpoint is not None:
+            checkpoint.status = STATUS_FAILED
+            checkpoint.error = str(e)[:1000]
+            db.commit()
+        print(f"❌ 重新打标签失败: {e}")
+        raise
+    finally:
+        db.close()
+
+
+class RetagRunner:
+    """在后台线程中运行重新打标签任务（每个进程最多一个）"""
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+        self.progress: Optional[RetagProgress] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, **options) -> bool:
+        """启动任务；本进程或其他进程已有任务在运行时返回 False"""
+        with self._lock:
+            if self.running or self._running_elsewhere():
+                return False
+            self._stop.clear()
+            self.progress = None
+            self._thread = threading.Thread(
+                target=self._run, kwargs=options, name="retag", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def stop(self, timeout: float = 30) -> None:
+        """在当前分块完成后停止任务，进度保留在检查点中"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def status(self) -> dict:
+        """任务状态：检查点中的累计进度，以及本次运行的速度"""
+        db = self.session_factory()
+        try:
+            checkpoint = db.get(JobCheckpoint, JOB_NAME)
+            return {
+                "running": self.running,
+                "status": checkpoint.status if checkpoint else None,
+                "last_id": checkpoint.last_id if checkpoint else 0,
+                "processed": checkpoint.processed if checkpoint else 0,
+                "updated": checkpoint.updated if checkpoint else 0,
+                "skipped": checkpoint.skipped if checkpoint else 0,
+                "error": checkpoint.error if checkpoint else None,
+                "started_at": checkpoint.started_at if checkpoint else None,
+                "finished_at": checkpoint.finished_at if checkpoint else None,
+                "current_run": self.progress.to_dict() if self.progress else None,
+            }
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        """任务指标（只包含本进程内的运行情况）"""
+        return {
+            "running": self.running,
+            "current_run": self.progress.to_dict() if self.progress else None,
+        }
+
+    def _running_elsewhere(self) -> bool:
+        """检查点处于运行状态且最近有更新，说明其他进程正在处理"""
+        db = self.session_factory()
+        try:
+            checkpoint = db.get(JobCheckpoint, JOB_NAME)
+            if checkpoint is None or checkpoint.status != STATUS_RUNNING:
+                return False
+            idle = (datetime.utcnow() - checkpoint.updated_at).total_seconds()
+            return idle < STALE_AFTER
+        finally:
+            db.close()
+
+    def _on_progress(self, progress: RetagProgress) -> None:
+        self.progress = progress
+
+    def _run(self, **options) -> None:
+        tag_extractor = build_extractor(self.session_factory)
+        try:
+            self.progress = run_retag(
+                self.session_factory,
+                tag_extractor,
+                stop_event=self._stop,
+                on_progress=self._on_progress,
+                **options,
+            )
+        except Exception:
+            # 错误已记录在检查点中
+            pass
+        finally:
+            tag_extractor.shutdown_pool()
@@ -0,0 +1,260 @@
+"""
+事件搜索
+
+按数据库选择搜索后端：
+- PostgreSQL：events.search_tokens 保存 jieba 分词后的文本，由生成列
+  search_vector 转为 tsvector 并建 GIN 索引；标题和描述另有 pg_trgm 的 GIN
+  索引，用于子串匹配和尚未分词的早期数据。结果按相关度、影响评分和
+  新近程度的加权得分排序。
+- SQLite：FTS5 虚拟表 events_fts 以外部内容方式索引 events 的 search_tokens
+  和 tags，由触发器随 events 的增删改同步；按 bm25 相关度、影响评分和
+  新近程度的加权得分排序。
+- 其他数据库：LIKE 子串匹配，按事件日期排序。
+两种排序都用 keyset 游标分页。
+"""
+
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Union
+
+from sqlalchemy import (
+    Float,
+    cast,
+    column,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    tuple_,
+)
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Query
+from sqlalchemy.sql.elements import ColumnElement
+
+from ..core.pagination import decode_cursor, encode_cursor
+from ..database import Event as DBEvent
+from .segment_dict import get_tokenizer
+
+# 搜索后端：auto（按数据库选择）或 like（强制使用 LIKE 匹配）
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+
+# 排序得分 = 相关度 * RELEVANCE_WEIGHT + 影响评分/10 * IMPACT_WEIGHT
+#          + 新近程度 * RECENCY_WEIGHT，新近程度每过 RECENCY_HALF_LIFE_DAYS 天减半
+RELEVANCE_WEIGHT = 1.0
+IMPACT_WEIGHT = 0.3
+RECENCY_WEIGHT = 0.3
+RECENCY_HALF_LIFE_DAYS = 180
+
+# SQLite 全文索引表，建表和触发器见 migrations._event_fts
+FTS_TABLE = "events_fts"
+_fts = table(FTS_TABLE, column("rowid"), column("tags"), column("rank"))
+
+
+def tokenize(text: str) -> str:
+    """jieba 搜索引擎模式分词，返回以空格分隔的小写搜索词"""
+    return " ".join(
+        word for word in get_tokenizer().cut_for_search(text.lower()) if word.strip()
+    )
+
+
+def search_tokens(title: str, description: Optional[str]) -> str:
+    """事件的搜索词，写入 events.search_tokens"""
+    return tokenize(f"{title or ''} {description or ''}")
+
+
+class SearchBackend:
+    """LIKE 子串匹配，不计算相关度"""
+
+    name = "like"
+
+    def match(self, query: Query, text: str) -> Query:
+        return query.filter(
+            DBEvent.title.contains(text, autoescape=True)
+            | DBEvent.description.contains(text, autoescape=True)
+        )
+
+    def score(self, text: str, now: datetime) -> Optional[ColumnElement]:
+        return None
+
+    def search(
+        self, query: Query, text: str, now: datetime
+    ) -> Tuple[Query, Optional[ColumnElement]]:
+        """筛选匹配的事件，返回 (查询, 排序得分)，得分为 None 时按日期排序"""
+        return self.match(query, text), self.score(text, now)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector 全文检索 + pg_trgm 子串匹配，按加权得分排序"""
+
+    name = "postgresql"
+
+    def _tsquery(self, text: str) -> ColumnElement:
+        # 查询词与文档使用同样的分词方式，plainto_tsquery 要求全部词都出现
+        return func.plainto_tsquery("simple", tokenize(text))
+
+    def match(self, query: Query, text: str) -> Query:
+        # 三个条件分别命中 search_vector、title、description 上的 GIN 索引
+        return query.filter(
+            or_(
+                literal_column("events.search_vector").op("@@")(self._tsquery(text)),
+                DBEvent.title.icontains(text, autoescape=True),
+                DBEvent.description.icontains(text, autoescape=True),
+            )
+        )
+
+    def score(self, text: str, now: datetime) -> Optional[ColumnElement]:
+        relevance = cast(
+            func.ts_rank_cd(literal_column("events.search_vector"), self._tsquery(text))
+            + func.similarity(DBEvent.title, text),
+            Float,
+        )
+        impact = cast(func.coalesce(DBEvent.impact_score, 0), Float) / 10.0
+        age_days = func.greatest(
+            cast(func.extract("epoch", literal(now) - DBEvent.event_date), Float)
+            / 86400.0,
+            0.0,
+        )
+        recency = func.power(0.5, age_days / float(RECENCY_HALF_LIFE_DAYS))
+        return (
+            relevance * RELEVANCE_WEIGHT
+            + impact * IMPACT_WEIGHT
+            + recency * RECENCY_WEIGHT
+        )
+
+
+class Fts5SearchBackend(SearchBackend):
+    """SQLite FTS5 全文检索，按加权得分排序"""
+
+    name = "sqlite_fts5"
+
+    def _fts_query(self, text: str) -> Optional[str]:
+        """构造 FTS5 查询：全部搜索词都出现，或整个查询词是一个标签
+
+        每个词都用双引号括起，避免查询中的 AND、*、: 等被当作 FTS5 语法
+        """
+        words = [
+            word for word in tokenize(text).split() if any(c.isalnum() for c in word)
+        ]
+        if not words:
+            return None
+        terms = " AND ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+        phrase = text.lower().strip().replace('"', '""')
+        return f'({terms}) OR tags : "{phrase}"'
+
+    def search(
+        self, query: Query, text: str, now: datetime
+    ) -> Tuple[Query, Optional[ColumnElement]]:
+        fts_query = self._fts_query(text)
+        if fts_query is None:
+            # 只有标点等无法分词的查询，退回子串匹配
+            return super().search(query, text, now)
+
+        matches = (
+            select(_fts.c.rowid.label("event_id"), _fts.c.rank.label("rank"))
+            .where(literal_column(FTS_TABLE).op("MATCH")(fts_query))
+            .subquery()
+        )
+        query = query.join(matches, matches.c.event_id == DBEvent.id)
+
+        # rank 即 bm25，越小越相关；换算为 0~1 之间的正数
+        relevance = -matches.c.rank / (1.0 - matches.c.rank)
+        impact = cast(func.coalesce(DBEvent.impact_score, 0), Float) / 10.0
+        age_days = func.max(
+            func.julianday(now.isoformat(sep=" ")) - func.julianday(DBEvent.event_date),
+            0.0,
+        )
+        # SQLite 不一定带数学函数，用 1/(1+t/T) 代替指数衰减，半衰期处同为 0.5
+        recency = 1.0 / (1.0 + age_days / float(RECENCY_HALF_LIFE_DAYS))
+        score = (
+            relevance * RELEVANCE_WEIGHT
+            + impact * IMPACT_WEIGHT
+            + recency * RECENCY_WEIGHT
+        )
+        return query, score
+
+
+def sqlite_has_fts5(conn: Union[Engine, Connection]) -> bool:
+    """SQLite 是否编译了 FTS5 扩展"""
+    if isinstance(conn, Engine):
+        with conn.connect() as connection:
+            return sqlite_has_fts5(connection)
+    options = {row[0] for row in conn.exec_driver_sql("PRAGMA compile_options")}
+    return "ENABLE_FTS5" in options
+
+
+def get_search_backend(engine: Engine) -> SearchBackend:
+    """按数据库类型选择搜索后端"""
+    if SEARCH_BACKEND == "auto":
+        if engine.dialect.name == "postgresql":
+            return PostgresSearchBackend()
+        if engine.dialect.name == "sqlite" and sqlite_has_fts5(engine):
+            return Fts5SearchBackend()
+    return SearchBackend()
+
+
+def search_page(
+    query: Query,
+    backend: SearchBackend,
+    text: Optional[str],
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[List[Any], Optional[str]]:
+    """执行搜索并返回 (一页事件, 下一页游标)，游标格式错误时抛出 ValueError
+
+    query 可以查询 ORM 实体，也可以按列查询（需包含 id 和 event_date）
+    """
+    position = decode_cursor(cursor) if cursor else {}
+    try:
+        now = datetime.fromisoformat(position["t"]) if "t" in position else None
+    except (TypeError, ValueError):
+        raise ValueError("无效的分页游标")
+
+    # 查询 ORM 实体时取出事件对象；按列查询时保留整行（多出的 score 列不影响取值）
+    entity_query = query.column_descriptions[0]["expr"] is DBEvent
+    score = None
+    if text:
+        # 新近程度以第一页的时间为准，保证翻页期间同一事件的得分不变
+        now = now or datetime.utcnow()
+        query, score = backend.search(query, text, now)
+
+    try:
+        if score is not None:
+            query = query.add_columns(score.label("score")).order_by(
+                score.desc(), DBEvent.id.desc()
+            )
+            if position:
+                query = query.filter(
+                    tuple_(score, DBEvent.id)
+                    < tuple_(float(position["s"]), int(position["i"]))
+                )
+        else:
+            query = query.order_by(DBEvent.event_date.desc(), DBEvent.id.desc())
+            if position:
+                query = query.filter(
+                    tuple_(DBEvent.event_date, DBEvent.id)
+                    < tuple_(datetime.fromisoformat(position["d"]), int(position["i"]))
+                )
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("无效的分页游标")
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if score is not None:
+        events = [row[0] for row in rows] if entity_query else rows
+        next_position = (
+            {"s": rows[-1].score, "i": events[-1].id, "t": now.isoformat()}
+            if has_more
+            else None
+        )
+    else:
+        events = rows
+        next_position = (
+            {"d": events[-1].event_date.isoformat(), "i": events[-1].id}
+            if has_more
+            else None
+        )
+    return events, encode_cursor(next_position) if next_position else None
@@ -1,269 +1,603 @@
-import jieba
+import hashlib
+import json
+import os
 import re
-from typing import List, Set, Dict
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import get_context
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 
+from .analysis_cache import AnalysisCache, make_cache_key, normalize_text
+from .keyword_matcher import KeywordMatcher
+from .segment_dict import get_tokenizer
 
-class TagExtractor:
-    def __init__(self):
-        # 预定义的分类关键词
+# 重要性级别对应的分数调整
+IMPORTANCE_LEVEL_WEIGHTS = {"高": 3, "中": 1, "低": -1}
+
+# 预编译的正则表达式
+# 公司名称（简单规则：包含"公司"、"科技"、"集团"等）
+COMPANY_PATTERNS = [
+    re.compile(
+        r"[\u4e00-\u9fa5]+(?:公司|科技|集团|企业|有限公司|股份|corp|inc|ltd)",
+        re.IGNORECASE,
+    ),
+    re.compile(
+        r"[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Inc|Corp|Ltd|LLC))", re.IGNORECASE
+    ),
+]
+# 金额：分组1为数值，分组2为单位；整体匹配作为标签，亿/万单位的数值参与重要性评分
+AMOUNT_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(亿|万|千万|百万)(?:元|美元|人民币)?")
+PERCENT_PATTERN = re.compile(r"\d+(?:\.\d+)?%")
+CHINESE_PATTERN = re.compile(r"^[\u4e00-\u9fa5]+$")
+
+# 不作为标签的常见词汇
+COMMON_WORDS = frozenset(
+    ["今天", "昨天", "明天", "时候", "地方", "这个", "那个", "什么", "怎么"]
+)
+
+
+# 批量分析的进程数与每个任务的分块大小，0 表示使用全部CPU核心
+BATCH_WORKERS = int(os.getenv("TAG_EXTRACTOR_WORKERS", "0")) or os.cpu_count() or 1
+BATCH_CHUNK_SIZE = int(os.getenv("TAG_EXTRACTOR_CHUNK_SIZE", "256"))
+
+# 预定义的分类关键词
+DEFAULT_CATEGORY_KEYWORDS = {
+    "金融": [
+        "投资",
+        "股票",
+        "融资",
+        "上市",
+        "金融",
+        "银行",
+        "基金",
+        "证券",
+        "债券",
+        "IPO",
+        "并购",
+        "收购",
+    ],
+    "科技": [
+        "AI",
+        "人工智能",
+        "机器学习",
+        "深度学习",
+        "区块链",
+        "云计算",
+        "大数据",
+        "物联网",
+        "5G",
+        "算法",
+        "芯片",
+        "半导体",
+    ],
+    "创业": [
+        "创业",
+        "初创",
+        "孵化",
+        "加速器",
+        "种子轮",
+        "天使轮",
+        "A轮",
+        "B轮",
+        "C轮",
+        "估值",
+        "独角兽",
+    ],
+    "互联网": [
+        "互联网",
+        "电商",
+        "社交",
+        "直播",
+        "短视频",
+        "游戏",
+        "在线",
+        "平台",
+        "APP",
+        "网站",
+    ],
+    "医疗": [
+        "医疗",
+        "医药",
+        "生物",
+        "疫苗",
+        "药物",
+        "临床",
+        "健康",
+        "医院",
+        "诊断",
+        "治疗",
+    ],
+    "教育": [
+        "教育",
+        "在线教育",
+        "培训",
+        "学校",
+        "大学",
+        "课程",
+        "学习",
+        "教学",
+        "知识",
+    ],
+    "房产": [
+        "房地产",
+        "楼市",
+        "房价",
+        "地产",
+        "物业",
+        "租房",
+        "买房",
+        "住宅",
+        "商业地产",
+    ],
+    "汽车": [
+        "汽车",
+        "新能源车",
+        "电动车",
+        "自动驾驶",
+        "车企",
+        "造车",
+        "汽车制造",
+        "车联网",
+    ],
+    "娱乐": [
+        "娱乐",
+        "影视",
+        "电影",
+        "电视剧",
+        "综艺",
+        "明星",
+        "娱乐圈",
+        "票房",
+        "streaming",
+    ],
+    "体育": [
+        "体育",
+        "足球",
+        "篮球",
+        "奥运",
+        "世界杯",
+        "比赛",
+        "运动员",
+        "体育赛事",
+    ],
+    "政策": ["政策", "法规", "监管", "政府", "法律", "规定", "标准", "合规"],
+    "国际": [
+        "国际",
+        "全球",
+        "海外",
+        "跨国",
+        "国外",
+        "美国",
+        "欧洲",
+        "亚洲",
+        "贸易",
+        "出海",
+    ],
+}
+
+# 重要性关键词
+DEFAULT_IMPORTANCE_KEYWORDS = {
+    "高": [
+        "重大",
+        "突破",
+        "历史性",
+        "首次",
+        "创纪录",
+        "巨额",
+        "轰动",
+        "震惊",
+        "里程碑",
+    ],
+    "中": ["重要", "显著", "关键", "主要", "核心", "战略", "重点"],
+    "低": ["一般", "常规", "普通", "日常", "例行"],
+}
+
+
+@dataclass
+class TextAnalysis:
+    """一次文本分析的结果"""
+
+    tags: List[str]
+    category: str
+    impact_score: int
+
+
+class CompiledKeywords:
+    """编译后的关键词词典快照，创建后不再修改，更新词典时整体替换"""
+
+    def __init__(
+        self,
+        category_keywords: Dict[str, List[str]],
+        importance_keywords: Dict[str, List[str]],
+        version: Optional[int] = None,
+    ):
         self.category_keywords = {
-            "金融": [
-                "投资",
-                "股票",
-                "融资",
-                "上市",
-                "金融",
-                "银行",
-                "基金",
-                "证券",
-                "债券",
-                "IPO",
-                "并购",
-                "收购",
-            ],
-            "科技": [
-                "AI",
-                "人工智能",
-                "机器学习",
-                "深度学习",
-                "区块链",
-                "云计算",
-                "大数据",
-                "物联网",
-                "5G",
-                "算法",
-                "芯片",
-                "半导体",
-            ],
-            "创业": [
-                "创业",
-                "初创",
-                "孵化",
-                "加速器",
-                "种子轮",
-                "天使轮",
-                "A轮",
-                "B轮",
-                "C轮",
-                "估值",
-                "独角兽",
-            ],
-            "互联网": [
-                "互联网",
-                "电商",
-                "社交",
-                "直播",
-                "短视频",
-                "游戏",
-                "在线",
-                "平台",
-                "APP",
-                "网站",
-            ],
-            "医疗": [
-                "医疗",
-                "医药",
-                "生物",
-                "疫苗",
-                "药物",
-                "临床",
-                "健康",
-                "医院",
-                "诊断",
-                "治疗",
-            ],
-            "教育": [
-                "教育",
-                "在线教育",
-                "培训",
-                "学校",
-                "大学",
-                "课程",
-                "学习",
-                "教学",
-                "知识",
-            ],
-            "房产": [
-                "房地产",
-                "楼市",
-                "房价",
-                "地产",
-                "物业",
-                "租房",
-                "买房",
-                "住宅",
-                "商业地产",
-            ],
-            "汽车": [
-                "汽车",
-                "新能源车",
-                "电动车",
-                "自动驾驶",
-                "车企",
-                "造车",
-                "汽车制造",
-                "车联网",
-            ],
-            "娱乐": [
-                "娱乐",
-                "影视",
-                "电影",
-                "电视剧",
-                "综艺",
-                "明星",
-                "娱乐圈",
-                "票房",
-                "streaming",
-            ],
-            "体育": [
-                "体育",
-                "足球",
-                "篮球",
-                "奥运",
-                "世界杯",
-                "比赛",
-                "运动员",
-                "体育赛事",
-            ],
-            "政策": ["政策", "法规", "监管", "政府", "法律", "规定", "标准", "合规"],
-            "国际": [
-                "国际",
-                "全球",
-                "海外",
-                "跨国",
-                "国外",
-                "美国",
-                "欧洲",
-                "亚洲",
-                "贸易",
-                "出海",
-            ],
+            category: list(keywords) for category, keywords in category_keywords.items()
         }
-
-        # 重要性关键词
         self.importance_keywords = {
-            "高": [
-                "重大",
-                "突破",
-                "历史性",
-                "首次",
-                "创纪录",
-                "巨额",
-                "轰动",
-                "震惊",
-                "里程碑",
-            ],
-            "中": ["重要", "显著", "关键", "主要", "核心", "战略", "重点"],
-            "低": ["一般", "常规", "普通", "日常", "例行"],
+            level: list(keywords) for level, keywords in importance_keywords.items()
         }
+        # 词典在数据库中的版本号（内置默认词典为 None）
+        self.version = version
+        # 关键词表内容的哈希，作为分析结果缓存键的一部分
+        self.fingerprint = self._compute_fingerprint()
 
-    def extract_tags(self, text: str) -> List[str]:
-        """从文本中提取标签"""
+        # 将两张关键词表编译为同一个自动机，一次扫描得到全部命中
+        self.matcher = self._build_matcher()
+        # 标签 -> 所属分类（按分类顺序），用于 get_category 的直接查表
+        self.tag_categories = self._build_tag_categories()
+
+    def _compute_fingerprint(self) -> str:
+        """根据关键词表内容计算指纹"""
+        content = json.dumps(
+            [self.category_keywords, self.importance_keywords], ensure_ascii=False
+        )
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()[:12]
+
+    def _build_matcher(self) -> KeywordMatcher:
+        """根据分类关键词和重要性关键词构建多模式匹配器"""
+        patterns = []
+        order = 0
+        for category, keywords in self.category_keywords.items():
+            for keyword in keywords:
+                # 分类关键词不区分大小写
+                patterns.append(
+                    (keyword.lower(), ("category", order, category, keyword))
+                )
+                order += 1
+        for level, keywords in self.importance_keywords.items():
+            for keyword in keywords:
+                # 重要性关键词与小写后的文本直接比较，保持原有语义
+                patterns.append((keyword, ("importance", order, level, keyword)))
+                order += 1
+        return KeywordMatcher(patterns)
+
+    def _build_tag_categories(self) -> Dict[str, List[str]]:
+        """构建标签到分类的反向索引"""
+        tag_categories: Dict[str, List[str]] = {}
+        for category, keywords in self.category_keywords.items():
+            for tag in set(keywords) | {category}:
+                tag_categories.setdefault(tag, []).append(category)
+        return tag_categories
+
+    def match(self, text_lower: str) -> Tuple[List[Tuple[str, str]], List[str]]:
+        """扫描小写文本，返回 (分类命中列表, 重要性级别命中列表)，均按词典顺序排列"""
+        category_hits = []
+        importance_hits = []
+        for kind, _, group, keyword in sorted(
+            self.matcher.find(text_lower), key=lambda hit: hit[1]
+        ):
+            if kind == "category":
+                category_hits.append((group, keyword))
+            else:
+                importance_hits.append(group)
+        return category_hits, importance_hits
+
+    def category_for(self, tags: List[str]) -> str:
+        """根据标签推断主要分类"""
+        category_scores: Dict[str, int] = {}
+
+        for tag in tags:
+            for category in self.tag_categories.get(tag, ()):
+                category_scores[category] = category_scores.get(category, 0) + 1
+
+        if category_scores:
+            return max(category_scores.items(), key=lambda x: x[1])[0]
+
+        return "其他"
+
+
+class _SharedPool:
+    """批量分析的进程池，记录正在借用它的调用数"""
+
+    def __init__(self, executor: ProcessPoolExecutor, workers: int, fingerprint: str):
+        self.executor = executor
+        self.workers = workers
+        self.fingerprint = fingerprint
+        self.leases = 0
+        # 已被替换或关闭，最后一个借用结束后关闭进程池
+        self.retired = False
+
+
+class TagExtractor:
+    def __init__(
+        self,
+        category_keywords: Optional[Dict[str, List[str]]] = None,
+        importance_keywords: Optional[Dict[str, List[str]]] = None,
+        cache: Optional[AnalysisCache] = None,
+    ):
+        # 分类关键词与重要性关键词，默认使用预定义词典
+        if category_keywords is None:
+            category_keywords = DEFAULT_CATEGORY_KEYWORDS
+        if importance_keywords is None:
+            importance_keywords = DEFAULT_IMPORTANCE_KEYWORDS
+        self._compiled = CompiledKeywords(category_keywords, importance_keywords)
+
+        # 分析结果缓存（可选）
+        self.cache = cache
+
+        # 批量分析使用的进程池，首次调用 analyze_many 时创建；创建和替换由锁保护
+        self._pool: Optional[_SharedPool] = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def category_keywords(self) -> Dict[str, List[str]]:
+        return self._compiled.category_keywords
+
+    @property
+    def importance_keywords(self) -> Dict[str, List[str]]:
+        return self._compiled.importance_keywords
+
+    @property
+    def dictionary_version(self) -> Optional[int]:
+        """当前生效的词典版本号"""
+        return self._compiled.version
+
+    @property
+    def dictionary_fingerprint(self) -> str:
+        """当前生效的词典内容指纹"""
+        return self._compiled.fingerprint
+
+    def load_keywords(
+        self,
+        category_keywords: Dict[str, List[str]],
+        importance_keywords: Dict[str, List[str]],
+        version: Optional[int] = None,
+    ) -> None:
+        """编译新的关键词词典并原子替换，进行中的分析继续使用旧的快照"""
+        self._compiled = CompiledKeywords(
+            category_keywords, importance_keywords, version
+        )
+
+    def analyze(self, text: str) -> TextAnalysis:
+        """一次分析文本，同时得到标签、分类和重要性评分"""
+        compiled = self._compiled
+        if self.cache is None:
+            return self._analyze(text, compiled)
+
+        text = normalize_text(text)
+        key = make_cache_key(text, compiled.fingerprint)
+        analysis = self.cache.get(key)
+        if analysis is None:
+            analysis = self._analyze(text, compiled)
+            self.cache.put(key, analysis)
+        return analysis
+
+    def _analyze(self, text: str, compiled: CompiledKeywords) -> TextAnalysis:
+        """使用指定的词典快照分析文本（不经过缓存）"""
         if not text:
-            return []
+            return TextAnalysis(tags=[], category="其他", impact_score=5)
 
-        # 使用jieba分词
-        words = jieba.lcut(text)
+        category_hits, importance_hits = compiled.match(text.lower())
+        amounts = list(AMOUNT_PATTERN.finditer(text))
 
-        # 过滤标点符号和停用词
-        words = [word for word in words if len(word) > 1 and word.isalpha()]
+        # 使用jieba分词，过滤标点符号和停用词
+        words = [
+            word
+            for word in get_tokenizer().lcut(text)
+            if len(word) > 1 and word.isalpha()
+        ]
 
-        tags = set()
+        # 使用dict去重并保留发现顺序，保证同一文本在任何进程中得到相同的标签
+        tags: Dict[str, None] = {}
 
         # 基于关键词匹配提取分类标签
-        for category, keywords in self.category_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in text.lower():
-                    tags.add(category)
-                    tags.add(keyword)
+        for category, keyword in category_hits:
+            tags[category] = None
+            tags[keyword] = None
 
         # 提取重要的名词和实体
-        important_words = self._extract_important_words(text, words)
-        tags.update(important_words)
+        tags.update(dict.fromkeys(self._extract_important_words(text, words, amounts)))
+
+        tag_list = list(tags)[:10]  # 限制返回最多10个标签
 
-        return list(tags)[:10]  # 限制返回最多10个标签
+        return TextAnalysis(
+            tags=tag_list,
+            category=compiled.category_for(tag_list),
+            impact_score=self._score_importance(text, importance_hits, amounts),
+        )
+
+    def extract_tags(self, text: str) -> List[str]:
+        """从文本中提取标签"""
+        return self.analyze(text).tags
 
-    def _extract_important_words(self, text: str, words: List[str]) -> Set[str]:
-        """提取重要的词汇作为标签"""
-        important_words = set()
+    def analyze_many(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> List[TextAnalysis]:
+        """批量分析文本，按分块分发到进程池，结果顺序与输入一致"""
+        texts = list(texts)
+        workers = workers or BATCH_WORKERS
+        chunk_size = chunk_size or BATCH_CHUNK_SIZE
 
-        # 提取公司名称（简单规则：包含"公司"、"科技"、"集团"等）
-        company_patterns = [
-            r"[\u4e00-\u9fa5]+(?:公司|科技|集团|企业|有限公司|股份|corp|inc|ltd)",
-            r"[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*(?:\s+(?:Inc|Corp|Ltd|LLC))",
+        # 数据量不足一个分块或只有一个进程时，直接在当前进程中处理
+        if workers <= 1 or len(texts) <= chunk_size:
+            return [self.analyze(text) for text in texts]
+
+        compiled = self._compiled
+        if self.cache is None:
+            return self._analyze_in_pool(texts, compiled, workers, chunk_size)
+
+        # 先查缓存，只把未命中的文本（去重后）交给进程池
+        texts = [normalize_text(text) for text in texts]
+        keys = [make_cache_key(text, compiled.fingerprint) for text in texts]
+        results: List[Optional[TextAnalysis]] = [self.cache.get(key) for key in keys]
+        missing: Dict[str, str] = {}
+        for text, key, analysis in zip(texts, keys, results):
+            if analysis is None:
+                missing.setdefault(key, text)
+
+        computed = dict(
+            zip(
+                missing,
+                self._analyze_in_pool(
+                    list(missing.values()), compiled, workers, chunk_size
+                ),
+            )
+        )
+        for key, analysis in computed.items():
+            self.cache.put(key, analysis)
+
+        return [
+            analysis if analysis is not None else computed[key]
+            for key, analysis in zip(keys, results)
         ]
 
-        for pattern in company_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            important_words.update([match.strip() for match in matches])
+    def _analyze_in_pool(
+        self,
+        texts: List[str],
+        compiled: CompiledKeywords,
+        workers: int,
+        chunk_size: int,
+    ) -> List[TextAnalysis]:
+        """在进程池中分块分析文本"""
+        if len(texts) <= chunk_size:
+            return [self._analyze(text, compiled) for text in texts]
 
-        # 提取数字相关信息（金额、百分比等）
-        amount_patterns = [
-            r"\d+(?:\.\d+)?(?:亿|万|千万|百万)(?:元|美元|人民币)?",
-            r"\d+(?:\.\d+)?%",
+        chunks = [
+            texts[start : start + chunk_size]
+            for start in range(0, len(texts), chunk_size)
         ]
+        results: List[TextAnalysis] = []
+        with self._lease_pool(workers, compiled) as pool:
+            for chunk_results in pool.map(_analyze_chunk, chunks):
+                results.extend(chunk_results)
+        return results
+
+    def extract_tags_batch(
+        self,
+        texts: Iterable[str],
+        workers: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+    ) -> List[List[str]]:
+        """批量提取标签"""
+        return [
+            analysis.tags for analysis in self.analyze_many(texts, workers, chunk_size)
+        ]
+
+    @contextmanager
+    def _lease_pool(
+        self, workers: int, compiled: CompiledKeywords
+    ) -> Iterator[ProcessPoolExecutor]:
+        """借用（必要时创建）批量分析使用的进程池，词典更新后重建
+
+        被替换或关闭的进程池要等借用它的调用全部结束后才关闭
+        """
+        with self._pool_lock:
+            pool = self._pool
+            retired = None
+            if (
+                pool is None
+                or pool.workers != workers
+                or pool.fingerprint != compiled.fingerprint
+            ):
+                retired = self._retire_pool()
+                pool = self._pool = _SharedPool(
+                    self._create_executor(workers, compiled),
+                    workers,
+                    compiled.fingerprint,
+                )
+            pool.leases += 1
+        if retired is not None:
+            retired.shutdown()
+
+        try:
+            yield pool.executor
+        finally:
+            with self._pool_lock:
+                pool.leases -= 1
+                idle = pool.retired and pool.leases == 0
+            if idle:
+                pool.executor.shutdown()
+
+    @staticmethod
+    def _create_executor(
+        workers: int, compiled: CompiledKeywords
+    ) -> ProcessPoolExecutor:
+        # 使用spawn启动子进程，避免在多线程的服务进程中fork
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                compiled.category_keywords,
+                compiled.importance_keywords,
+                compiled.version,
+            ),
+        )
 
-        for pattern in amount_patterns:
-            matches = re.findall(pattern, text)
-            important_words.update(matches)
+    def _retire_pool(self) -> Optional[ProcessPoolExecutor]:
+        """移出当前进程池（调用方持有锁）；没有调用在使用时返回它，由调用方关闭"""
+        pool, self._pool = self._pool, None
+        if pool is None:
+            return None
+        pool.retired = True
+        return pool.executor if pool.leases == 0 else None
 
-        # 提取专有名词（长度在2-6字符的中文词汇）
+    def shutdown_pool(self) -> None:
+        """关闭批量分析的进程池；仍有调用在使用时，由最后一个调用结束后关闭"""
+        with self._pool_lock:
+            executor = self._retire_pool()
+        if executor is not None:
+            executor.shutdown()
+
+    def _extract_important_words(
+        self, text: str, words: List[str], amounts: List[re.Match]
+    ) -> List[str]:
+        """按出现顺序提取重要的词汇作为标签（可能包含重复项）"""
+        important_words = []
+
+        # 提取公司名称
+        for pattern in COMPANY_PATTERNS:
+            matches = pattern.findall(text)
+            important_words.extend([match.strip() for match in matches])
+
+        # 提取数字相关信息（金额、百分比等）
+        important_words.extend(match.group(0) for match in amounts)
+        important_words.extend(PERCENT_PATTERN.findall(text))
+
+        # 提取专有名词（长度在2-6字符的中文词汇），过滤常见词汇
         for word in words:
             if 2 <= len(word) <= 6 and self._is_chinese(word):
-                # 过滤常见词汇
-                if word not in [
-                    "今天",
-                    "昨天",
-                    "明天",
-                    "时候",
-                    "地方",
-                    "这个",
-                    "那个",
-                    "什么",
-                    "怎么",
-                ]:
-                    important_words.add(word)
+                if word not in COMMON_WORDS:
+                    important_words.append(word)
 
         return important_words
 
     def _is_chinese(self, text: str) -> bool:
         """判断是否为中文"""
-        return bool(re.match(r"^[\u4e00-\u9fa5]+$", text))
+        return bool(CHINESE_PATTERN.match(text))
 
     def get_category(self, tags: List[str]) -> str:
         """根据标签推断主要分类"""
-        category_scores: Dict[str, int] = {}
-
-        for tag in tags:
-            for category, keywords in self.category_keywords.items():
-                if tag in keywords or tag == category:
-                    category_scores[category] = category_scores.get(category, 0) + 1
-
-        if category_scores:
-            return max(category_scores.items(), key=lambda x: x[1])[0]
-
-        return "其他"
+        return self._compiled.category_for(tags)
 
     def get_importance_score(self, text: str) -> int:
         """评估事件重要性评分 (1-10)"""
-        text_lower = text.lower()
+        _, importance_hits = self._compiled.match(text.lower())
+        return self._score_importance(
+            text, importance_hits, list(AMOUNT_PATTERN.finditer(text))
+        )
 
+    def _score_importance(
+        self, text: str, importance_hits: List[str], amounts: List[re.Match]
+    ) -> int:
+        """根据重要性关键词命中和金额大小计算评分"""
         score = 5  # 基础分数
 
-        for level, keywords in self.importance_keywords.items():
-            for keyword in keywords:
-                if keyword in text_lower:
-                    if level == "高":
-                        score += 3
-                    elif level == "中":
-                        score += 1
-                    elif level == "低":
-                        score -= 1
-
-        # 根据数字大小调整分数
-        amounts = re.findall(r"(\d+(?:\.\d+)?)(?:亿|万)", text)
-        if amounts:
-            max_amount = max([float(amount) for amount in amounts])
+        for level in importance_hits:
+            score += IMPORTANCE_LEVEL_WEIGHTS.get(level, 0)
+
+        # 根据数字大小调整分数（只统计以亿、万为单位的金额）
+        values = [
+            float(match.group(1)) for match in amounts if match.group(2) in ("亿", "万")
+        ]
+        if values:
+            max_amount = max(values)
             if "亿" in text:
                 if max_amount >= 100:
                     score += 3
@@ -273,3 +607,25 @@ class TagExtractor:
                     score += 1
 
         return min(10, max(1, score))
+
+
+# 进程池子进程中使用的 TagExtractor 实例
+_worker_extractor: Optional[TagExtractor] = None
+
+
+def _init_worker(
+    category_keywords: Dict[str, List[str]],
+    importance_keywords: Dict[str, List[str]],
+    version: Optional[int],
+) -> None:
+    """进程池子进程初始化：预加载jieba词典并编译关键词自动机"""
+    global _worker_extractor
+    get_tokenizer()
+    _worker_extractor = TagExtractor()
+    _worker_extractor.load_keywords(category_keywords, importance_keywords, version)
+
+
+def _analyze_chunk(texts: List[str]) -> List[TextAnalysis]:
+    """在子进程中分析一个分块"""
+    compiled = _worker_extractor._compiled
+    return [_worker_extractor._analyze(text, compiled) for text in texts]
@@ -0,0 +1,179 @@
+"""
+标签登记
+
+进程内缓存标签名到标签ID的映射，创建事件时已知的标签不再查询数据库；
+未知的标签先用一条 IN 查询查找，仍不存在的用一条多行
+INSERT ... ON CONFLICT DO NOTHING RETURNING 登记。
+本事务查到或插入的标签先记在会话中，事务提交后才进入缓存，回滚时丢弃，
+缓存中不会出现不存在的标签ID。标签不会被删除，缓存无需过期。
+"""
+
+import os
+import threading
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from ..database import Tag as DBTag
+
+_tags = DBTag.__table__
+
+# 与 tags.name 的长度一致，超长的标签无法登记
+MAX_TAG_LENGTH = 50
+# 缓存的标签数上限，超过时清空重新积累
+REGISTRY_SIZE = int(os.getenv("TAG_REGISTRY_SIZE", "100000"))
+# 会话中本事务查到或插入、尚未提交的标签
+_PENDING_KEY = "pending_tag_ids"
+
+
+def valid_tag_names(names: Iterable[str]) -> List[str]:
+    """去重并过滤无法登记的标签名"""
+    return [name for name in dict.fromkeys(names) if 0 < len(name) <= MAX_TAG_LENGTH]
+
+
+class TagRegistry:
+    """标签名到标签ID的进程内缓存"""
+
+    def __init__(self, max_entries: int = REGISTRY_SIZE):
+        self.max_entries = max_entries
+        self._ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.inserted = 0
+
+    def remember(self, tag_ids: Mapping[str, int]) -> None:
+        """记录已提交的标签"""
+        with self._lock:
+            if len(self._ids) + len(tag_ids) > self.max_entries:
+                self._ids.clear()
+            self._ids.update(tag_ids)
+
+    def invalidate(self, names: Optional[Iterable[str]] = None) -> None:
+        """移除指定标签（不指定时清空缓存）"""
+        with self._lock:
+            if names is None:
+                self._ids.clear()
+            else:
+                for name in names:
+                    self._ids.pop(name, None)
+
+    def ensure(
+        self, db: Session, tag_categories: Mapping[str, Optional[str]]
+    ) -> Dict[str, int]:
+        """返回 {标签名: 标签ID}，登记缺少的标签（不提交）"""
+        names = valid_tag_names(tag_categories)
+        if not names:
+            return {}
+
+        pending: Dict[str, int] = db.info.setdefault(_PENDING_KEY, {})
+        tag_ids: Dict[str, int] = {}
+        with self._lock:
+            for name in names:
+                tag_id = self._ids.get(name) or pending.get(name)
+                if tag_id is not None:
+                    tag_ids[name] = tag_id
+        unknown = [name for name in names if name not in tag_ids]
+        self.hits += len(tag_ids)
+        self.misses += len(unknown)
+        if not unknown:
+            return tag_ids
+
+        existing = self._select(db, unknown)
+        pending.update(existing)
+        tag_ids.update(existing)
+
+        missing = [
+            {"name": name, "category": tag_categories[name], "color": "#3B82F6"}
+            for name in unknown
+            if name not in existing
+        ]
+        if missing:
+            inserted = self._insert(db, missing)
+            self.inserted += len(inserted)
+            pending.update(inserted)
+            tag_ids.update(inserted)
+            # 与并发请求抢注了同一个标签，读取对方登记的ID
+            raced = [row["name"] for row in missing if row["name"] not in inserted]
+            if raced:
+                raced_ids = self._select(db, raced)
+                pending.update(raced_ids)
+                tag_ids.update(raced_ids)
+        return tag_ids
+
+    def _select(self, db: Session, names: List[str]) -> Dict[str, int]:
+        return dict(
+            db.execute(
+                select(_tags.c.name, _tags.c.id).where(_tags.c.name.in_(names))
+            ).all()
+        )
+
+    def _insert(
+        self, db: Session, rows: List[Dict[str, Optional[str]]]
+    ) -> Dict[str, int]:
+        """登记新标签，返回本次实际插入的 {标签名: 标签ID}"""
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert_func = pg_insert if dialect == "postgresql" else sqlite_insert
+            return dict(
+                db.execute(
+                    insert_func(_tags)
+                    .values(rows)
+                    .on_conflict_do_nothing(index_elements=["name"])
+                    .returning(_tags.c.name, _tags.c.id)
+                ).all()
+            )
+
+        # 其他数据库：整批插入，冲突时逐个插入并跳过已存在的
+        inserted = []
+        try:
+            with db.begin_nested():
+                db.execute(insert(_tags), rows)
+            inserted = rows
+        except IntegrityError:
+            for row in rows:
+                try:
+                    with db.begin_nested():
+                        db.execute(insert(_tags), [row])
+                    inserted.append(row)
+                except IntegrityError:
+                    pass
+        return self._select(db, [row["name"] for row in inserted]) if inserted else {}
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._ids),
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserted": self.inserted,
+        }
+
+
+tag_registry = TagRegistry()
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_tags(session: Session) -> None:
+    # 释放 SAVEPOINT 也会触发 after_commit，只在最外层事务提交时进入缓存
+    if session.in_nested_transaction():
+        return
+    tag_ids = session.info.pop(_PENDING_KEY, None)
+    if tag_ids:
+        tag_registry.remember(tag_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_tags(session: Session) -> None:
+    # 回滚到 SAVEPOINT 时无法区分哪些标签被撤销，全部丢弃，之后重新查询
+    session.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_unfinished_tags(session: Session, transaction) -> None:
+    # 会话未提交就关闭
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
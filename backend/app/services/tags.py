@@ -0,0 +1,22 @@
+"""
+标签字符串
+
+事件的标签以逗号分隔的字符串保存在 events.tags 中，用户输入时也接受中文逗号和分号。
+"""
+
+import re
+from typing import List, Optional
+
+# 标签分隔符：中英文逗号和分号
+TAG_SEPARATORS = re.compile(r"[,，;；]")
+
+
+def split_tags(tags_string: Optional[str]) -> List[str]:
+    """分割标签字符串，支持中英文逗号和分号"""
+    if not tags_string:
+        return []
+
+    tags = TAG_SEPARATORS.split(tags_string)
+
+    # 清理空白字符并过滤空字符串
+    return [tag.strip() for tag in tags if tag.strip()]
@@ -14,6 +14,7 @@ from app.models import (
     PasswordChangeRequest,
 )
 from app.core.auth import get_password_hash, verify_password, create_access_token
+from app.services.event_counters import get_category_counts
 
 
 class UserService:
@@ -153,26 +154,10 @@ class UserService:
             self.db.rollback()
             raise ValueError("密码修改失败")
 
-    def get_user_statistics(self, user_id: int) -> dict:
-        """获取用户统计信息"""
-        from app.database import Event
-
-        user = self.get_user_by_id(user_id)
-        if not user:
-            return {}
-
-        # 统计用户的事件数据
-        total_events = self.db.query(Event).filter(Event.user_id == user_id).count()
-
-        # 按分类统计
-        from sqlalchemy import func
-
-        category_stats = (
-            self.db.query(Event.category, func.count(Event.id))
-            .filter(Event.user_id == user_id)
-            .group_by(Event.category)
-            .all()
-        )
+    def get_user_statistics(self, user: User) -> dict:
+        """获取用户统计信息（读取分类计数器，总数为各分类之和）"""
+        category_stats = get_category_counts(self.db, user.id)
+        total_events = sum(count for _, count in category_stats)
 
         return {
             "total_events": total_events,
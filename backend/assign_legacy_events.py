@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+早期事件归属脚本
+加入用户系统之前创建的事件由迁移 0009_event_owner 归属到用户名下；
+迁移时还没有任何用户的话，这些事件不会出现在任何用户的查询结果中。
+注册用户后运行本脚本，把它们归到指定用户（默认为第一个超级管理员，
+没有时为最早注册的用户）名下。
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal, User, create_tables
+from app.services.data_version import bump_data_version
+from app.services.event_owner import (
+    assign_legacy_events,
+    count_legacy_events,
+    legacy_owner_id,
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="把没有归属的早期事件归到用户名下")
+    parser.add_argument("--email", help="归属用户的邮箱（默认自动选择）")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="只检查，不归属；有未归属的事件时退出码为1",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # 确保迁移已经执行
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        remaining = count_legacy_events(db)
+        if not remaining:
+            print("✅ 所有事件都已归属到用户")
+            sys.exit(0)
+        if args.check:
+            print(f"❌ 有 {remaining} 条早期事件未归属，运行 assign_legacy_events.py")
+            sys.exit(1)
+
+        if args.email:
+            user = db.query(User).filter(User.email == args.email).first()
+            if user is None:
+                print(f"❌ 没有找到用户: {args.email}")
+                sys.exit(1)
+            owner_id = user.id
+        else:
+            owner_id = legacy_owner_id(db)
+            if owner_id is None:
+                print("❌ 还没有任何用户，请先注册用户")
+                sys.exit(1)
+
+        moved = assign_legacy_events(db, owner_id)
+        bump_data_version(db, [owner_id])
+        db.commit()
+        print(f"🎉 已把 {moved} 条早期事件归属到用户 {owner_id}")
+    finally:
+        db.close()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+事件导出基准测试
+
+直接消费导出接口使用的 stream_export，统计导出速度和进程内存。
+数据库的页缓存、SQLite 的 mmap 会在导出开始时占用一定内存，之后应保持平稳：
+热身（前 --warmup-batches 批）之后内存增长超过 --max-rss-mb 时退出码为1，
+用于确认导出的内存占用与事件总数无关。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.seed_events --count 1000000
+    python -m benchmarks.bench_export --format csv --gzip
+"""
+
+import argparse
+import os
+import resource
+import sys
+import time
+
+from app.database import Event as DBEvent, SessionLocal, User
+from app.services.event_owner import owned_by
+from app.services.export import EXPORT_COLUMNS, stream_export
+
+from .seed_events import BENCH_EMAIL
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为KB，macOS 为字节
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def current_rss_mb() -> float:
+    """当前常驻内存；没有 /proc 时退回峰值内存"""
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return peak_rss_mb()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="事件导出基准测试")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--gzip", action="store_true", help="gzip 压缩")
+    parser.add_argument(
+        "--warmup-batches", type=int, default=50, help="不计入内存增长的前几批"
+    )
+    parser.add_argument(
+        "--max-rss-mb", type=float, default=32, help="热身后内存增长上限（MB）"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    finally:
+        db.close()
+    if user is None:
+        print("❌ 没有找到基准测试数据，请先运行 python -m benchmarks.seed_events")
+        sys.exit(1)
+
+    def build_query(db):
+        return (
+            db.query(*EXPORT_COLUMNS)
+            .filter(owned_by(user.id))
+            .order_by(DBEvent.event_date.desc(), DBEvent.id.desc())
+        )
+
+    rss_start = current_rss_mb()
+    rss_warm = None
+    started = time.monotonic()
+    size = 0
+    lines = 0
+    chunks = stream_export(SessionLocal, build_query, args.format, args.gzip)
+    for index, chunk in enumerate(chunks):
+        size += len(chunk)
+        if not args.gzip:
+            lines += chunk.count(b"\n")
+        if index + 1 == args.warmup_batches:
+            rss_warm = current_rss_mb()
+    elapsed = time.monotonic() - started
+    rss_end = current_rss_mb()
+    rss_growth = rss_end - (rss_warm or rss_end)
+
+    print(f"📦 导出 {size / 1024 / 1024:.1f}MB，用时 {elapsed:.1f}s")
+    if lines:
+        print(f"📄 {lines} 行，{lines / elapsed:.0f} 行/秒")
+    print(
+        f"🧠 内存 开始 {rss_start:.0f}MB，热身后 {rss_warm or rss_end:.0f}MB，"
+        f"结束 {rss_end:.0f}MB，热身后增长 {rss_growth:.1f}MB"
+        f"（上限 {args.max_rss_mb}MB）"
+    )
+    if rss_warm is None:
+        print("⚠️  导出的批数不足热身批数，无法判断内存是否平稳")
+    if rss_growth > args.max_rss_mb:
+        print("❌ 导出的内存占用超过上限")
+        sys.exit(1)
+    print("✅ 导出的内存占用在上限以内")
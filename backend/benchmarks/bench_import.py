@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+事件导入基准测试
+
+用 corpus.py 的语料边生成边导入 NDJSON（不落盘），统计导入速度和进程内存。
+导入的事件归属于专用用户，每次运行前清空该用户上次导入的事件。
+热身（前 --warmup-batches 批）之后内存增长超过 --max-rss-mb 时退出码为1，
+用于确认导入的内存占用与文件大小无关。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.bench_import --count 20000
+"""
+
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from app.core.auth import get_password_hash
+from app.database import (
+    Event as DBEvent,
+    EventCounter,
+    EventTag,
+    JobCheckpoint,
+    SessionLocal,
+    User,
+    create_tables,
+)
+from app.services.event_import import ChunkStream, job_name, run_import
+from app.services.retag import build_extractor
+
+from .bench_export import current_rss_mb
+from .corpus import DEFAULT_SEED, generate_corpus
+
+IMPORT_EMAIL = "importbench@example.com"
+IMPORT_ID = "bench"
+
+
+def reset_import_user() -> int:
+    """获取或创建导入用户，清空其事件、计数器和导入检查点"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == IMPORT_EMAIL).first()
+        if user is None:
+            user = User(
+                email=IMPORT_EMAIL,
+                username="importbench",
+                hashed_password=get_password_hash("importbench"),
+                full_name="Import benchmark",
+            )
+            db.add(user)
+            db.commit()
+        user_events = select(DBEvent.id).where(DBEvent.user_id == user.id)
+        db.execute(delete(EventTag).where(EventTag.event_id.in_(user_events)))
+        db.execute(delete(DBEvent).where(DBEvent.user_id == user.id))
+        db.execute(delete(EventCounter).where(EventCounter.user_id == user.id))
+        db.execute(
+            delete(JobCheckpoint).where(
+                JobCheckpoint.job_name == job_name(user.id, IMPORT_ID)
+            )
+        )
+        db.commit()
+        return user.id
+    finally:
+        db.close()
+
+
+def generate_ndjson(count: int, seed: int, bad_every: int):
+    """逐行生成 NDJSON，每 bad_every 行插入一行无效数据"""
+    rng = random.Random(seed)
+    corpus = [text for texts in generate_corpus(500, seed).values() for text in texts]
+    start = datetime(2015, 1, 1)
+    for index in range(count):
+        if bad_every and index % bad_every == bad_every - 1:
+            yield b'{"title": ""}\n'
+            continue
+        title, _, description = rng.choice(corpus).partition("，")
+        row = {
+            "title": title[:200],
+            "description": description,
+            "event_date": (start + timedelta(days=rng.randrange(3650))).isoformat(),
+            "tags": rng.choice(["", "历史档案", "历史档案,迁移"]),
+        }
+        yield json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="事件导入基准测试")
+    parser.add_argument("--count", type=int, default=20_000, help="导入行数")
+    parser.add_argument("--batch-size", type=int, default=2000, help="每批提交的行数")
+    parser.add_argument(
+        "--bad-every", type=int, default=1000, help="每隔多少行插入一行无效数据"
+    )
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    parser.add_argument(
+        "--warmup-batches", type=int, default=5, help="不计入内存增长的前几批"
+    )
+    parser.add_argument(
+        "--max-rss-mb", type=float, default=32, help="热身后内存增长上限（MB）"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    create_tables()
+    user_id = reset_import_user()
+    tag_extractor = build_extractor(SessionLocal)
+
+    batches = 0
+    rss_warm = None
+
+    def on_progress(progress) -> None:
+        global batches, rss_warm
+        batches += 1
+        if batches == args.warmup_batches:
+            rss_warm = current_rss_mb()
+
+    rss_start = current_rss_mb()
+    try:
+        progress = run_import(
+            SessionLocal,
+            user_id,
+            ChunkStream(generate_ndjson(args.count, args.seed, args.bad_every)),
+            "ndjson",
+            tag_extractor,
+            IMPORT_ID,
+            batch_size=args.batch_size,
+            on_progress=on_progress,
+        )
+    finally:
+        tag_extractor.shutdown_pool()
+    rss_end = current_rss_mb()
+    rss_growth = rss_end - (rss_warm or rss_end)
+
+    print(
+        f"📥 导入 {progress.imported} 条，拒绝 {progress.rejected} 条，"
+        f"用时 {progress.elapsed:.1f}s，{progress.rows_per_sec:.0f} 行/秒"
+    )
+    print(
+        f"🧠 内存 开始 {rss_start:.0f}MB，热身后 {rss_warm or rss_end:.0f}MB，"
+        f"结束 {rss_end:.0f}MB，热身后增长 {rss_growth:.1f}MB"
+        f"（上限 {args.max_rss_mb}MB）"
+    )
+    if rss_warm is None:
+        print("⚠️  导入的批数不足热身批数，无法判断内存是否平稳")
+    if rss_growth > args.max_rss_mb:
+        print("❌ 导入的内存占用超过上限")
+        sys.exit(1)
+    print("✅ 导入的内存占用在上限以内")
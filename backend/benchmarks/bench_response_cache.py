@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+响应缓存基准测试
+
+以 seed_events.py 的基准用户请求时间线、搜索和统计接口，分别测量缓存未命中
+（关闭缓存）和命中时的延迟，进程内后端和共享存储后端（本地替身）各测一遍。
+随后把用户的数据版本加一，确认之后的请求不再命中旧缓存、响应与未缓存时一致。
+需要查询事件表的请求命中缓存时的 p50 没有快于 --min-speedup 倍，
+或缓存没有失效时，退出码为1。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.seed_events --count 1000000
+    python -m benchmarks.bench_response_cache
+"""
+
+import argparse
+import sys
+import time
+from typing import List
+
+from fastapi.testclient import TestClient
+
+from app.api.events import response_cache
+from app.database import SessionLocal, User
+from app.main import app
+from app.services.data_version import bump_data_version
+from app.services.response_cache import (
+    LocalStore,
+    MemoryCacheBackend,
+    SharedStoreBackend,
+)
+
+from .bench_search import _percentile
+from .seed_events import BENCH_EMAIL, BENCH_PASSWORD
+
+# (地址, 查询参数, 是否检查加速倍数)；读取计数器的请求本身的开销已经接近认证和
+# 请求处理的固定开销，只检查需要查询或计数事件表的请求
+REQUESTS = [
+    ("/api/events/timeline", {"size": 20}, False),
+    ("/api/events/timeline", {"size": 20, "total": "exact"}, True),
+    ("/api/events/search", {"query": "人工智能", "limit": 50}, True),
+    ("/api/events/stats/categories", {}, False),
+    ("/api/events/stats/timeline", {}, False),
+]
+
+
+def measure(client: TestClient, path: str, params: dict, repeat: int) -> float:
+    """请求 repeat 次，返回延迟的 p50（毫秒）"""
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        response = client.get(path, params=params)
+        samples.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+    return _percentile(samples, 50)
+
+
+def check_invalidation(client: TestClient) -> bool:
+    """数据版本变化后，同一请求不命中旧缓存，响应与不使用缓存时一致"""
+    path, params, _ = REQUESTS[0]
+    client.get(path, params=params)
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        bump_data_version(db, [user.id])
+        db.commit()
+    finally:
+        db.close()
+
+    hits = response_cache.hits
+    fresh = client.get(path, params=params)
+    missed = response_cache.hits == hits
+    backend, response_cache.backend = response_cache.backend, None
+    uncached = client.get(path, params=params)
+    response_cache.backend = backend
+    return missed and fresh.content == uncached.content
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="响应缓存基准测试")
+    parser.add_argument("--repeat", type=int, default=20, help="每个请求重复次数")
+    parser.add_argument(
+        "--min-speedup", type=float, default=2.0, help="命中时 p50 的最低加速倍数"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    failed = False
+
+    with TestClient(app) as client:
+        login = client.post(
+            "/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+        )
+        if login.status_code != 200:
+            print("❌ 没有找到基准测试数据，请先运行 python -m benchmarks.seed_events")
+            sys.exit(1)
+        client.headers["Authorization"] = f"Bearer {login.json()['access_token']}"
+
+        for backend in (MemoryCacheBackend(), SharedStoreBackend(LocalStore())):
+            response_cache.backend = backend
+            print(f"🗄️  缓存后端: {backend.name}")
+            for path, params, check in REQUESTS:
+                response_cache.backend = None
+                miss = measure(client, path, params, args.repeat)
+                response_cache.backend = backend
+                client.get(path, params=params)
+                hit = measure(client, path, params, args.repeat)
+                speedup = miss / hit if hit else float("inf")
+                print(
+                    f"  {path:<30} {str(params):<40} 未命中 p50 {miss:8.1f}ms  "
+                    f"命中 p50 {hit:6.1f}ms  {speedup:5.1f}x"
+                )
+                if check and speedup < args.min_speedup:
+                    failed = True
+
+            invalidated = check_invalidation(client)
+            print(f"  {'✅' if invalidated else '❌'} 数据版本变化后缓存失效")
+            failed = failed or not invalidated
+
+        print(f"📊 {response_cache.stats()}")
+
+    if failed:
+        print("❌ 响应缓存没有达到预期")
+        sys.exit(1)
+    print("✅ 响应缓存工作正常")
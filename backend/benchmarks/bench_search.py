@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+事件搜索基准测试
+
+对 seed_events.py 生成的数据执行与 /api/events/search 相同的查询，
+测量首页和按游标翻页的延迟，p99 超过目标值时退出码为1。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.seed_events --count 1000000
+    python -m benchmarks.bench_search --target-ms 200
+    python -m benchmarks.bench_search --explain   # 打印一条查询的执行计划
+
+设置 DATABASE_URL=sqlite:///... 即可在 SQLite（FTS5 后端）上运行。
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from app.database import Event as DBEvent, SessionLocal, User, engine
+from app.services.event_owner import owned_by
+from app.services.search import get_search_backend, search_page
+
+from .seed_events import BENCH_EMAIL
+
+QUERIES = [
+    "人工智能",
+    "融资",
+    "芯片",
+    "宁德时代",
+    "海外市场",
+    "IPO",
+    "Tesla",
+    "研发投入",
+    "收购",
+    "用户规模持续增长",
+]
+PAGES = 5
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    ordered = sorted(samples)
+    return ordered[
+        min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    ]
+
+
+def run(repeat: int, limit: int) -> Dict[str, List[float]]:
+    backend = get_search_backend(engine)
+    print(f"🔍 搜索后端: {backend.name}")
+    samples: Dict[str, List[float]] = {"first_page": [], "next_pages": []}
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+        if user is None:
+            print("❌ 没有找到基准测试数据，请先运行 python -m benchmarks.seed_events")
+            sys.exit(1)
+
+        for _ in range(repeat):
+            for query_text in QUERIES:
+                cursor = None
+                for page in range(PAGES):
+                    query = db.query(DBEvent).filter(owned_by(user.id))
+                    started = time.perf_counter()
+                    _, cursor = search_page(query, backend, query_text, cursor, limit)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    samples["first_page" if page == 0 else "next_pages"].append(elapsed)
+                    if not cursor:
+                        break
+                db.rollback()
+    finally:
+        db.close()
+    return samples
+
+
+def explain(limit: int) -> None:
+    """打印第一个查询词的执行计划"""
+    backend = get_search_backend(engine)
+    db = SessionLocal()
+    try:
+        query, score = backend.search(db.query(DBEvent), QUERIES[0], datetime.utcnow())
+        if score is not None:
+            query = query.order_by(score.desc(), DBEvent.id.desc())
+        statement = query.limit(limit).statement.compile(
+            engine, compile_kwargs={"literal_binds": True}
+        )
+        if engine.dialect.name == "sqlite":
+            for row in db.execute(text(f"EXPLAIN QUERY PLAN {statement}")):
+                print(row[-1])
+        else:
+            for (line,) in db.execute(text(f"EXPLAIN ANALYZE {statement}")):
+                print(line)
+    finally:
+        db.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="事件搜索基准测试")
+    parser.add_argument("--repeat", type=int, default=3, help="每个查询词重复轮数")
+    parser.add_argument("--limit", type=int, default=50, help="每页条数")
+    parser.add_argument(
+        "--target-ms", type=float, default=200, help="p99 延迟目标（毫秒）"
+    )
+    parser.add_argument("--explain", action="store_true", help="打印执行计划")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.explain:
+        explain(args.limit)
+        sys.exit(0)
+
+    samples = run(args.repeat, args.limit)
+    failed = False
+    for name, values in samples.items():
+        if not values:
+            continue
+        p50 = _percentile(values, 50)
+        p99 = _percentile(values, 99)
+        print(f"{name:<12} 次数 {len(values):>5}  p50 {p50:8.1f}ms  p99 {p99:8.1f}ms")
+        failed = failed or p99 > args.target_ms
+
+    if failed:
+        print(f"❌ p99 延迟超过目标 {args.target_ms}ms")
+        sys.exit(1)
+    print(f"✅ p99 延迟在目标 {args.target_ms}ms 以内")
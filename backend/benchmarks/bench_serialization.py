@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+事件响应序列化基准测试
+
+对 seed_events.py 生成的数据按时间线顺序逐页读取，比较每页的 CPU 时间
+（查询加序列化，SQLite 在进程内执行，查询的 CPU 也计入）和响应大小：
+
+- orm：查询 ORM 实体，经 TimelineResponse 模型序列化（原来的做法）
+- columns：只查询需要的列，用 JSON 编码器直接编码每行（不使用片段缓存）
+- fragments：同 columns，片段缓存已预热
+- list-view：columns 加上 fields 投影，省略 description 和 feedback
+- 其余格式（按 Accept 协商）：msgpack、columnar+msgpack 和 columnar+json，查询与 columns 相同
+
+columns 的 CPU 时间没有低于 orm 时退出码为1。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.seed_events --count 1000000
+    python -m benchmarks.bench_serialization --pages 50 --size 100
+"""
+
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+from app.database import Event as DBEvent, SessionLocal, User
+from app.models import TimelineResponse
+from app.services.event_fragments import (
+    EVENT_FIELDS,
+    EventFragmentCache,
+    event_columns,
+    orjson,
+)
+from app.services.event_owner import owned_by
+from app.services.response_formats import FORMATS, MEDIA_JSON, ResponseFormat
+
+from .seed_events import BENCH_EMAIL
+
+LIST_VIEW_FIELDS = tuple(
+    name for name in EVENT_FIELDS if name not in ("description", "feedback")
+)
+
+
+def orm_page(db, user_id: int, offset: int, size: int) -> bytes:
+    events = (
+        db.query(DBEvent)
+        .filter(owned_by(user_id))
+        .order_by(DBEvent.event_date.desc(), DBEvent.id.desc())
+        .offset(offset)
+        .limit(size)
+        .all()
+    )
+    timeline = TimelineResponse(events=events, total=None, page=None, size=size)
+    content = timeline.model_dump_json().encode("utf-8")
+    # 每页使用新的会话状态，与每个请求一个会话一致
+    db.expunge_all()
+    return content
+
+
+def _column_rows(db, user_id: int, fields: Tuple[str, ...], offset: int, size: int):
+    return (
+        db.query(*event_columns(fields))
+        .filter(owned_by(user_id))
+        .order_by(DBEvent.event_date.desc(), DBEvent.id.desc())
+        .offset(offset)
+        .limit(size)
+        .all()
+    )
+
+
+def column_page(cache: EventFragmentCache, fields: Tuple[str, ...]):
+    def render(db, user_id: int, offset: int, size: int) -> bytes:
+        rows = _column_rows(db, user_id, fields, offset, size)
+        return cache.render_timeline(
+            rows, fields, total=None, page=None, size=size, next_cursor=None
+        )
+
+    return render
+
+
+def format_page(fmt: ResponseFormat):
+    def render(db, user_id: int, offset: int, size: int) -> bytes:
+        rows = _column_rows(db, user_id, EVENT_FIELDS, offset, size)
+        page = {"total": None, "page": None, "size": size, "next_cursor": None}
+        return fmt.encode({"events": fmt.events(rows, EVENT_FIELDS), **page})
+
+    return render
+
+
+def measure(
+    render: Callable, user_id: int, pages: int, size: int, repeat: int
+) -> Tuple[float, float]:
+    """返回 (每页平均 CPU 毫秒, 每页平均字节数)"""
+    db = SessionLocal()
+    try:
+        cpu = 0.0
+        payload = 0
+        for _ in range(repeat):
+            for page in range(pages):
+                started = time.process_time()
+                content = render(db, user_id, page * size, size)
+                cpu += time.process_time() - started
+                payload += len(content)
+            db.rollback()
+    finally:
+        db.close()
+    count = pages * repeat
+    return cpu / count * 1000, payload / count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="事件响应序列化基准测试")
+    parser.add_argument("--pages", type=int, default=50, help="读取的页数")
+    parser.add_argument("--size", type=int, default=100, help="每页事件数")
+    parser.add_argument("--repeat", type=int, default=3, help="重复轮数")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    finally:
+        db.close()
+    if user is None:
+        print("❌ 没有找到基准测试数据，请先运行 python -m benchmarks.seed_events")
+        sys.exit(1)
+
+    warm_cache = EventFragmentCache()
+    paths: Dict[str, Callable] = {
+        "orm": orm_page,
+        "columns": column_page(EventFragmentCache(max_entries=0), EVENT_FIELDS),
+        "fragments": column_page(warm_cache, EVENT_FIELDS),
+        "list-view": column_page(EventFragmentCache(max_entries=0), LIST_VIEW_FIELDS),
+    }
+    for fmt in FORMATS:
+        if fmt.media_type != MEDIA_JSON and fmt.available:
+            name = fmt.media_type.split("/")[1].replace("vnd.grandthings.", "")
+            paths[name] = format_page(fmt)
+    # 预热片段缓存
+    measure(paths["fragments"], user.id, args.pages, args.size, 1)
+
+    print(f"🧪 编码器: {'orjson' if orjson is not None else 'pydantic-core'}")
+    results: Dict[str, List[float]] = {}
+    for name, render in paths.items():
+        cpu_ms, payload = measure(render, user.id, args.pages, args.size, args.repeat)
+        results[name] = [cpu_ms, payload]
+        baseline_ms, baseline_bytes = results["orm"]
+        print(
+            f"  {name:<17} 每页 CPU {cpu_ms:7.2f}ms（{cpu_ms / baseline_ms:4.0%}）  "
+            f"大小 {payload / 1024:7.1f}KB（{payload / baseline_bytes:4.0%}）"
+        )
+
+    if results["columns"][0] >= results["orm"][0]:
+        print("❌ 按列查询和直接编码没有比 ORM 加模型序列化更快")
+        sys.exit(1)
+    print("✅ 按列查询和直接编码比 ORM 加模型序列化更快")
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+TagExtractor 基准测试
+
+测量 extract_tags、get_category、get_importance_score 和 analyze 在各类语料上的
+吞吐量、单次调用 p50/p99 延迟和峰值内存，以及 analyze 耗时随文本长度、
+关键词数量的变化。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.bench_tag_extractor          # 打印结果
+    python -m benchmarks.bench_tag_extractor --save   # 保存为基线
+    python -m benchmarks.bench_tag_extractor --check  # 与基线对比，退化时退出码为1
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Sequence
+
+from app.services.segment_dict import get_tokenizer
+from app.services.tag_extractor import (
+    DEFAULT_IMPORTANCE_KEYWORDS,
+    TagExtractor,
+)
+
+from .corpus import DEFAULT_SEED, generate_articles, generate_corpus, generate_keywords
+
+# 基线与机器相关，更换运行基准的机器后需要用 --save 重新生成
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# 允许的退化比例：p50 延迟或峰值内存增加、吞吐量下降超过该比例即视为退化
+DEFAULT_THRESHOLD = 0.25
+
+TEXT_LENGTHS = [100, 500, 1000, 5000]
+KEYWORD_COUNTS = [48, 500, 2000, 8000]
+
+
+def _percentile(samples: Sequence[float], percent: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(percent / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def measure(func: Callable, inputs: List, repeat: int) -> Dict[str, float]:
+    """逐次计时得到延迟分布和吞吐量，再单独运行一轮测量峰值内存
+
+    吞吐量和 p50 取各轮中最好的一轮，减少机器上其他负载带来的抖动；
+    p99 取全部样本，反映偶发的慢调用。
+    """
+    for item in inputs[: min(len(inputs), 20)]:
+        func(item)
+
+    samples: List[float] = []
+    best_throughput = 0.0
+    best_p50 = float("inf")
+    for _ in range(repeat):
+        round_samples = []
+        started = time.perf_counter()
+        for item in inputs:
+            begin = time.perf_counter_ns()
+            func(item)
+            round_samples.append((time.perf_counter_ns() - begin) / 1000)
+        elapsed = time.perf_counter() - started
+        best_throughput = max(best_throughput, len(inputs) / elapsed)
+        best_p50 = min(best_p50, _percentile(round_samples, 50))
+        samples.extend(round_samples)
+
+    # tracemalloc 会明显拖慢执行，只在单独的一轮中开启
+    tracemalloc.start()
+    for item in inputs:
+        func(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": len(samples),
+        "throughput": round(best_throughput, 1),
+        "p50_us": round(best_p50, 1),
+        "p99_us": round(_percentile(samples, 99), 1),
+        "peak_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(size: int, repeat: int, seed: int) -> Dict[str, Dict[str, float]]:
+    """运行全部基准，返回 {基准名: 指标}"""
+    get_tokenizer()
+    extractor = TagExtractor()
+    corpus = generate_corpus(size, seed)
+    results: Dict[str, Dict[str, float]] = {}
+
+    for scenario, texts in corpus.items():
+        tags = [extractor.extract_tags(text) for text in texts]
+        results[f"extract_tags/{scenario}"] = measure(
+            extractor.extract_tags, texts, repeat
+        )
+        results[f"get_category/{scenario}"] = measure(
+            extractor.get_category, tags, repeat
+        )
+        results[f"get_importance_score/{scenario}"] = measure(
+            extractor.get_importance_score, texts, repeat
+        )
+        results[f"analyze/{scenario}"] = measure(extractor.analyze, texts, repeat)
+
+    # 文本长度的影响
+    for length in TEXT_LENGTHS:
+        articles = generate_articles(length, max(10, size // 4), seed)
+        results[f"analyze/length_{length}"] = measure(
+            extractor.analyze, articles, repeat
+        )
+
+    # 关键词数量的影响
+    articles = generate_articles(1000, max(10, size // 4), seed)
+    for count in KEYWORD_COUNTS:
+        scaled = TagExtractor(
+            generate_keywords(count, seed), DEFAULT_IMPORTANCE_KEYWORDS
+        )
+        results[f"analyze/keywords_{count}"] = measure(scaled.analyze, articles, repeat)
+
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    """与基线对比，返回退化项说明"""
+    regressions = []
+    limit = 1 + threshold
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["p50_us"] > base["p50_us"] * limit:
+            regressions.append(
+                f"{name}: p50 {base['p50_us']}µs -> {current['p50_us']}µs"
+            )
+        if current["throughput"] * limit < base["throughput"]:
+            regressions.append(
+                f"{name}: 吞吐量 {base['throughput']}/s -> {current['throughput']}/s"
+            )
+        # 峰值内存很小时波动比例大，不足 64KB 的不参与对比
+        if base["peak_kb"] >= 64 and current["peak_kb"] > base["peak_kb"] * limit:
+            regressions.append(
+                f"{name}: 峰值内存 {base['peak_kb']}KB -> {current['peak_kb']}KB"
+            )
+    return regressions
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'基准':<36}{'次数':>8}{'吞吐量/s':>12}{'p50(µs)':>10}"
+        f"{'p99(µs)':>10}{'峰值(KB)':>10}"
+    )
+    for name, metrics in results.items():
+        print(
+            f"{name:<38}{metrics['calls']:>8}{metrics['throughput']:>12}"
+            f"{metrics['p50_us']:>10}{metrics['p99_us']:>10}{metrics['peak_kb']:>10}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="TagExtractor 基准测试")
+    parser.add_argument("--size", type=int, default=200, help="每个场景的语料条数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个基准重复轮数")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="语料随机种子")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="基线文件路径")
+    parser.add_argument("--save", action="store_true", help="把结果保存为基线")
+    parser.add_argument("--check", action="store_true", help="与基线对比")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="允许的退化比例（默认0.25）",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run_benchmarks(args.size, args.repeat, args.seed)
+    print_results(results)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "environment": {
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "size": args.size,
+                        "repeat": args.repeat,
+                        "seed": args.seed,
+                        "cpu_count": os.cpu_count(),
+                    },
+                    "results": results,
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"💾 基线已保存: {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"❌ 基线文件不存在: {args.baseline}")
+            sys.exit(1)
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"❌ 以下基准退化超过 {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"✅ 所有基准均在基线的 {args.threshold:.0%} 以内")
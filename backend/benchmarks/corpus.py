@@ -0,0 +1,162 @@
+"""
+标签提取基准测试语料生成器
+
+用固定随机种子生成可复现的中英文混合语料，覆盖：
+- short_title：事件标题（约20字）
+- wechat_article：公众号风格长文（约1000字）
+- english_mixed：夹杂英文公司名的中英文混合文本
+- finance_amounts：金额、百分比密集的财经文本
+同一种子在任何机器上生成完全相同的语料，保证基准数据可对比。
+"""
+
+import random
+from typing import Dict, List
+
+from app.services.tag_extractor import (
+    DEFAULT_CATEGORY_KEYWORDS,
+    DEFAULT_IMPORTANCE_KEYWORDS,
+)
+
+DEFAULT_SEED = 20240601
+
+SUBJECTS = ["字节跳动", "华为", "阿里巴巴", "腾讯", "小米集团", "蔚来汽车", "宁德时代"]
+ENGLISH_COMPANIES = [
+    "Apple Inc",
+    "Open Research Corp",
+    "Nvidia Corp",
+    "Tesla Inc",
+    "Acme Robotics Ltd",
+    "Blue Ocean LLC",
+]
+VERBS = ["宣布", "完成", "发布", "启动", "签署", "获得", "推出", "披露"]
+FILLERS = [
+    "业内人士认为",
+    "据知情人士透露",
+    "从长期来看",
+    "与此同时",
+    "值得注意的是",
+    "在今年的发布会上",
+    "面对激烈的市场竞争",
+    "公司管理层表示",
+    "这一举措意味着",
+    "分析师普遍预计",
+]
+CLAUSES = [
+    "行业格局将迎来新的变化",
+    "用户规模持续增长",
+    "研发投入进一步加大",
+    "产品线覆盖更多场景",
+    "海外市场成为新的增长点",
+    "供应链稳定性显著提升",
+    "团队规模扩大到数千人",
+    "合作伙伴数量翻倍",
+]
+AMOUNT_UNITS = ["亿元", "万元", "亿美元", "千万元", "百万人民币"]
+PUNCTUATION = ["，", "。", "；", "！"]
+
+
+def _keywords() -> List[str]:
+    """语料中使用的分类和重要性关键词"""
+    words = [kw for kws in DEFAULT_CATEGORY_KEYWORDS.values() for kw in kws]
+    words += [kw for kws in DEFAULT_IMPORTANCE_KEYWORDS.values() for kw in kws]
+    return words
+
+
+def _amount(rng: random.Random) -> str:
+    value = rng.choice([rng.randint(1, 999), round(rng.uniform(0.1, 99.9), 1)])
+    return f"{value}{rng.choice(AMOUNT_UNITS)}"
+
+
+def _sentence(rng: random.Random, keywords: List[str]) -> str:
+    """生成一个包含主体、动作、关键词和从句的句子"""
+    parts = [
+        rng.choice(FILLERS),
+        rng.choice(PUNCTUATION[:1]),
+        rng.choice(SUBJECTS),
+        rng.choice(VERBS),
+        rng.choice(keywords),
+        "计划",
+        rng.choice(CLAUSES),
+        rng.choice(PUNCTUATION),
+    ]
+    return "".join(parts)
+
+
+def short_title(rng: random.Random, keywords: List[str]) -> str:
+    return (
+        f"{rng.choice(SUBJECTS)}{rng.choice(VERBS)}{rng.choice(keywords)}"
+        f"{rng.choice(CLAUSES)[:6]}"
+    )
+
+
+def wechat_article(rng: random.Random, keywords: List[str], length: int = 1000) -> str:
+    parts: List[str] = []
+    size = 0
+    while size < length:
+        sentence = _sentence(rng, keywords)
+        if rng.random() < 0.2:
+            sentence += f"涉及金额{_amount(rng)}。"
+        parts.append(sentence)
+        size += len(sentence)
+    return "".join(parts)[:length]
+
+
+def english_mixed(rng: random.Random, keywords: List[str]) -> str:
+    return "".join(
+        f"{rng.choice(ENGLISH_COMPANIES)} 与{rng.choice(SUBJECTS)}"
+        f"{rng.choice(VERBS)}{rng.choice(keywords)}合作，"
+        f"{rng.choice(['AI', 'IPO', '5G', 'SaaS', 'cloud'])} 业务{rng.choice(CLAUSES)}。"
+        for _ in range(rng.randint(2, 4))
+    )
+
+
+def finance_amounts(rng: random.Random, keywords: List[str]) -> str:
+    return "".join(
+        f"{rng.choice(SUBJECTS)}{rng.choice(['融资', '营收', '净利润', '估值'])}"
+        f"{_amount(rng)}，同比增长{round(rng.uniform(1, 300), 1)}%，"
+        f"{rng.choice(['投资', '上市', '并购', '证券', '基金'])}{rng.choice(CLAUSES)}。"
+        for _ in range(rng.randint(3, 6))
+    )
+
+
+GENERATORS = {
+    "short_title": short_title,
+    "wechat_article": wechat_article,
+    "english_mixed": english_mixed,
+    "finance_amounts": finance_amounts,
+}
+
+
+def generate_corpus(size: int = 200, seed: int = DEFAULT_SEED) -> Dict[str, List[str]]:
+    """按场景生成语料，每个场景 size 条"""
+    keywords = _keywords()
+    corpus = {}
+    for offset, (name, generator) in enumerate(GENERATORS.items()):
+        rng = random.Random(seed + offset)
+        corpus[name] = [generator(rng, keywords) for _ in range(size)]
+    return corpus
+
+
+def generate_articles(
+    length: int, size: int = 50, seed: int = DEFAULT_SEED
+) -> List[str]:
+    """生成指定长度的文章，用于观察耗时随文本长度的变化"""
+    rng = random.Random(seed + length)
+    keywords = _keywords()
+    return [wechat_article(rng, keywords, length) for _ in range(size)]
+
+
+def generate_keywords(count: int, seed: int = DEFAULT_SEED) -> Dict[str, List[str]]:
+    """在默认分类关键词基础上补充合成关键词，总数约为 count"""
+    rng = random.Random(seed + count)
+    category_keywords = {
+        category: list(keywords)
+        for category, keywords in DEFAULT_CATEGORY_KEYWORDS.items()
+    }
+    categories = list(category_keywords)
+    existing = sum(len(keywords) for keywords in category_keywords.values())
+    chars = "".join(SUBJECTS + CLAUSES + FILLERS)
+    for index in range(max(0, count - existing)):
+        word = "".join(rng.choice(chars) for _ in range(rng.randint(2, 4)))
+        category_keywords[categories[index % len(categories)]].append(f"{word}{index}")
+    return category_keywords
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+批量生成基准测试用的事件数据
+
+用 corpus.py 的可复现语料向 events 表写入大量事件（默认100万条），
+归属于一个专用的基准测试用户，写入后重建事件计数器。
+
+用法（在 backend 目录下运行）：
+    python -m benchmarks.seed_events --count 1000000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app.core.auth import get_password_hash
+from app.database import Event as DBEvent, SessionLocal, User, create_tables
+from app.services.event_counters import rebuild_counters
+from app.services.search import search_tokens
+from app.services.tag_extractor import DEFAULT_CATEGORY_KEYWORDS
+
+from .corpus import DEFAULT_SEED, generate_corpus
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+
+
+def get_bench_user(db) -> User:
+    """获取或创建基准测试用户"""
+    user = db.query(User).filter(User.email == BENCH_EMAIL).first()
+    if user is None:
+        user = User(
+            email=BENCH_EMAIL,
+            username=BENCH_USERNAME,
+            hashed_password=get_password_hash(BENCH_PASSWORD),
+            full_name="Benchmark",
+        )
+        db.add(user)
+        db.commit()
+    return user
+
+
+def seed_events(count: int, batch_size: int, seed: int) -> None:
+    db = SessionLocal()
+    try:
+        user_id = get_bench_user(db).id
+        rng = random.Random(seed)
+
+        # 语料按场景循环使用，相同文本的分词结果只计算一次
+        corpus = [
+            text for texts in generate_corpus(500, seed).values() for text in texts
+        ]
+        tokens = {}
+        categories = list(DEFAULT_CATEGORY_KEYWORDS) + ["其他"]
+        start = datetime(2015, 1, 1)
+        span_days = (datetime(2025, 1, 1) - start).days
+
+        started = time.monotonic()
+        for offset in range(0, count, batch_size):
+            rows = []
+            for _ in range(min(batch_size, count - offset)):
+                text = rng.choice(corpus)
+                title, _, description = text.partition("，")
+                if text not in tokens:
+                    tokens[text] = search_tokens(title, description)
+                rows.append(
+                    {
+                        "title": title[:200],
+                        "description": description,
+                        "event_date": start
+                        + timedelta(
+                            days=rng.randrange(span_days),
+                            seconds=rng.randrange(86400),
+                        ),
+                        "created_at": datetime.utcnow(),
+                        "tags": "",
+                        "category": rng.choice(categories),
+                        "impact_score": rng.randint(1, 10),
+                        "is_reviewed": False,
+                        "enrichment_status": "done",
+                        "search_tokens": tokens[text],
+                        "user_id": user_id,
+                    }
+                )
+            db.execute(insert(DBEvent.__table__), rows)
+            db.commit()
+            done = offset + len(rows)
+            rate = done / (time.monotonic() - started)
+            print(f"🌱 已写入 {done}/{count} 条，{rate:.0f} 条/秒")
+
+        rebuild_counters(db)
+        db.commit()
+        print("✅ 事件计数器已重建")
+    finally:
+        db.close()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="生成基准测试用的事件数据")
+    parser.add_argument("--count", type=int, default=1_000_000, help="事件条数")
+    parser.add_argument("--batch-size", type=int, default=5000, help="每批写入条数")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="随机种子")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    create_tables()
+    seed_events(args.count, args.batch_size, args.seed)
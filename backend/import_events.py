@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+事件导入脚本
+把 NDJSON 或 CSV 文件（与导出的格式相同，.gz 结尾时按 gzip 解压）流式导入到指定用户。
+中断后再次运行同一个文件会从上次提交的行之后继续。
+"""
+
+import argparse
+import os
+import re
+import sys
+
+from app.database import SessionLocal, User, create_tables
+from app.services.event_import import (
+    IMPORT_BATCH_SIZE,
+    ImportBusyError,
+    ImportFormatError,
+    run_import,
+)
+from app.services.retag import build_extractor
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="流式导入事件")
+    parser.add_argument("file", help="导入文件，- 表示从标准输入读取")
+    parser.add_argument("--email", required=True, help="事件归属用户的邮箱")
+    parser.add_argument(
+        "--format", choices=["ndjson", "csv"], help="文件格式（默认按扩展名判断）"
+    )
+    parser.add_argument("--gzip", action="store_true", help="文件为 gzip 压缩")
+    parser.add_argument("--import-id", help="导入ID，用于中断后继续（默认使用文件名）")
+    parser.add_argument(
+        "--batch-size", type=int, default=IMPORT_BATCH_SIZE, help="每批提交的行数"
+    )
+    parser.add_argument("--restart", action="store_true", help="忽略检查点，从头导入")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    name = os.path.basename(args.file)
+    compress = args.gzip or name.endswith(".gz")
+    stem = name[:-3] if name.endswith(".gz") else name
+    import_format = args.format or ("csv" if stem.endswith(".csv") else "ndjson")
+    if args.import_id:
+        import_id = args.import_id
+    elif args.file == "-":
+        print("❌ 从标准输入导入时需要指定 --import-id")
+        sys.exit(1)
+    else:
+        import_id = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:64]
+
+    # 确保检查点表已经存在
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == args.email).first()
+    finally:
+        db.close()
+    if user is None:
+        print(f"❌ 用户不存在: {args.email}")
+        sys.exit(1)
+
+    tag_extractor = build_extractor(SessionLocal)
+    stream = sys.stdin.buffer if args.file == "-" else open(args.file, "rb")
+    try:
+        progress = run_import(
+            SessionLocal,
+            user.id,
+            stream,
+            import_format,
+            tag_extractor,
+            import_id,
+            compress=compress,
+            restart=args.restart,
+            batch_size=args.batch_size,
+        )
+    except ImportBusyError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except ImportFormatError:
+        print("💥 文件格式错误，已提交的行已保存，修正后再次运行将从检查点继续")
+        sys.exit(1)
+    except Exception:
+        print("💥 导入失败，再次运行将从检查点继续")
+        sys.exit(1)
+    finally:
+        stream.close()
+        tag_extractor.shutdown_pool()
+
+    for error in progress.errors:
+        print(f"⚠️  第 {error['line']} 行被拒绝: {error['error']}")
+    if progress.rejected > len(progress.errors):
+        print(f"⚠️  另有 {progress.rejected - len(progress.errors)} 行被拒绝未列出")
+    print(
+        f"🎉 导入完成（{import_id}）：导入 {progress.imported} 条，"
+        f"拒绝 {progress.rejected} 条，{progress.rows_per_sec:.0f} 条/秒"
+    )
@@ -1,12 +1,13 @@
 #!/usr/bin/env python3
 """
 数据库初始化脚本
-支持 PostgreSQL 数据库的初始化和表创建
+支持 PostgreSQL 和 SQLite 数据库的初始化和表创建
 """
 
 import os
 import sys
-from app.database import create_tables, DATABASE_URL, engine
+from app.database import create_tables, DATABASE_URL, engine, is_sqlite_url
+from app.services.segment_dict import DICT_CACHE_PATH, load_tokenizer
 
 
 def test_database_connection():
@@ -18,6 +19,13 @@ def test_database_connection():
         with engine.connect() as conn:
             from sqlalchemy import text
 
+            if is_sqlite_url(DATABASE_URL):
+                result = conn.execute(text("SELECT sqlite_version()")).scalar()
+                journal_mode = conn.execute(text("PRAGMA journal_mode")).scalar()
+                print("✅ 数据库连接成功")
+                print(f"📊 SQLite 版本: {result}，日志模式: {journal_mode}")
+                return True
+
             result = conn.execute(text("SELECT version()")).scalar()
             print(f"✅ 数据库连接成功")
             print(f"📊 PostgreSQL 版本: {result}")
@@ -51,7 +59,7 @@ def test_database_connection():
 
 def init_database():
     """初始化数据库"""
-    print("🚀 开始 PostgreSQL 数据库初始化...")
+    print("🚀 开始数据库初始化...")
     print(f"📍 数据库URL: {DATABASE_URL}")
 
     # 检测数据库类型
@@ -59,6 +67,8 @@ def init_database():
         "postgres://"
     ):
         print("🐘 检测到 PostgreSQL 数据库")
+    elif is_sqlite_url(DATABASE_URL):
+        print("🪶 检测到 SQLite 数据库")
     else:
         print(f"⚠️  未知的数据库类型: {DATABASE_URL}")
         return False
@@ -89,10 +99,18 @@ def init_database():
         return False
 
 
+def prepare_segment_dict():
+    """预先构建jieba词典缓存，工作进程启动时直接内存映射加载"""
+    print(f"📚 检查jieba词典缓存: {DICT_CACHE_PATH}")
+    load_tokenizer()
+    print("✅ jieba词典缓存就绪")
+
+
 if __name__ == "__main__":
     success = init_database()
     if not success:
         print("💥 数据库初始化失败，退出程序")
         sys.exit(1)
     else:
-        print("🎉 PostgreSQL 数据库初始化完成")
+        print("🎉 数据库初始化完成")
+        prepare_segment_dict()
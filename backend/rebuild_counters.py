@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+事件计数器重建脚本
+分类计数器和月度计数器与事件表出现偏差时（如直接修改数据库、导入中途失败后手工修复），
+根据事件表重新计算。重建在一个事务中完成，期间事件的写入会等待重建结束。
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal, create_tables
+from app.services.event_counters import counter_drift, rebuild_counters
+
+# 最多列出的偏差
+MAX_REPORTED = 20
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="重建事件计数器")
+    parser.add_argument(
+        "--check", action="store_true", help="只检查偏差，不重建；有偏差时退出码为1"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # 确保计数器表已经存在
+    create_tables()
+
+    db = SessionLocal()
+    try:
+        drift = counter_drift(db)
+        for table, key, stored, actual in drift[:MAX_REPORTED]:
+            print(f"⚠️  {table} {key}: 计数器 {stored}，实际 {actual}")
+        if len(drift) > MAX_REPORTED:
+            print(f"⚠️  另有 {len(drift) - MAX_REPORTED} 处偏差未列出")
+        if not drift:
+            print("✅ 计数器与事件表一致")
+            sys.exit(0)
+        if args.check:
+            print(f"❌ 计数器有 {len(drift)} 处偏差，运行 rebuild_counters.py 重建")
+            sys.exit(1)
+
+        rebuild_counters(db)
+        db.commit()
+        print(f"🎉 已重建事件计数器，修正 {len(drift)} 处偏差")
+    finally:
+        db.close()
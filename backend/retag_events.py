@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+批量重新打标签脚本
+关键词词典或提取规则变化后，用当前词典重新分析已有事件的标签、分类和重要性评分。
+中断后再次运行会从上次的检查点继续。
+"""
+
+import argparse
+import sys
+
+from app.database import SessionLocal, create_tables
+from app.services.retag import CHUNK_SIZE, build_extractor, run_retag
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="重新分析已有事件的标签")
+    parser.add_argument(
+        "--chunk-size", type=int, default=CHUNK_SIZE, help="每块处理的事件数"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="分析使用的进程数（默认按环境变量）"
+    )
+    parser.add_argument("--restart", action="store_true", help="忽略检查点，从头开始")
+    parser.add_argument(
+        "--force", action="store_true", help="文本和词典都未变化的事件也重新分析"
+    )
+    parser.add_argument(
+        "--reset-legacy",
+        action="store_true",
+        help="没有自动分析记录的早期事件，丢弃原有标签和分类",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    # 确保新增的字段和检查点表已经存在
+    create_tables()
+
+    tag_extractor = build_extractor(SessionLocal)
+    try:
+        progress = run_retag(
+            SessionLocal,
+            tag_extractor,
+            chunk_size=args.chunk_size,
+            restart=args.restart,
+            force=args.force,
+            reset_legacy=args.reset_legacy,
+            workers=args.workers,
+        )
+    except Exception:
+        print("💥 重新打标签失败，再次运行将从检查点继续")
+        sys.exit(1)
+    finally:
+        tag_extractor.shutdown_pool()
+
+    print(
+        f"🎉 重新打标签完成：处理 {progress.processed} 条，更新 {progress.updated} 条，"
+        f"跳过 {progress.skipped} 条，{progress.rows_per_sec:.0f} 条/秒"
+    )
@@ -0,0 +1,111 @@
+"""
+测试公共夹具
+
+测试使用临时目录中的 SQLite 数据库。app.database 在导入时按 DATABASE_URL
+创建连接，因此需要在导入 app 之前设置。
+"""
+
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix="grand-things-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+
+from app.core.auth import create_access_token, get_password_hash  # noqa: E402
+from app.database import SessionLocal, User, create_tables, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.corpus import DEFAULT_SEED, generate_corpus  # noqa: E402
+
+# 执行计划检查使用的数据量：足以让 SQLite 的统计信息区分索引的选择性
+SEED_EVENTS = 2000
+OTHER_USER_EVENTS = 500
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """建表并执行迁移，测试结束后删除临时数据库"""
+    create_tables()
+    yield engine
+    engine.dispose()
+    shutil.rmtree(_DB_DIR, ignore_errors=True)
+
+
+def create_user(email: str) -> User:
+    """创建（或获取）测试用户"""
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).first()
+        if user is None:
+            username = email.split("@")[0]
+            user = User(
+                email=email,
+                username=username,
+                hashed_password=get_password_hash(username),
+                full_name=username,
+            )
+            db.add(user)
+            db.commit()
+            db.refresh(user)
+        return user
+    finally:
+        db.close()
+
+
+def make_client(email: str) -> TestClient:
+    """以指定用户身份请求接口的客户端
+
+    不进入 lifespan：富化队列和后台任务不启动，创建事件在请求内完成分析
+    """
+    user = create_user(email)
+    client = TestClient(app)
+    client.headers["Authorization"] = (
+        f"Bearer {create_access_token({'sub': user.email})}"
+    )
+    return client
+
+
+def _seed(client: TestClient, count: int, seed: int) -> None:
+    """通过批量创建接口写入事件，标签、计数器和搜索词与正常创建一致"""
+    rng = random.Random(seed)
+    corpus = [text for texts in generate_corpus(200, seed).values() for text in texts]
+    start = datetime(2015, 1, 1)
+    for offset in range(0, count, 1000):
+        events = []
+        for _ in range(min(1000, count - offset)):
+            title, _, description = rng.choice(corpus).partition("，")
+            event_date = start + timedelta(days=rng.randrange(3650))
+            events.append(
+                {
+                    "title": title[:200],
+                    "description": description,
+                    "event_date": event_date.isoformat(),
+                }
+            )
+        response = client.post("/api/events/bulk", json={"events": events})
+        assert response.status_code == 200, response.text
+        assert response.json()["failed"] == 0
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    """没有预先写入事件的用户的客户端"""
+    return make_client("user@example.com")
+
+
+@pytest.fixture(scope="session")
+def seeded_client() -> TestClient:
+    """写入了事件的用户的客户端；另一个用户也有事件，查询需要按用户过滤"""
+    _seed(make_client("other@example.com"), OTHER_USER_EVENTS, DEFAULT_SEED + 1)
+    client = make_client("seeded@example.com")
+    _seed(client, SEED_EVENTS, DEFAULT_SEED)
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    return client
@@ -0,0 +1,149 @@
+"""
+数据库升级检查
+
+用加入迁移之前的表结构（只有 users、events、tags 三张表）建一个已有数据的库，
+再按应用启动时的流程（create_all 后执行迁移）升级，确认所有迁移都能执行成功。
+"""
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations import MIGRATIONS, run_migrations
+from app.services.data_version import bump_data_version
+from app.services.event_owner import assign_legacy_events, count_legacy_events
+
+# 迁移之前的表结构
+BASELINE_SCHEMA = [
+    "CREATE TABLE users ("
+    "id INTEGER PRIMARY KEY, email VARCHAR NOT NULL UNIQUE, "
+    "username VARCHAR NOT NULL UNIQUE, hashed_password VARCHAR NOT NULL, "
+    "full_name VARCHAR, is_active BOOLEAN, is_superuser BOOLEAN, "
+    "created_at DATETIME, updated_at DATETIME)",
+    "CREATE TABLE events ("
+    "id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, description TEXT, "
+    "created_at DATETIME, event_date DATETIME, tags VARCHAR(500), "
+    "category VARCHAR(50), impact_score INTEGER, feedback TEXT, "
+    "is_reviewed BOOLEAN, user_id INTEGER REFERENCES users (id))",
+    "CREATE TABLE tags ("
+    "id INTEGER PRIMARY KEY, name VARCHAR(50) NOT NULL UNIQUE, "
+    "color VARCHAR(7), category VARCHAR(50), created_at DATETIME)",
+]
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    """迁移之前表结构的 SQLite 数据库，有一个用户和一条属于该用户的事件"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in BASELINE_SCHEMA:
+            conn.execute(text(statement))
+        conn.execute(
+            text(
+                "INSERT INTO users (id, email, username, hashed_password, "
+                "is_active, is_superuser) "
+                "VALUES (1, 'old@example.com', 'old', 'x', 1, 0)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO events (title, tags, category, event_date, user_id) "
+                "VALUES ('公司完成融资', 'AI,芯片', '科技', '2024-01-01', 1)"
+            )
+        )
+    yield engine
+    engine.dispose()
+
+
+def upgrade(engine) -> None:
+    """与应用启动时相同：先建出缺失的表，再执行迁移"""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+
+
+def test_upgrade_assigns_legacy_events(baseline_engine):
+    """没有 user_id 的早期事件在升级时归属到已有用户"""
+    with baseline_engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO events (title, category, event_date) "
+                "VALUES ('早期事件', '科技', '2023-01-01')"
+            )
+        )
+    upgrade(baseline_engine)
+
+    with baseline_engine.connect() as conn:
+        owners = conn.execute(text("SELECT user_id FROM events")).scalars().all()
+        count = conn.execute(
+            text("SELECT count FROM event_counters WHERE user_id = 1")
+        ).scalar()
+    assert owners == [1, 1]
+    assert count == 2
+
+
+def test_upgrade_baseline_database(baseline_engine):
+    upgrade(baseline_engine)
+
+    with baseline_engine.connect() as conn:
+        applied = {
+            row[0] for row in conn.execute(text("SELECT id FROM schema_migrations"))
+        }
+        event = conn.execute(
+            text("SELECT user_id, row_version, enrichment_status FROM events")
+        ).one()
+        tags = conn.execute(text("SELECT COUNT(*) FROM event_tags")).scalar()
+        count = conn.execute(
+            text("SELECT count FROM event_counters WHERE user_id = 1")
+        ).scalar()
+    assert applied == {migration_id for migration_id, _ in MIGRATIONS}
+    assert tuple(event) == (1, 1, "done")
+    assert tags == 2
+    assert count == 1
+
+    # 再次启动时没有需要执行的迁移
+    upgrade(baseline_engine)
+
+
+def test_legacy_events_without_users(tmp_path):
+    """升级时还没有用户：早期事件保持未归属，注册用户后可以再归属"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    try:
+        with engine.begin() as conn:
+            for statement in BASELINE_SCHEMA:
+                conn.execute(text(statement))
+            conn.execute(
+                text(
+                    "INSERT INTO events (title, category, event_date) "
+                    "VALUES ('早期事件', '科技', '2023-01-01')"
+                )
+            )
+        upgrade(engine)
+
+        with Session(bind=engine) as db:
+            assert count_legacy_events(db) == 1
+            db.execute(
+                text(
+                    "INSERT INTO users (id, email, username, hashed_password, "
+                    "is_active, is_superuser, data_version) "
+                    "VALUES (7, 'first@example.com', 'first', 'x', 1, 0, 0)"
+                )
+            )
+            db.commit()
+
+            # 与 assign_legacy_events.py 相同
+            assert assign_legacy_events(db) == 1
+            bump_data_version(db, [7])
+            db.commit()
+
+            assert count_legacy_events(db) == 0
+            owner, data_version, count = db.execute(
+                text(
+                    "SELECT events.user_id, users.data_version, event_counters.count "
+                    "FROM events JOIN users ON users.id = events.user_id "
+                    "JOIN event_counters ON event_counters.user_id = users.id"
+                )
+            ).one()
+        assert (owner, data_version, count) == (7, 1, 1)
+    finally:
+        engine.dispose()
@@ -0,0 +1,102 @@
+"""
+创建事件的SQL语句数检查
+
+统计每个创建请求执行的SQL语句数（不含 BEGIN、SAVEPOINT 等事务控制语句），
+超过预算时失败，用于发现逐个标签查询之类的 N+1 问题。
+请求内富化和后台富化两种创建路径都要检查。
+"""
+
+import uuid
+from typing import List
+
+import pytest
+from sqlalchemy import event
+
+from app.api.events import enrichment_queue
+from app.database import engine
+
+TEXT = "公司宣布完成新一轮融资，加大人工智能芯片研发投入"
+
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+@pytest.fixture
+def statements():
+    """测试期间执行的SQL语句"""
+    recorded: List[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(_TRANSACTION_CONTROL):
+            recorded.append(" ".join(statement.split()))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", _record)
+
+
+@pytest.fixture
+def background_enrichment(monkeypatch):
+    """后台富化模式：任务只入队，不由工作线程处理"""
+    submitted: List[int] = []
+
+    def submit(event_id: int) -> bool:
+        submitted.append(event_id)
+        return True
+
+    monkeypatch.setattr(enrichment_queue, "enabled", True)
+    monkeypatch.setattr(enrichment_queue, "submit", submit)
+    return submitted
+
+
+def _post(client, statements: List[str], path: str, body: dict) -> dict:
+    statements.clear()
+    response = client.post(path, json=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _assert_budget(statements: List[str], budget: int) -> None:
+    assert len(statements) <= budget, "\n".join(
+        [f"{len(statements)} 条语句，上限 {budget}:"] + statements
+    )
+
+
+def _tag(client, known: bool) -> str:
+    """本次测试使用的标签：新标签每次都不同，已知标签先由一个事件登记"""
+    tag = f"查询计数{uuid.uuid4().hex[:8]}"
+    if known:
+        response = client.post("/api/events/", json={"title": TEXT, "tags": tag})
+        assert response.status_code == 200, response.text
+    return tag
+
+
+# 语句包括认证时查询用户的1条、分类和月度计数器各1条、用户数据版本1条；
+# 已登记的标签由 tag_registry 缓存，不再查询
+@pytest.mark.parametrize(
+    "known, budget", [(False, 8), (True, 6)], ids=["new-tag", "known-tag"]
+)
+def test_create_event_inline(client, statements, known, budget):
+    tags = _tag(client, known)
+    _post(client, statements, "/api/events/", {"title": TEXT, "tags": tags})
+    _assert_budget(statements, budget)
+
+
+@pytest.mark.parametrize(
+    "known, budget", [(False, 8), (True, 6)], ids=["new-tag", "known-tag"]
+)
+def test_create_event_background(
+    client, background_enrichment, statements, known, budget
+):
+    tags = _tag(client, known)
+    created = _post(client, statements, "/api/events/", {"title": TEXT, "tags": tags})
+    _assert_budget(statements, budget)
+    assert background_enrichment[-1] == created["id"]
+    assert created["enrichment_status"] == "pending"
+
+
+def test_create_events_bulk(client, statements):
+    tag = _tag(client, known=False)
+    events = [{"title": f"{TEXT}{i}", "tags": tag} for i in range(100)]
+    result = _post(client, statements, "/api/events/bulk", {"events": events})
+    assert result["created"] == 100
+    _assert_budget(statements, 10)
@@ -0,0 +1,108 @@
+"""
+事件查询的执行计划检查
+
+以写入了事件的用户身份调用时间线、搜索、统计等接口，记录接口实际执行的
+SQL，逐条查看执行计划：events 或 event_tags 表上不应出现全表扫描
+（SQLite 的 SCAN events / SCAN event_tags，PostgreSQL 的 Seq Scan）。
+统计接口读取计数器表，不查询事件表时没有需要检查的语句。
+"""
+
+import json
+import re
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import event
+
+from app.api.events import response_cache
+from app.database import engine
+
+# (说明, 接口路径, 查询参数)
+REQUESTS = [
+    ("时间线第一页", "/api/events/timeline", {}),
+    ("时间线精确总数", "/api/events/timeline", {"total": "exact"}),
+    ("时间线按分类", "/api/events/timeline", {"category": "科技"}),
+    ("搜索（无关键词）", "/api/events/search", {}),
+    ("搜索关键词", "/api/events/search", {"query": "人工智能"}),
+    (
+        "搜索分类和日期",
+        "/api/events/search",
+        {"category": "金融", "start_date": "2020-01-01"},
+    ),
+    ("搜索标签", "/api/events/search", {"tags": "AI,芯片"}),
+    ("分类统计", "/api/events/stats/categories", {}),
+    ("月度统计", "/api/events/stats/timeline", {}),
+    ("用户统计", "/auth/statistics", {}),
+]
+
+SCANNED_TABLES = ("events", "event_tags")
+
+_SQLITE_SCAN = re.compile(r"^SCAN (?:TABLE )?(events|event_tags)\b(?!_)")
+
+
+def _pg_seq_scans(plan: dict) -> List[str]:
+    scans = []
+    if (
+        plan.get("Node Type") == "Seq Scan"
+        and plan.get("Relation Name") in SCANNED_TABLES
+    ):
+        scans.append(f"Seq Scan on {plan['Relation Name']}")
+    for child in plan.get("Plans", []):
+        scans.extend(_pg_seq_scans(child))
+    return scans
+
+
+def explain(statement: str, parameters) -> Tuple[List[str], List[str]]:
+    """返回 (执行计划各行, 其中的全表扫描)"""
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            lines = [row[-1] for row in rows]
+            return lines, [line for line in lines if _SQLITE_SCAN.match(line)]
+
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN (FORMAT JSON) {statement}", parameters
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        root = plan[0]["Plan"]
+        lines = json.dumps(root, ensure_ascii=False, indent=1).splitlines()
+        return lines, _pg_seq_scans(root)
+
+
+def _is_event_query(statement: str) -> bool:
+    return statement.lstrip().upper().startswith("SELECT") and any(
+        table in statement for table in SCANNED_TABLES
+    )
+
+
+@pytest.mark.parametrize(
+    "path, params", [request[1:] for request in REQUESTS], ids=[r[0] for r in REQUESTS]
+)
+def test_event_queries_use_indexes(seeded_client, monkeypatch, path, params):
+    # 关闭响应缓存，每个请求都实际查询
+    monkeypatch.setattr(response_cache, "backend", None)
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        if _is_event_query(statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        response = seeded_client.get(path, params=params)
+        assert response.status_code == 200, response.text
+        if path == "/api/events/timeline" and not params:
+            # 再用游标取下一页
+            cursor = response.json()["next_cursor"]
+            assert cursor
+            response = seeded_client.get(path, params={"cursor": cursor})
+            assert response.status_code == 200, response.text
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    for statement, parameters in statements:
+        lines, scans = explain(statement, parameters)
+        assert not scans, "\n".join(
+            [f"{', '.join(scans)}:", " ".join(statement.split())] + lines
+        )
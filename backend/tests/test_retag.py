@@ -0,0 +1,49 @@
+"""
+重新打标签的单行计算
+"""
+
+from types import SimpleNamespace
+
+from app.services.bulk_events import MAX_TAGS_LENGTH
+from app.services.retag import _retag_row
+from app.services.tag_extractor import TextAnalysis
+from app.services.tags import split_tags
+
+
+def _row(tags: str, auto_tags: str = "") -> SimpleNamespace:
+    return SimpleNamespace(
+        id=1,
+        tags=tags,
+        category="科技",
+        auto_tags=auto_tags,
+        auto_category="科技",
+        analysis_hash="old",
+    )
+
+
+def test_retag_row_keeps_tags_within_column_length():
+    user_tags = [f"用户标签{i:02d}" for i in range(40)]
+    auto_tags = [f"自动标签{i:03d}" for i in range(100)]
+    analysis = TextAnalysis(tags=auto_tags, category="科技", impact_score=5)
+
+    values = _retag_row(_row(",".join(user_tags)), analysis, "new", False)
+
+    assert len(values["b_tags"]) <= MAX_TAGS_LENGTH
+    tags = split_tags(values["b_tags"])
+    assert tags[: len(user_tags)] == user_tags
+    kept = tags[len(user_tags) :]
+    assert kept and kept == auto_tags[: len(kept)]
+    # 没有写入的自动标签也不记录为自动标签
+    assert split_tags(values["b_auto_tags"]) == kept
+
+
+def test_retag_row_replaces_previous_auto_tags():
+    analysis = TextAnalysis(tags=["融资", "芯片"], category="金融", impact_score=7)
+
+    values = _retag_row(
+        _row("自定义,旧标签", auto_tags="旧标签"), analysis, "new", False
+    )
+
+    assert values["b_tags"] == "自定义,融资,芯片"
+    assert values["b_auto_tags"] == "融资,芯片"
+    assert values["b_category"] == "金融"